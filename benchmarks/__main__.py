@@ -0,0 +1,40 @@
+"""
+Runs the benchmarks and optionally compares them with a previous run:
+
+    python -m benchmarks --output results.json
+    python -m benchmarks --compare results.json --tolerance 0.2
+
+Exits with status 1 when a benchmark regressed, results of different
+machines or python versions are not comparable.
+"""
+import argparse
+import sys
+from benchmarks import api  # noqa: F401, registers the benchmarks
+from benchmarks.harness import compare, dump, load, run, table
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all by default")
+    parser.add_argument("--scale", type=int, default=1000, help="items per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated latency of the fake api, in seconds")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="writes the results as json")
+    parser.add_argument("--compare", help="results json to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run(args.names, repeat=args.repeat, scale=args.scale, latency=args.latency)
+    print(table(results))
+    if args.output:
+        dump(results, args.output)
+    if args.compare:
+        regressions = compare(results, load(args.compare), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Throughput of the client against the in-process fake API, ``latency``
+simulates the network so the concurrency of bulk operations shows.
+"""
+from cardda_python.batch import run_batch
+from cardda_python.reconciliation import Reconciler
+from cardda_python.resources import BankAccount
+from cardda_python.testing import FakeCardda
+from benchmarks.harness import benchmark
+
+
+def _recipient(index):
+    return {"rut": f"{index}-{index % 10}", "account_number": str(index), "bank_id": "bank", "account_type": "checking"}
+
+
+def _seeded(count, latency):
+    api = FakeCardda(latency=latency)
+    account = api.add("bank_accounts", account_number="1")
+    for index in range(count):
+        api.add("bank_recipients", owner_id=account["id"], **_recipient(index))
+    return api, account
+
+
+@benchmark
+def objectize(scale=1000, latency=0.0):
+    transactions = [
+        {"id": str(index), "amount": 100, "status": "enqueued", "description": "payment", "transition": None,
+         "recipient": {"id": "r1", "rut": "1-9", "status": "approved"}}
+        for index in range(scale)
+    ]
+    account = BankAccount({"id": "a1", "bank_transactions": transactions})
+    for transaction in account.bank_transactions:
+        transaction.as_json()
+    return scale
+
+
+@benchmark
+def list_throughput(scale=1000, latency=0.0):
+    api, account = _seeded(scale, latency)
+    with api.client() as cardda:
+        count = sum(1 for _ in cardda.banking.recipients.iter_all(owner_id=account["id"]))
+    assert count == scale
+    return count
+
+
+@benchmark
+def find_throughput(scale=1000, latency=0.0):
+    api, _ = _seeded(scale, latency)
+    ids = list(api.store["bank_recipients"])
+    with api.client() as cardda:
+        recipients = cardda.banking.recipients
+        # find has no bulk helper, run_batch is what callers use
+        results = run_batch(recipients.find, ids, concurrency=20)
+    assert all(result.ok for result in results)
+    return len(results)
+
+
+@benchmark
+def bulk_create(scale=1000, latency=0.0):
+    api = FakeCardda(latency=latency)
+    with api.client() as cardda:
+        results = cardda.banking.recipients.create_many([_recipient(index) for index in range(scale)], concurrency=20)
+    assert all(result.ok for result in results)
+    return scale
+
+
+@benchmark
+def bulk_enroll(scale=1000, latency=0.0):
+    api, _ = _seeded(scale, latency)
+    with api.client() as cardda:
+        recipients = cardda.banking.recipients.all()
+        results = cardda.banking.recipients.enroll_many(recipients, concurrency=20, bank_key_id="key")
+    assert all(result.ok for result in results)
+    return scale
+
+
+@benchmark
+def reconciliation(scale=1000, latency=0.0):
+    api = FakeCardda(latency=latency)
+    with api.client() as cardda:
+        reconciler = Reconciler(cardda.banking, "key", concurrency=20, poll_interval=0)
+        for index in range(scale):
+            reconciler.add_transaction({"amount": 100}, recipient=_recipient(index))
+        report = reconciler.run()
+    assert report.ok
+    return scale * 2
+
+
+@benchmark
+def payroll_pipeline(scale=1000, latency=0.0):
+    api = FakeCardda(latency=latency)
+    account = api.add("bank_accounts", account_number="1")
+    lines = ({"amount": 100, "recipient_id": f"r{index}"} for index in range(scale))
+    with api.client() as cardda:
+        pipeline = cardda.banking.payrolls.pipeline(chunk_size=max(1, scale // 10), concurrency=4)
+        results = pipeline.run(lines, payroll_data={"sender_id": account["id"]}, bank_key_id="key")
+    assert all(result.ok for result in results)
+    return scale
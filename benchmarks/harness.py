@@ -0,0 +1,94 @@
+import json
+import platform
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from importlib.metadata import version as _package_version
+except ImportError:  # python < 3.8
+    _package_version = None
+
+# name -> function(scale, **options) returning the number of operations it ran
+BENCHMARKS: Dict[str, Callable[..., int]] = {}
+
+
+def benchmark(fn: Callable[..., int]) -> Callable[..., int]:
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        library = _package_version("cardda-python") if _package_version else "unknown"
+    except Exception:
+        library = "unknown"
+    return {
+        "cardda_python": library,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def measure(fn: Callable[..., int], repeat: int = 3, **options) -> Dict[str, Any]:
+    """
+    Runs a benchmark ``repeat`` times and keeps the fastest run, the least
+    disturbed by the rest of the machine.
+    """
+    best = None
+    ops = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        ops = fn(**options)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return {"ops": ops, "seconds": best, "ops_per_sec": ops / best if best else float("inf")}
+
+
+def run(names: Optional[List[str]] = None, repeat: int = 3, **options) -> Dict[str, Any]:
+    results = {}
+    for name, fn in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(fn, repeat=repeat, **options)
+    return {"environment": environment(), "options": options, "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2,
+            metric: str = "ops_per_sec", lower_is_better: bool = False, min_delta: float = 0.0) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``, a benchmark regresses
+    when ``metric`` is worse by more than ``tolerance`` (a fraction) and by
+    more than ``min_delta`` in absolute terms, so figures close to zero don't
+    flag noise.
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or metric not in reference or not reference[metric]:
+            continue
+        ratio = result[metric] / reference[metric]
+        worse = ratio > 1 + tolerance if lower_is_better else ratio < 1 - tolerance
+        worse = worse and abs(result[metric] - reference[metric]) > min_delta
+        if worse:
+            regressions.append(f"{name}: {metric} {reference[metric]:.6g} -> {result[metric]:.6g} ({ratio:.0%} of baseline)")
+    return regressions
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def dump(results: Dict[str, Any], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def table(results: Dict[str, Any], columns=("ops", "seconds", "ops_per_sec")) -> str:
+    lines = [f"{'benchmark':<28}" + "".join(f"{column:>16}" for column in columns)]
+    for name, result in results["results"].items():
+        lines.append(f"{name:<28}" + "".join(f"{result.get(column, 0):>16.6g}" for column in columns))
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+"""
+Micro-benchmarks of the ``BaseResource`` hot paths on synthetic payloads,
+reporting ops/sec and tracemalloc allocations per operation:
+
+    python -m benchmarks.resources                    # run and print
+    python -m benchmarks.resources --check            # fail on regressions
+    python -m benchmarks.resources --update-baseline  # after an intended change
+
+The baseline lives next to this file. Allocations are stable across runs, so
+they get a tight tolerance, timings depend on the machine and get a loose one.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+from cardda_python.resources import BankAccount, BankPayroll, BankTransaction
+from benchmarks.harness import compare, dump, environment, load, table
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources_baseline.json")
+DEFAULT_SCALE = 2000
+
+# name -> setup(scale) returning (operations, function to measure)
+MICRO_BENCHMARKS: Dict[str, Callable[[int], Tuple[int, Callable[[], Any]]]] = {}
+
+
+def micro(fn):
+    MICRO_BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def recipient_json(index: int) -> Dict[str, Any]:
+    return {
+        "id": f"r{index}",
+        "rut": f"{index}-{index % 10}",
+        "alias": f"recipient {index}",
+        "email": f"recipient{index}@example.com",
+        "account_number": str(100000 + index),
+        "account_type": "checking",
+        "bank_id": "bank",
+        "status": "approved",
+        "transition": None,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def sender_json() -> Dict[str, Any]:
+    return {"id": "a1", "account_number": "1", "account_type": "checking", "bank_id": "bank", "status": "active"}
+
+
+def transaction_json(index: int, nested: bool = True) -> Dict[str, Any]:
+    data = {
+        "id": f"t{index}",
+        "amount": 1000 + index,
+        "description": f"payment {index}",
+        "sender_id": "a1",
+        "recipient_id": f"r{index}",
+        "status": "enqueued",
+        "transition": None,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:00Z",
+    }
+    if nested:
+        data["recipient"] = recipient_json(index)
+        data["sender"] = sender_json()
+    return data
+
+
+def account_json(transactions: int) -> Dict[str, Any]:
+    return {**sender_json(), "bank_transactions": [transaction_json(index) for index in range(transactions)]}
+
+
+def payroll_json(lines: int) -> Dict[str, Any]:
+    return {
+        "id": "p1",
+        "sender_id": "a1",
+        "status": "draft",
+        "transition": None,
+        "sender": sender_json(),
+        "bank_transactions": [transaction_json(index) for index in range(lines)],
+    }
+
+
+@micro
+def inject_attributes(scale):
+    payloads = [transaction_json(index, nested=False) for index in range(scale)]
+    return scale, lambda: [BankTransaction(payload) for payload in payloads]
+
+
+@micro
+def objectize(scale):
+    payload = account_json(scale)
+    return scale, lambda: BankAccount(payload).materialize().bank_transactions
+
+
+@micro
+def objectize_payroll(scale):
+    # every line embeds the same sender as the payroll
+    payload = payroll_json(scale)
+
+    def run():
+        payroll = BankPayroll(payload)
+        return [transaction.sender for transaction in payroll.bank_transactions]
+    return scale, run
+
+
+@micro
+def as_json(scale):
+    account = BankAccount(account_json(scale)).materialize()
+    for transaction in account.bank_transactions:
+        transaction.materialize()
+    return scale, lambda: account.as_json(include_nested_obj=True)
+
+
+@micro
+def is_nested_obj(scale):
+    transactions = BankAccount(account_json(scale)).bank_transactions
+    keys = list(transaction_json(0))
+    return scale * len(keys), lambda: [transaction.is_nested_obj(key) for transaction in transactions for key in keys]
+
+
+@micro
+def overwrite(scale):
+    transactions = [BankTransaction(transaction_json(index)) for index in range(scale)]
+    payloads = [transaction_json(index) for index in range(scale)]
+    return scale, lambda: [transaction.overwrite(payload) for transaction, payload in zip(transactions, payloads)]
+
+
+def measure_micro(setup, scale: int, repeat: int) -> Dict[str, Any]:
+    ops, fn = setup(scale)
+    fn()  # warm up caches such as the nested class lookup
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        result = fn()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    allocated = sum(stat.size_diff for stat in stats if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    del result
+    return {
+        "ops": ops,
+        "seconds": best,
+        "ops_per_sec": ops / best if best else float("inf"),
+        "bytes_per_op": allocated / ops,
+        "blocks_per_op": blocks / ops,
+    }
+
+
+def run(names=None, scale: int = DEFAULT_SCALE, repeat: int = 5) -> Dict[str, Any]:
+    results = {}
+    for name, setup in MICRO_BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure_micro(setup, scale, repeat)
+    return {"environment": environment(), "options": {"scale": scale}, "results": results}
+
+
+def check(results: Dict[str, Any], baseline: Dict[str, Any], time_tolerance: float, memory_tolerance: float):
+    regressions = compare(results, baseline, memory_tolerance, metric="bytes_per_op", lower_is_better=True, min_delta=16)
+    regressions += compare(results, baseline, memory_tolerance, metric="blocks_per_op", lower_is_better=True, min_delta=0.1)
+    same_python = baseline.get("environment", {}).get("python", "").rsplit(".", 1)[0] == \
+        results["environment"]["python"].rsplit(".", 1)[0]
+    if same_python:
+        regressions += compare(results, baseline, time_tolerance)
+    else:
+        print("baseline recorded on another python version, timings are not compared", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.resources")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, all by default")
+    parser.add_argument("--scale", type=int, default=DEFAULT_SCALE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 on regressions")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="allowed slowdown, as a fraction")
+    parser.add_argument("--memory-tolerance", type=float, default=0.1, help="allowed extra allocations, as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run(args.names, scale=args.scale, repeat=args.repeat)
+    print(table(results, columns=("ops", "ops_per_sec", "bytes_per_op", "blocks_per_op")))
+    if args.update_baseline:
+        dump(results, args.baseline)
+        return 0
+    if args.check:
+        baseline = load(args.baseline)
+        if baseline.get("options", {}).get("scale") != args.scale:
+            print("baseline recorded with another --scale, per op figures may differ", file=sys.stderr)
+        regressions = check(results, baseline, args.time_tolerance, args.memory_tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
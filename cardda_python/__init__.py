@@ -1 +1 @@
-from cardda_python.client import CarddaClient
\ No newline at end of file
+from cardda_python.client import CarddaClient, AsyncCarddaClient
\ No newline at end of file
@@ -1,24 +1,33 @@
-from cardda_python.http_client import HttpClient
+from typing import Optional
+from cardda_python.http_client import BaseHttpClient
 from cardda_python.services.banking import (
     BankTransactionService,
     BankRecipientService,
     BankPayrollService,
     BankKeyService,
-    BankAccountService
+    BankAccountService,
+    AsyncBankTransactionService,
+    AsyncBankRecipientService,
+    AsyncBankPayrollService,
+    AsyncBankKeyService,
+    AsyncBankAccountService,
 )
+from cardda_python.watermarks import WatermarkStore, MemoryWatermarkStore
 from cardda_python.constants import BANKING_PREFIX
 
 class BankingService:
     path_prefix = BANKING_PREFIX
 
-    def __init__(self, client: HttpClient):
+    def __init__(self, client: BaseHttpClient, watermarks: Optional[WatermarkStore] = None):
         self._client = client.extend(
             base_url= f"{client.base_url}/{self.path_prefix}"
         )
+        # shared by every accounts service, which is built on each access
+        self.watermarks = MemoryWatermarkStore() if watermarks is None else watermarks
     
     @property
     def accounts(self):
-        return BankAccountService(self._client)
+        return BankAccountService(self._client, watermarks=self.watermarks)
     
     @property
     def recipients(self):
@@ -34,4 +43,32 @@ class BankingService:
     
     @property
     def keys(self):
-        return BankKeyService(self._client)
\ No newline at end of file
+        return BankKeyService(self._client)
+
+    def service_for(self, resource):
+        for service in (self.accounts, self.recipients, self.transactions, self.payrolls, self.keys):
+            if service.resource.name == type(resource).name:
+                return service
+        raise ValueError(f"no banking service handles '{type(resource).name}'")
+
+
+class AsyncBankingService(BankingService):
+    @property
+    def accounts(self):
+        return AsyncBankAccountService(self._client, watermarks=self.watermarks)
+
+    @property
+    def recipients(self):
+        return AsyncBankRecipientService(self._client)
+
+    @property
+    def transactions(self):
+        return AsyncBankTransactionService(self._client)
+
+    @property
+    def payrolls(self):
+        return AsyncBankPayrollService(self._client)
+
+    @property
+    def keys(self):
+        return AsyncBankKeyService(self._client)
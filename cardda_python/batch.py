@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Iterable, List
+from cardda_python.constants import DEFAULT_BATCH_CONCURRENCY
+
+
+class BatchResult:
+    """
+    Outcome of one item of a batch: either the ``value`` returned for it or
+    the ``error`` it raised.
+    """
+    __slots__ = ("item", "value", "error")
+
+    def __init__(self, item: Any, value: Any = None, error: BaseException = None) -> None:
+        self.item = item
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> Any:
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+    def __repr__(self) -> str:
+        outcome = f"value={self.value!r}" if self.ok else f"error={self.error!r}"
+        return f"<BatchResult {outcome}>"
+
+
+def _call(fn: Callable[[Any], Any], item: Any) -> BatchResult:
+    try:
+        return BatchResult(item, value=fn(item))
+    except Exception as exc:
+        return BatchResult(item, error=exc)
+
+
+def run_batch(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> List[BatchResult]:
+    """
+    Calls ``fn`` for every item with at most ``concurrency`` calls running at
+    once. Results keep the order of ``items`` and a failing item never aborts
+    the rest of the batch.
+    """
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(items)))) as executor:
+        return list(executor.map(lambda item: _call(fn, item), items))
+
+
+async def arun_batch(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> List[BatchResult]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def call(item):
+        async with semaphore:
+            try:
+                return BatchResult(item, value=await fn(item))
+            except Exception as exc:
+                return BatchResult(item, error=exc)
+
+    return list(await asyncio.gather(*[call(item) for item in items]))
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+from cardda_python.constants import DEFAULT_CACHE_TTL, DEFAULT_CACHE_MAX_ENTRIES
+
+
+class CacheEntry:
+    __slots__ = ("value", "etag", "expires_at")
+
+    def __init__(self, value: Any, etag: Optional[str], expires_at: float) -> None:
+        self.value = value
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache for the bodies of GET responses. Bodies are decoded
+    again on every hit, so resources built from a hit never share nested
+    dicts or lists with the cache or with each other.
+
+    Entries live for ``ttl`` seconds, or for the value in ``ttls`` keyed by the
+    resource name (e.g. ``{"bank_recipients": 300}``). Expired entries that
+    carried an ``ETag`` are kept so the next request can be revalidated with
+    ``If-None-Match`` instead of downloading the body again.
+
+    The cache is shared by every service of a client and is cleared whenever
+    one of them sends a state changing request, because resources embed each
+    other and any of them may be stale afterwards.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CACHE_TTL,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        clock=time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def fork(self) -> "ResponseCache":
+        """
+        An empty cache with the same settings, used when a client is extended
+        with another api key so responses are never shared between keys.
+        """
+        return ResponseCache(self.ttl, self.ttls, self.max_entries, self.clock)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "size": len(self._entries),
+        }
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+    def ttl_for(self, url: str) -> float:
+        for segment in urlsplit(url).path.split("/"):
+            if segment in self.ttls:
+                return self.ttls[segment]
+        return self.ttl
+
+    def lookup(self, key: str):
+        """
+        Returns ``(entry, fresh)``. A stale entry is only returned when it can
+        be revalidated.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if entry.expires_at > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry, True
+            self.misses += 1
+            if entry.etag is None:
+                del self._entries[key]
+                return None, False
+            return entry, False
+
+    def store(self, key: str, value: Any, etag: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries[key] = CacheEntry(value, etag, self.clock() + self.ttl_for(key))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidated(self, key: str, entry: CacheEntry) -> Any:
+        with self._lock:
+            entry.expires_at = self.clock() + self.ttl_for(key)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self.revalidations += 1
+        return entry.value
+
+    def invalidate(self, prefix: Optional[str] = None) -> None:
+        with self._lock:
+            if prefix is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        self.invalidate()
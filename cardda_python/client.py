@@ -1,16 +1,84 @@
-from cardda_python.http_client import HttpClient
-from cardda_python.banking import BankingService
+from cardda_python.http_client import HttpClient, AsyncHttpClient
+from cardda_python.banking import BankingService, AsyncBankingService
+from cardda_python.cache import ResponseCache
 from cardda_python.constants import API_BASE_URL, API_VERSION
+from cardda_python.session import Session
+
+
+def client_options(cache=None, **options):
+    """
+    Options accepted by the clients besides the api key and url, they are
+    forwarded to the underlying http client: ``limits``, ``http2``,
+    ``timeout``, ``transport``, ``cache`` (a ``ResponseCache`` or ``True`` for
+    the defaults), ``retry`` (a ``RetryPolicy`` or ``None`` to disable
+    retries), ``rate_limiter`` (a ``TokenBucket``), ``instrumentation``
+    (an ``Instrumentation`` or a list of them) and ``coalesce`` (``False``
+    to send every GET even when an identical one is in flight).
+    """
+    return {"cache": ResponseCache() if cache is True else cache, **options}
+
 
 class CarddaClient:
-    def __init__(self, api_key, custom_url=None, custom_version=None):
+    def __init__(self, api_key, custom_url=None, custom_version=None, watermarks=None, **options):
         self._client = HttpClient(
             base_url=f"{custom_url or API_BASE_URL}/{custom_version or API_VERSION}",
-            api_key=api_key
+            api_key=api_key,
+            **client_options(**options)
         )
-    
+        self._watermarks = watermarks
+        self._banking = None
+
+    @property
+    def cache(self):
+        return self._client.cache
+
+    def session(self):
+        return Session()
+
     @property
     def banking(self):
-        return BankingService(self._client)
-    
-    
\ No newline at end of file
+        if self._banking is None:
+            self._banking = BankingService(self._client, watermarks=self._watermarks)
+        return self._banking
+
+    def close(self):
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncCarddaClient:
+    def __init__(self, api_key, custom_url=None, custom_version=None, watermarks=None, **options):
+        self._client = AsyncHttpClient(
+            base_url=f"{custom_url or API_BASE_URL}/{custom_version or API_VERSION}",
+            api_key=api_key,
+            **client_options(**options)
+        )
+        self._watermarks = watermarks
+        self._banking = None
+
+    @property
+    def cache(self):
+        return self._client.cache
+
+    def session(self):
+        return Session()
+
+    @property
+    def banking(self):
+        if self._banking is None:
+            self._banking = AsyncBankingService(self._client, watermarks=self._watermarks)
+        return self._banking
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -0,0 +1,94 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+_MISSING = object()
+
+
+def _getter(field: str):
+    path = field.split(".")
+    if len(path) == 1:
+        return lambda row: row.get(field)
+
+    def get(row):
+        value = row
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return None
+        return value
+    return get
+
+
+class Columns:
+    """
+    Rows of raw json transposed into one list per field, filled page by page
+    without building resources.
+
+    ``fields`` are attribute names or dotted paths into nested objects
+    (``recipient.rut``). Without them every scalar top level attribute
+    becomes a column, with None for the rows that don't have it, except the
+    ``exclude`` ones (the nested objects of the resource, which may be null).
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None, exclude: Iterable[str] = ()) -> None:
+        self.fields = list(fields) if fields is not None else None
+        self.exclude = frozenset(exclude)
+        self.data: Dict[str, List[Any]] = {field: [] for field in self.fields or ()}
+        self._getters = [(field, _getter(field)) for field in self.fields or ()]
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __getitem__(self, field: str) -> List[Any]:
+        return self.data[field]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> "Columns":
+        if self.fields is not None:
+            rows = rows if isinstance(rows, list) else list(rows)
+            for field, get in self._getters:
+                self.data[field].extend(get(row) for row in rows)
+            self._rows += len(rows)
+            return self
+        for row in rows:
+            for key, value in row.items():
+                if isinstance(value, (dict, list)) or key in self.exclude:
+                    continue
+                column = self.data.get(key)
+                if column is None:
+                    column = self.data[key] = [None] * self._rows
+                column.append(value)
+            self._rows += 1
+            for column in self.data.values():
+                if len(column) < self._rows:
+                    column.append(None)
+        return self
+
+    def rows(self) -> Iterable[Dict[str, Any]]:
+        names = list(self.data)
+        for values in zip(*(self.data[name] for name in names)):
+            yield dict(zip(names, values))
+
+    def to_pydict(self) -> Dict[str, List[Any]]:
+        return self.data
+
+    def to_arrow(self):
+        """
+        A ``pyarrow.Table``, needs pyarrow.
+        """
+        import pyarrow
+        return pyarrow.table(self.data)
+
+    def to_pandas(self):
+        """
+        A ``pandas.DataFrame``, needs pandas.
+        """
+        import pandas
+        return pandas.DataFrame(self.data, columns=list(self.data))
+
+    def __repr__(self) -> str:
+        return f"<Columns rows={self._rows} fields={list(self.data)}>"
@@ -1,3 +1,54 @@
 API_BASE_URL = "https://api.cardda.com"
 API_VERSION = "v1"
-BANKING_PREFIX = "banking"
\ No newline at end of file
+BANKING_PREFIX = "banking"
+
+# connection pool shared by every service of a client
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+# pagination params used when iterating over listings
+PAGE_PARAM = "page"
+PAGE_SIZE_PARAM = "per_page"
+# only returns resources updated at or after the given timestamp
+UPDATED_SINCE_PARAM = "updated_since"
+DEFAULT_PAGE_SIZE = 100
+# listings still returning full pages after this many are given up on
+DEFAULT_MAX_PAGES = 10000
+
+# response cache defaults
+DEFAULT_CACHE_TTL = 30.0
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+# amount of requests a batch helper keeps in flight
+DEFAULT_BATCH_CONCURRENCY = 10
+# lines per payroll created by the payroll pipeline
+DEFAULT_PAYROLL_CHUNK_SIZE = 500
+
+# retries of failed requests
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+# attributes that identify a recipient account, whatever its alias or email
+RECIPIENT_KEY_FIELDS = ("rut", "account_number", "bank_id", "account_type")
+
+# reconciliation polling of pending transitions
+DEFAULT_POLL_INTERVAL = 2.0
+DEFAULT_MAX_POLL_INTERVAL = 60.0
+DEFAULT_POLL_BACKOFF = 2.0
+DEFAULT_MAX_ERRORS = 3
+# polls in a row without any change before an entity is reported as stuck
+DEFAULT_MAX_STALLED_POLLS = 30
+
+# webhooks
+WEBHOOK_SIGNATURE_HEADER = "Cardda-Signature"
+WEBHOOK_TOLERANCE = 300.0
+WEBHOOK_DEDUP_WINDOW = 1024
+
+# upper bounds, in seconds, of the request latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
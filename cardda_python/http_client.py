@@ -1,29 +1,83 @@
+import asyncio
+import copy
+import time
 import httpx
-from typing import Any, Dict, List
-import json
+from typing import Any, Dict, List, Optional
+import uuid
+from cardda_python.cache import ResponseCache
+from cardda_python.rate_limit import TokenBucket
+from cardda_python.retry import RetryPolicy, DEFAULT_RETRY
+from cardda_python.single_flight import SingleFlight, AsyncSingleFlight
+from cardda_python.serializers import JsonSerializer, default_serializer
+from cardda_python.instrumentation import Instrumentation, RequestEvent, combine, route_of
+from cardda_python.constants import (
+    DEFAULT_TIMEOUT,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    IDEMPOTENCY_KEY_HEADER,
+)
 
+SAFE_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+# methods that get an idempotency key so they can be retried safely
+KEYED_METHODS = frozenset(["POST", "PATCH"])
+BODYLESS_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "DELETE"])
 
-class HttpClient:
-    def __init__(self, base_url: str, api_key: str) -> None:
+
+def default_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+    )
+
+
+class BaseHttpClient:
+    """
+    Configuration shared by the sync and async clients.
+
+    The pool is created once by the root client and shared by every client
+    obtained through ``extend``, so services only differ by their path prefix
+    and reuse the same keep-alive connections. So is the single flight
+    registry: concurrent identical GETs, even from different services, share
+    one request and each caller decodes its own copy of the body.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        cache: Optional[ResponseCache] = None,
+        retry: Optional[RetryPolicy] = DEFAULT_RETRY,
+        rate_limiter: Optional[TokenBucket] = None,
+        idempotency_keys: bool = True,
+        serializer: Optional[JsonSerializer] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        single_flight=None,
+    ) -> None:
         self.base_url = base_url
         self.api_key = api_key
-        self.__client = None
-    
+        self.cache = cache
+        self.retry = retry
+        self.rate_limiter = rate_limiter
+        self.idempotency_keys = idempotency_keys
+        self.serializer = serializer or default_serializer()
+        self.instrumentation = combine(instrumentation)
+        self.single_flight = single_flight
+        self._owns_pool = True
+
     def extend(
         self,
         base_url=None,
         api_key=None,
     ):
-        return HttpClient(
-            base_url=base_url or self.base_url,
-            api_key=api_key or self.api_key,
-        )
-    
-    @property
-    def _client(self) -> httpx.Client:
-        if self.__client is None:
-            self.__client = httpx.Client(base_url=self.base_url, headers=self.headers)
-        return self.__client
+        extended = copy.copy(self)
+        extended.base_url = base_url or self.base_url
+        extended.api_key = api_key or self.api_key
+        extended._owns_pool = False
+        if self.cache is not None and extended.api_key != self.api_key:
+            extended.cache = self.cache.fork()
+        return extended
 
     @property
     def headers(self):
@@ -31,28 +85,346 @@ class HttpClient:
             "Authorization": f'Bearer {self.api_key}',
             "Content-Type": "application/json"
             }
-    
-    def _request(self, method: str, endpoint: str = "", data = {}, params = {}):
-        response = self._client.request(method, endpoint, params=params, data=json.dumps(data), headers=self.headers)
+
+    @property
+    def closed(self) -> bool:
+        return self._client.is_closed
+
+    def url(self, endpoint: str = "") -> str:
+        return f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+
+    def _request_headers(self, method, idempotency_key=None):
+        headers = self.headers
+        if idempotency_key is None and self.idempotency_keys and method in KEYED_METHODS:
+            idempotency_key = str(uuid.uuid4())
+        if idempotency_key is not None:
+            # generated once per call, so every retry carries the same key
+            headers[IDEMPOTENCY_KEY_HEADER] = idempotency_key
+        return headers
+
+    def _encode(self, method, data):
+        if method in BODYLESS_METHODS:
+            return None
+        return self.serializer.dumps(data)
+
+    def _decode(self, content, event=None):
+        if not content:
+            return None
+        if event is None:
+            return self.serializer.loads(content)
+        started = time.perf_counter()
+        value = self.serializer.loads(content)
+        event.add_phase("decode", time.perf_counter() - started)
+        return value
+
+    def _start_event(self, method, endpoint) -> Optional[RequestEvent]:
+        if self.instrumentation is None:
+            return None
+        event = RequestEvent(method, self.url(endpoint), route_of(self.base_url, endpoint))
+        self.instrumentation.request_start(event)
+        return event
+
+    def _end_event(self, event, error=None):
+        event.error = error
+        if isinstance(error, httpx.HTTPStatusError):
+            event.status_code = error.response.status_code
+        self.instrumentation.request_end(event.finish())
+
+    def _cache_hit(self, event):
+        if event is not None:
+            event.cache = "hit"
+            self.instrumentation.cache_hit(event)
+
+    def _coalesced(self, event):
+        if event is not None:
+            event.cache = "coalesced"
+            self.instrumentation.coalesced(event)
+
+    def _flight_key(self, method, url, params):
+        if self.single_flight is None or method != "GET":
+            return None
+        # responses are never shared between api keys
+        return (self.api_key, ResponseCache.key(url, params))
+
+    def _rate_limit_waited(self, event, seconds):
+        if event is not None and seconds > 0:
+            self.instrumentation.rate_limit_wait(event, seconds)
+
+    def _cache_lookup(self, method, url, params, headers):
+        if self.cache is None or method != "GET":
+            return None, None, False
+        key = self.cache.key(url, params)
+        entry, fresh = self.cache.lookup(key)
+        if entry is not None and not fresh:
+            headers["If-None-Match"] = entry.etag
+        return key, entry, fresh
+
+    def _retry_delay(self, method, headers, attempt, response=None, error=None, event=None) -> Optional[float]:
+        if self.retry is None or not self.retry.should_retry(method, headers, attempt, response, error):
+            return None
+        delay = self.retry.backoff(attempt, response)
+        if response is not None and response.status_code == 429 and self.rate_limiter is not None:
+            # every service shares the quota, so all of them have to back off
+            self.rate_limiter.pause(delay)
+        if event is not None:
+            self.instrumentation.retry(event, delay)
+        return delay
+
+    def _handle_response(self, method, response, cache_key=None, entry=None, event=None):
+        if event is not None:
+            event.status_code = response.status_code
+        if self.cache is not None:
+            if method not in SAFE_METHODS:
+                # resources embed each other, any write may stale any entry
+                self.cache.invalidate()
+            elif entry is not None and response.status_code == 304:
+                if event is not None:
+                    event.cache = "revalidated"
+                return self.cache.revalidated(cache_key, entry)
         response.raise_for_status()
-        return response.json()
-    
+        content = response.content
+        if cache_key is not None:
+            self.cache.store(cache_key, content, response.headers.get("ETag"))
+        return content
+
+
+class HttpClient(BaseHttpClient):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        timeout: Any = DEFAULT_TIMEOUT,
+        transport: Optional[httpx.BaseTransport] = None,
+        cache: Optional[ResponseCache] = None,
+        retry: Optional[RetryPolicy] = DEFAULT_RETRY,
+        rate_limiter: Optional[TokenBucket] = None,
+        idempotency_keys: bool = True,
+        serializer: Optional[JsonSerializer] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        coalesce: bool = True,
+    ) -> None:
+        super().__init__(
+            base_url,
+            api_key,
+            cache=cache,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            idempotency_keys=idempotency_keys,
+            serializer=serializer,
+            instrumentation=instrumentation,
+            single_flight=SingleFlight() if coalesce else None,
+        )
+        self._client = httpx.Client(
+            limits=limits or default_limits(),
+            http2=http2,
+            timeout=timeout,
+            transport=transport,
+        )
+
+    def close(self) -> None:
+        # extended clients borrow the pool, only its owner may release it
+        if self._owns_pool:
+            self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _request(self, method: str, endpoint: str = "", data = {}, params = {}, idempotency_key: Optional[str] = None):
+        event = self._start_event(method, endpoint)
+        if event is None:
+            return self._send(method, endpoint, data, params, idempotency_key)
+        try:
+            value = self._send(method, endpoint, data, params, idempotency_key, event)
+        except Exception as exc:
+            self._end_event(event, exc)
+            raise
+        self._end_event(event)
+        return value
+
+    def _send(self, method, endpoint, data, params, idempotency_key, event=None):
+        url = self.url(endpoint)
+        headers = self._request_headers(method, idempotency_key)
+        cache_key, entry, fresh = self._cache_lookup(method, url, params, headers)
+        if fresh:
+            self._cache_hit(event)
+            return self._decode(entry.value, event)
+        flight_key = self._flight_key(method, url, params)
+        if flight_key is None:
+            content = self._fetch(method, url, data, params, headers, cache_key, entry, event)
+        else:
+            # the body is shared, not the decoded value
+            content, shared = self.single_flight.do(
+                flight_key, lambda: self._fetch(method, url, data, params, headers, cache_key, entry, event)
+            )
+            if shared:
+                self._coalesced(event)
+        return self._decode(content, event)
+
+    def _fetch(self, method, url, data, params, headers, cache_key=None, entry=None, event=None):
+        content = self._encode(method, data)
+        extensions = None if event is None else {"trace": event.trace}
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self._rate_limit_waited(event, self.rate_limiter.acquire())
+            if event is not None:
+                event.attempts += 1
+            try:
+                response = self._client.request(
+                    method, url, params=params, content=content, headers=headers, extensions=extensions
+                )
+            except httpx.TransportError as exc:
+                delay = self._retry_delay(method, headers, attempt, error=exc, event=event)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, headers, attempt, response=response, event=event)
+                if delay is None:
+                    break
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+        return self._handle_response(method, response, cache_key, entry, event)
+
     def all(self, params) -> List[Any]:
         response = self._request('GET', params=params)
         return response
 
-    def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self._request('POST', data=data)
+    def create(self, data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        response = self._request('POST', data=data, idempotency_key=idempotency_key)
         return response
 
     def find(self, resource_id: str) -> Dict[str, Any]:
         response = self._request('GET', endpoint=f'/{resource_id}')
         return response
 
-    def update(self, resource_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        response = self._request('PATCH', endpoint=f'/{resource_id}', data=data)
+    def update(self, resource_id: str, data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        response = self._request('PATCH', endpoint=f'/{resource_id}', data=data, idempotency_key=idempotency_key)
         return response
     
     def delete(self, resource_id: str) -> Dict[str, Any]:
         response = self._request('DELETE', endpoint=f'/{resource_id}')
-        return response
\ No newline at end of file
+        return response
+
+
+class AsyncHttpClient(BaseHttpClient):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        timeout: Any = DEFAULT_TIMEOUT,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        cache: Optional[ResponseCache] = None,
+        retry: Optional[RetryPolicy] = DEFAULT_RETRY,
+        rate_limiter: Optional[TokenBucket] = None,
+        idempotency_keys: bool = True,
+        serializer: Optional[JsonSerializer] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        coalesce: bool = True,
+    ) -> None:
+        super().__init__(
+            base_url,
+            api_key,
+            cache=cache,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            idempotency_keys=idempotency_keys,
+            serializer=serializer,
+            instrumentation=instrumentation,
+            single_flight=AsyncSingleFlight() if coalesce else None,
+        )
+        self._client = httpx.AsyncClient(
+            limits=limits or default_limits(),
+            http2=http2,
+            timeout=timeout,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        if self._owns_pool:
+            await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _request(self, method: str, endpoint: str = "", data = {}, params = {}, idempotency_key: Optional[str] = None):
+        event = self._start_event(method, endpoint)
+        if event is None:
+            return await self._send(method, endpoint, data, params, idempotency_key)
+        try:
+            value = await self._send(method, endpoint, data, params, idempotency_key, event)
+        except Exception as exc:
+            self._end_event(event, exc)
+            raise
+        self._end_event(event)
+        return value
+
+    async def _send(self, method, endpoint, data, params, idempotency_key, event=None):
+        url = self.url(endpoint)
+        headers = self._request_headers(method, idempotency_key)
+        cache_key, entry, fresh = self._cache_lookup(method, url, params, headers)
+        if fresh:
+            self._cache_hit(event)
+            return self._decode(entry.value, event)
+        flight_key = self._flight_key(method, url, params)
+        if flight_key is None:
+            content = await self._fetch(method, url, data, params, headers, cache_key, entry, event)
+        else:
+            # the body is shared, not the decoded value
+            content, shared = await self.single_flight.do(
+                flight_key, lambda: self._fetch(method, url, data, params, headers, cache_key, entry, event)
+            )
+            if shared:
+                self._coalesced(event)
+        return self._decode(content, event)
+
+    async def _fetch(self, method, url, data, params, headers, cache_key=None, entry=None, event=None):
+        content = self._encode(method, data)
+        extensions = None if event is None else {"trace": event.atrace}
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self._rate_limit_waited(event, await self.rate_limiter.acquire_async())
+            if event is not None:
+                event.attempts += 1
+            try:
+                response = await self._client.request(
+                    method, url, params=params, content=content, headers=headers, extensions=extensions
+                )
+            except httpx.TransportError as exc:
+                delay = self._retry_delay(method, headers, attempt, error=exc, event=event)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, headers, attempt, response=response, event=event)
+                if delay is None:
+                    break
+                await response.aclose()
+            attempt += 1
+            await asyncio.sleep(delay)
+        return self._handle_response(method, response, cache_key, entry, event)
+
+    async def all(self, params) -> List[Any]:
+        return await self._request('GET', params=params)
+
+    async def create(self, data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        return await self._request('POST', data=data, idempotency_key=idempotency_key)
+
+    async def find(self, resource_id: str) -> Dict[str, Any]:
+        return await self._request('GET', endpoint=f'/{resource_id}')
+
+    async def update(self, resource_id: str, data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        return await self._request('PATCH', endpoint=f'/{resource_id}', data=data, idempotency_key=idempotency_key)
+
+    async def delete(self, resource_id: str) -> Dict[str, Any]:
+        return await self._request('DELETE', endpoint=f'/{resource_id}')
@@ -0,0 +1,399 @@
+import bisect
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence
+from urllib.parse import urlsplit
+from cardda_python.constants import DEFAULT_LATENCY_BUCKETS
+
+# httpcore trace events that delimit each phase of a request
+TRACE_PHASES = {
+    "connect_tcp": "connect",
+    "connect_unix_socket": "connect",
+    "start_tls": "tls",
+    "send_request_headers": "server",
+    "receive_response_headers": "server",
+    "receive_response_body": "download",
+}
+
+
+def route_of(base_url: str, endpoint: str = "") -> str:
+    """
+    The endpoint template of a request, endpoints of this library are always
+    ``/{id}`` or ``/{id}/<action>`` below the resource path.
+    """
+    path = urlsplit(base_url).path.rstrip("/")
+    segments = endpoint.strip("/").split("/") if endpoint.strip("/") else []
+    if segments:
+        segments[0] = "{id}"
+    return "/".join([path, *segments]) or "/"
+
+
+class RequestEvent:
+    """
+    A single call to the API as seen by the instrumentation hooks, including
+    every retry. ``phases`` holds the seconds spent connecting, in the TLS
+    handshake, waiting for the server, downloading and decoding the body.
+    """
+    __slots__ = (
+        "method", "url", "route", "attempts", "status_code", "error", "cache",
+        "started_at", "duration", "phases", "_marks",
+    )
+
+    def __init__(self, method: str, url: str, route: str) -> None:
+        self.method = method
+        self.url = url
+        self.route = route
+        self.attempts = 0
+        self.status_code = None
+        self.error = None
+        # "hit" when served from the cache, "revalidated" after a 304,
+        # "coalesced" when another caller's identical request was reused
+        self.cache = None
+        self.started_at = time.perf_counter()
+        self.duration = None
+        self.phases: Dict[str, float] = {}
+        self._marks: Dict[str, float] = {}
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None or (self.status_code is not None and self.status_code >= 400)
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def _mark(self, name: str) -> None:
+        step, _, stage = name.rpartition(".")
+        phase = TRACE_PHASES.get(step.rpartition(".")[2])
+        if phase is None:
+            return
+        now = time.perf_counter()
+        if stage == "started":
+            # the server phase starts with the headers and ends with the response headers
+            self._marks.setdefault(phase, now)
+        elif stage in ("complete", "failed") and not step.endswith("send_request_headers"):
+            started = self._marks.pop(phase, None)
+            if started is not None:
+                self.add_phase(phase, now - started)
+
+    def trace(self, name: str, info: Dict[str, Any]) -> None:
+        """
+        httpx ``trace`` extension for the sync client.
+        """
+        self._mark(name)
+
+    async def atrace(self, name: str, info: Dict[str, Any]) -> None:
+        self._mark(name)
+
+    def finish(self) -> "RequestEvent":
+        self.duration = time.perf_counter() - self.started_at
+        return self
+
+    def __repr__(self) -> str:
+        return f"<RequestEvent {self.method} {self.route} status={self.status_code} duration={self.duration}>"
+
+
+class Instrumentation:
+    """
+    Hooks called by the http clients and services, override the ones you
+    need. They run inline with the request, so they must be quick and must
+    not raise.
+    """
+
+    def request_start(self, event: RequestEvent) -> None:
+        pass
+
+    def request_end(self, event: RequestEvent) -> None:
+        pass
+
+    def retry(self, event: RequestEvent, delay: float) -> None:
+        pass
+
+    def cache_hit(self, event: RequestEvent) -> None:
+        pass
+
+    def coalesced(self, event: RequestEvent) -> None:
+        pass
+
+    def rate_limit_wait(self, event: RequestEvent, seconds: float) -> None:
+        pass
+
+    def objectize(self, resource: str, count: int, seconds: float) -> None:
+        pass
+
+
+class CompositeInstrumentation(Instrumentation):
+    def __init__(self, instrumentations: Sequence[Instrumentation]) -> None:
+        self.instrumentations = list(instrumentations)
+
+    def request_start(self, event):
+        for instrumentation in self.instrumentations:
+            instrumentation.request_start(event)
+
+    def request_end(self, event):
+        for instrumentation in self.instrumentations:
+            instrumentation.request_end(event)
+
+    def retry(self, event, delay):
+        for instrumentation in self.instrumentations:
+            instrumentation.retry(event, delay)
+
+    def cache_hit(self, event):
+        for instrumentation in self.instrumentations:
+            instrumentation.cache_hit(event)
+
+    def coalesced(self, event):
+        for instrumentation in self.instrumentations:
+            instrumentation.coalesced(event)
+
+    def rate_limit_wait(self, event, seconds):
+        for instrumentation in self.instrumentations:
+            instrumentation.rate_limit_wait(event, seconds)
+
+    def objectize(self, resource, count, seconds):
+        for instrumentation in self.instrumentations:
+            instrumentation.objectize(resource, count, seconds)
+
+
+def combine(instrumentation) -> Optional[Instrumentation]:
+    """
+    Accepts None, an ``Instrumentation`` or a list of them.
+    """
+    if instrumentation is None or isinstance(instrumentation, Instrumentation):
+        return instrumentation
+    instrumentations = list(instrumentation)
+    if not instrumentations:
+        return None
+    if len(instrumentations) == 1:
+        return instrumentations[0]
+    return CompositeInstrumentation(instrumentations)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        # the last count is the overflow bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Upper bound of the bucket holding the ``q`` quantile.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip(self.buckets + (float("inf"),), self.counts)),
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "phases", "requests", "errors", "in_flight", "retries", "cache_hits", "coalesced")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = Histogram(buckets)
+        self.phases: Dict[str, Histogram] = {}
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "in_flight": self.in_flight,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+            "latency": self.latency.as_dict(),
+            "phases": {phase: histogram.as_dict() for phase, histogram in self.phases.items()},
+        }
+
+
+class MetricsCollector(Instrumentation):
+    """
+    In memory metrics per ``METHOD route``: latency and phase histograms,
+    requests in flight, errors, retries, cache hits and coalesced requests, plus the time spent
+    waiting for the rate limiter and building resources.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.routes: Dict[str, RouteMetrics] = {}
+        self.rate_limit_wait_seconds = 0.0
+        self.objectize_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _route(self, event: RequestEvent) -> RouteMetrics:
+        key = f"{event.method} {event.route}"
+        metrics = self.routes.get(key)
+        if metrics is None:
+            metrics = self.routes[key] = RouteMetrics(self.buckets)
+        return metrics
+
+    def request_start(self, event):
+        with self._lock:
+            self._route(event).in_flight += 1
+
+    def request_end(self, event):
+        with self._lock:
+            metrics = self._route(event)
+            metrics.in_flight -= 1
+            metrics.requests += 1
+            metrics.errors += event.failed
+            metrics.latency.observe(event.duration)
+            for phase, seconds in event.phases.items():
+                histogram = metrics.phases.get(phase)
+                if histogram is None:
+                    histogram = metrics.phases[phase] = Histogram(self.buckets)
+                histogram.observe(seconds)
+
+    def retry(self, event, delay):
+        with self._lock:
+            self._route(event).retries += 1
+
+    def cache_hit(self, event):
+        with self._lock:
+            self._route(event).cache_hits += 1
+
+    def coalesced(self, event):
+        with self._lock:
+            self._route(event).coalesced += 1
+
+    def rate_limit_wait(self, event, seconds):
+        with self._lock:
+            self.rate_limit_wait_seconds += seconds
+
+    def objectize(self, resource, count, seconds):
+        with self._lock:
+            self.objectize_seconds[resource] = self.objectize_seconds.get(resource, 0.0) + seconds
+
+    @property
+    def in_flight(self) -> int:
+        return sum(metrics.in_flight for metrics in self.routes.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "routes": {key: metrics.as_dict() for key, metrics in self.routes.items()},
+                "rate_limit_wait_seconds": self.rate_limit_wait_seconds,
+                "objectize_seconds": dict(self.objectize_seconds),
+            }
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """
+    A client span per request and a duration histogram, needs the
+    ``opentelemetry-api`` package (``pip install cardda-python[opentelemetry]``).
+    """
+
+    def __init__(self, tracer_provider=None, meter_provider=None) -> None:
+        from opentelemetry import metrics, trace
+        self._trace = trace
+        self._tracer = trace.get_tracer("cardda_python", tracer_provider=tracer_provider)
+        meter = metrics.get_meter("cardda_python", meter_provider=meter_provider)
+        self._duration = meter.create_histogram("http.client.duration", unit="s")
+        self._spans = {}
+
+    def request_start(self, event):
+        self._spans[id(event)] = self._tracer.start_span(
+            f"{event.method} {event.route}",
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={"http.method": event.method, "http.url": event.url, "http.route": event.route},
+        )
+
+    def request_end(self, event):
+        span = self._spans.pop(id(event), None)
+        attributes = {"http.method": event.method, "http.route": event.route}
+        if event.status_code is not None:
+            attributes["http.status_code"] = event.status_code
+        self._duration.record(event.duration, attributes)
+        if span is None:
+            return
+        for key, value in attributes.items():
+            span.set_attribute(key, value)
+        span.set_attribute("cardda.attempts", event.attempts)
+        for phase, seconds in event.phases.items():
+            span.set_attribute(f"cardda.phase.{phase}", seconds)
+        if event.error is not None:
+            span.record_exception(event.error)
+        if event.failed:
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end()
+
+    def retry(self, event, delay):
+        span = self._spans.get(id(event))
+        if span is not None:
+            span.add_event("retry", {"delay": delay, "attempt": event.attempts})
+
+
+class PrometheusInstrumentation(Instrumentation):
+    """
+    Prometheus metrics registered on ``registry``, needs the
+    ``prometheus-client`` package (``pip install cardda-python[prometheus]``).
+    """
+
+    def __init__(self, registry=None, namespace: str = "cardda", buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        import prometheus_client
+        options = {"namespace": namespace}
+        if registry is not None:
+            options["registry"] = registry
+        labels = ["method", "route"]
+        self._latency = prometheus_client.Histogram(
+            "request_duration_seconds", "Cardda API request latency", labels, buckets=buckets, **options
+        )
+        self._phases = prometheus_client.Histogram(
+            "request_phase_seconds", "Cardda API request phases", labels + ["phase"], buckets=buckets, **options
+        )
+        self._in_flight = prometheus_client.Gauge("requests_in_flight", "Cardda API requests in flight", labels, **options)
+        self._errors = prometheus_client.Counter("request_errors", "Failed Cardda API requests", labels, **options)
+        self._retries = prometheus_client.Counter("request_retries", "Retried Cardda API requests", labels, **options)
+        self._cache_hits = prometheus_client.Counter("cache_hits", "Responses served from the cache", labels, **options)
+        self._rate_limit_wait = prometheus_client.Counter(
+            "rate_limit_wait_seconds", "Time spent waiting for the rate limiter", **options
+        )
+
+    def request_start(self, event):
+        self._in_flight.labels(event.method, event.route).inc()
+
+    def request_end(self, event):
+        labels = (event.method, event.route)
+        self._in_flight.labels(*labels).dec()
+        self._latency.labels(*labels).observe(event.duration)
+        for phase, seconds in event.phases.items():
+            self._phases.labels(*labels, phase).observe(seconds)
+        if event.failed:
+            self._errors.labels(*labels).inc()
+
+    def retry(self, event, delay):
+        self._retries.labels(event.method, event.route).inc()
+
+    def cache_hit(self, event):
+        self._cache_hits.labels(event.method, event.route).inc()
+
+    def rate_limit_wait(self, event, seconds):
+        self._rate_limit_wait.inc(seconds)
@@ -0,0 +1,208 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Type
+from cardda_python.resources import BankAccount, BankPayroll, BankRecipient, BankTransaction, BaseResource
+from cardda_python.watermarks import SqliteWatermarkStore
+
+# mirrored resources -> indexed columns besides id, status, transition and updated_at
+MIRRORED = {
+    BankAccount: (),
+    BankRecipient: ("owner_id", "rut", "account_number", "bank_id", "account_type"),
+    BankTransaction: ("sender_id", "recipient_id", "bank_payroll_id"),
+    BankPayroll: ("sender_id",),
+}
+COMMON_COLUMNS = ("status", "transition", "updated_at")
+# kind of BankAccountService.changes -> resource class
+SYNCED = {"recipients": BankRecipient, "transactions": BankTransaction, "payrolls": BankPayroll}
+
+
+class LocalMirror:
+    """
+    Indexed sqlite copy of the banking resources, kept current with the
+    incremental ``BankAccountService.changes`` streams so reports and
+    dashboards query it instead of the API.
+
+    Rows keep the scalar attributes of each resource, nested objects are
+    mirrored in their own table and referenced by id. Watermarks are stored in
+    the same database, so a restarted process resumes where it stopped.
+    """
+
+    def __init__(self, path: str, banking=None) -> None:
+        self.path = path
+        self.banking = banking
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._connection.execute("PRAGMA journal_mode=WAL")
+        self._create_tables()
+        # next to the rows, so they are only ever lost together
+        self.watermarks = SqliteWatermarkStore(path)
+
+    def _create_tables(self) -> None:
+        with self._lock, self._connection:
+            for klass, columns in MIRRORED.items():
+                indexed = COMMON_COLUMNS + columns
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {klass.name} "
+                    f"(id TEXT PRIMARY KEY, {', '.join(f'{column} TEXT' for column in indexed)}, data TEXT NOT NULL)"
+                )
+                for column in indexed:
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {klass.name}_{column} ON {klass.name} ({column})"
+                    )
+
+    def close(self) -> None:
+        self._connection.close()
+        self.watermarks.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # writes
+
+    @staticmethod
+    def _row(resource: BaseResource, columns) -> tuple:
+        nested = type(resource).nested_objects
+        # pending nested json is never built, only what is already loaded is read
+        data = {key: value for key, value in vars(resource).items() if key not in nested}
+        if data.get("id") is None:
+            raise ValueError(f"can't mirror a {type(resource).name} without an id: {data}")
+        values = tuple(None if data.get(column) is None else str(data[column]) for column in COMMON_COLUMNS + columns)
+        return (str(data["id"]),) + values + (json.dumps(data),)
+
+    def upsert(self, resources: Iterable[BaseResource]) -> int:
+        """
+        Stores or replaces resources of any mirrored class, for example the
+        ones received through webhooks.
+        """
+        rows: Dict[type, List[tuple]] = {}
+        for resource in resources:
+            klass = type(resource)
+            rows.setdefault(klass, []).append(self._row(resource, MIRRORED[klass]))
+        with self._lock, self._connection:
+            for klass, values in rows.items():
+                placeholders = ", ".join("?" * (len(MIRRORED[klass]) + len(COMMON_COLUMNS) + 2))
+                self._connection.executemany(
+                    f"INSERT OR REPLACE INTO {klass.name} VALUES ({placeholders})", values
+                )
+        return sum(len(values) for values in rows.values())
+
+    def _upsert_stream(self, resources, batch_size: int = 500) -> int:
+        count = 0
+        batch = []
+        for resource in resources:
+            batch.append(resource)
+            if len(batch) >= batch_size:
+                count += self.upsert(batch)
+                batch = []
+        return count + self.upsert(batch)
+
+    def _accounts_service(self):
+        accounts = self.banking.accounts
+        accounts.watermarks = self.watermarks
+        return accounts
+
+    def sync_accounts(self) -> int:
+        return self.upsert(self.banking.accounts.all())
+
+    def sync(self, account: BankAccount, kinds: Iterable[str] = tuple(SYNCED), sync: bool = False, **data) -> Dict[str, int]:
+        """
+        Mirrors the recipients, transactions and payrolls of an account changed
+        since the previous call, returns how many rows each kind received.
+        ``sync`` sends the ``sync_*`` requests too, what they pull from the
+        bank is mirrored by a later call.
+        """
+        accounts = self._accounts_service()
+        self.upsert([account])
+        return {
+            kind: self._upsert_stream(accounts.changes(account, kind, sync=sync, **data))
+            for kind in kinds
+        }
+
+    # queries
+
+    def _where(self, klass, filters):
+        allowed = set(COMMON_COLUMNS + MIRRORED[klass]) | {"id"}
+        clauses = []
+        values = []
+        for column, value in filters.items():
+            if column not in allowed:
+                raise ValueError(f"{klass.name} can't be filtered by '{column}', indexed columns: {sorted(allowed)}")
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            elif isinstance(value, (list, tuple, set, frozenset)):
+                clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+                values.extend(str(item) for item in value)
+            else:
+                clauses.append(f"{column} = ?")
+                values.append(str(value))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), values
+
+    def query(self, klass: Type[BaseResource], order_by: str = "updated_at", limit: Optional[int] = None,
+              **filters) -> List[BaseResource]:
+        """
+        Mirrored resources of ``klass`` matching every filter, each one an
+        indexed column equal to a value, any of a list of values, or NULL for
+        None.
+        """
+        where, values = self._where(klass, filters)
+        if order_by.lstrip("-") not in set(COMMON_COLUMNS + MIRRORED[klass]) | {"id"}:
+            raise ValueError(f"can't order by '{order_by}'")
+        order = f" ORDER BY {order_by.lstrip('-')} {'DESC' if order_by.startswith('-') else 'ASC'}"
+        sql = f"SELECT data FROM {klass.name}{where}{order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._connection.execute(sql, values).fetchall()
+        return [klass.build(json.loads(row["data"])) for row in rows]
+
+    def count(self, klass: Type[BaseResource], **filters) -> int:
+        where, values = self._where(klass, filters)
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {klass.name}{where}", values).fetchone()[0]
+
+    def get(self, klass: Type[BaseResource], id: Any) -> Optional[BaseResource]:
+        found = self.query(klass, id=id)
+        return found[0] if found else None
+
+    def accounts(self, **filters) -> List[BankAccount]:
+        return self.query(BankAccount, **filters)
+
+    def recipients(self, **filters) -> List[BankRecipient]:
+        return self.query(BankRecipient, **filters)
+
+    def transactions(self, **filters) -> List[BankTransaction]:
+        return self.query(BankTransaction, **filters)
+
+    def payrolls(self, **filters) -> List[BankPayroll]:
+        return self.query(BankPayroll, **filters)
+
+
+class AsyncLocalMirror(LocalMirror):
+    """
+    ``LocalMirror`` synced through an ``AsyncCarddaClient``, queries stay
+    synchronous since they never leave the process.
+    """
+
+    async def sync_accounts(self) -> int:
+        return self.upsert(await self.banking.accounts.all())
+
+    async def sync(self, account: BankAccount, kinds: Iterable[str] = tuple(SYNCED), sync: bool = False, **data) -> Dict[str, int]:
+        accounts = self._accounts_service()
+        self.upsert([account])
+        counts = {}
+        for kind in kinds:
+            batch = []
+            count = 0
+            async for resource in accounts.changes(account, kind, sync=sync, **data):
+                batch.append(resource)
+                if len(batch) >= 500:
+                    count += self.upsert(batch)
+                    batch = []
+            counts[kind] = count + self.upsert(batch)
+        return counts
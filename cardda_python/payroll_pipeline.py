@@ -0,0 +1,147 @@
+import asyncio
+import itertools
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+from cardda_python.batch import BatchResult
+from cardda_python.constants import DEFAULT_BATCH_CONCURRENCY, DEFAULT_PAYROLL_CHUNK_SIZE
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class PayrollProgress:
+    """
+    Counters of a running pipeline, passed to ``on_progress`` after every
+    step of every chunk. ``steps`` counts the chunks that finished each step.
+    """
+    __slots__ = ("chunks", "lines", "steps", "completed_lines", "failed")
+
+    def __init__(self, steps: Sequence[str]) -> None:
+        self.chunks = 0
+        self.lines = 0
+        self.steps = dict.fromkeys(["create", *steps], 0)
+        self.completed_lines = 0
+        self.failed = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"<PayrollProgress chunks={self.chunks} lines={self.lines} "
+            f"completed_lines={self.completed_lines} failed={self.failed} steps={self.steps}>"
+        )
+
+
+class PayrollPipeline:
+    """
+    Creates a large payroll as several payrolls of ``chunk_size`` lines and
+    takes each one through ``steps`` as soon as it is created, so the steps of
+    one chunk run while the next ones are uploaded. At most ``concurrency``
+    chunks are in flight and lines are read lazily, so a generator of lines
+    is never fully loaded.
+
+    Progress only reads the scalar attributes of each payroll, its nested
+    ``bank_transactions`` are never built unless accessed.
+    """
+    # payload key holding the lines of a payroll
+    lines_param = "bank_transactions"
+
+    def __init__(
+        self,
+        service,
+        chunk_size: int = DEFAULT_PAYROLL_CHUNK_SIZE,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        steps: Sequence[str] = ("enroll", "validate_recipients"),
+        on_progress: Optional[Callable[[PayrollProgress], Any]] = None,
+    ) -> None:
+        self.service = service
+        self.chunk_size = chunk_size
+        self.concurrency = max(1, concurrency)
+        self.steps = tuple(steps)
+        self.on_progress = on_progress
+        self.progress = PayrollProgress(self.steps)
+        self._lock = threading.Lock()
+
+    def _payload(self, chunk, payroll_data):
+        return {**payroll_data, self.lines_param: chunk}
+
+    def _advance(self, step: str, chunk=None, error=None) -> None:
+        with self._lock:
+            progress = self.progress
+            if step == "start":
+                progress.chunks += 1
+                progress.lines += len(chunk)
+            elif error is not None:
+                progress.failed += 1
+            else:
+                progress.steps[step] += 1
+                if step == (self.steps[-1] if self.steps else "create"):
+                    progress.completed_lines += len(chunk)
+            if self.on_progress is not None:
+                self.on_progress(progress)
+
+    def _process(self, chunk, payroll_data, step_data) -> BatchResult:
+        payroll = None
+        try:
+            payroll = self.service.create(**self._payload(chunk, payroll_data))
+            self._advance("create", chunk)
+            for step in self.steps:
+                getattr(self.service, step)(payroll, **step_data)
+                self._advance(step, chunk)
+        except Exception as exc:
+            self._advance(None, chunk, error=exc)
+            return BatchResult(chunk, value=payroll, error=exc)
+        return BatchResult(chunk, value=payroll)
+
+    def run(self, lines: Iterable[Dict[str, Any]], payroll_data: Optional[Dict[str, Any]] = None, **step_data) -> List[BatchResult]:
+        """
+        Runs every chunk of ``lines``, created with ``payroll_data`` and with
+        ``step_data`` sent on every step. Returns one ``BatchResult`` per
+        chunk, in order, whose value is the payroll even when a later step
+        failed.
+        """
+        payroll_data = payroll_data or {}
+        futures = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = set()
+            for chunk in chunked(lines, self.chunk_size):
+                if len(in_flight) >= self.concurrency:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                self._advance("start", chunk)
+                future = executor.submit(self._process, chunk, payroll_data, step_data)
+                in_flight.add(future)
+                futures.append(future)
+        return [future.result() for future in futures]
+
+
+class AsyncPayrollPipeline(PayrollPipeline):
+    async def _process(self, chunk, payroll_data, step_data) -> BatchResult:
+        payroll = None
+        try:
+            payroll = await self.service.create(**self._payload(chunk, payroll_data))
+            self._advance("create", chunk)
+            for step in self.steps:
+                await getattr(self.service, step)(payroll, **step_data)
+                self._advance(step, chunk)
+        except Exception as exc:
+            self._advance(None, chunk, error=exc)
+            return BatchResult(chunk, value=payroll, error=exc)
+        return BatchResult(chunk, value=payroll)
+
+    async def run(self, lines: Iterable[Dict[str, Any]], payroll_data: Optional[Dict[str, Any]] = None, **step_data) -> List[BatchResult]:
+        payroll_data = payroll_data or {}
+        tasks = []
+        in_flight = set()
+        for chunk in chunked(lines, self.chunk_size):
+            if len(in_flight) >= self.concurrency:
+                _, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            self._advance("start", chunk)
+            task = asyncio.ensure_future(self._process(chunk, payroll_data, step_data))
+            in_flight.add(task)
+            tasks.append(task)
+        return list(await asyncio.gather(*tasks))
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Client side rate limiter shared by every service of a client.
+
+    Allows ``rate`` requests per second with bursts of up to ``burst``
+    requests. Callers reserve a token and wait until it becomes available, so
+    concurrent callers are spread out instead of all retrying at once.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, clock=time.monotonic) -> None:
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1, rate))
+        self.clock = clock
+        self.waited = 0.0
+        self._tokens = self.burst
+        self._updated_at = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token and returns how many seconds the caller must wait
+        before using it.
+        """
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            wait = max(wait, self._paused_until - now)
+            self.waited += wait
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds every caller back, used when the server answers with a 429.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
@@ -0,0 +1,101 @@
+from typing import Dict, Iterator, Optional
+from cardda_python.reconciliation import recipient_key
+from cardda_python.resources import BankRecipient
+from cardda_python.constants import DEFAULT_PAGE_SIZE, UPDATED_SINCE_PARAM
+
+
+class RecipientIndex:
+    """
+    Every recipient of an owner account, loaded in a single paginated sweep
+    and indexed by ``recipient_key`` so existence and status checks don't need
+    a request each.
+
+    ``refresh`` only requests the recipients updated since the most recent
+    ``updated_at`` seen, so keeping the index current is cheap.
+    """
+
+    def __init__(self, service, owner_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        self._service = service
+        self.owner_id = owner_id
+        self.page_size = page_size
+        self.updated_at = None
+        self._by_key: Dict[tuple, BankRecipient] = {}
+        self._by_id: Dict[str, BankRecipient] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[BankRecipient]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, recipient) -> bool:
+        return recipient_key(recipient) in self._by_key
+
+    def lookup(self, recipient) -> Optional[BankRecipient]:
+        """
+        The indexed recipient with the same key as a payload or ``BankRecipient``.
+        """
+        return self._by_key.get(recipient_key(recipient))
+
+    def status(self, recipient) -> Optional[str]:
+        match = self.lookup(recipient)
+        return None if match is None else match.status
+
+    def add(self, recipient: BankRecipient) -> BankRecipient:
+        """
+        Indexes a recipient, replacing the previous version of the same id.
+        Recipients created or enrolled locally can be added right away
+        instead of waiting for the next refresh.
+        """
+        previous = self._by_id.get(recipient.id)
+        if previous is not None:
+            self._by_key.pop(recipient_key(previous), None)
+        self._by_id[recipient.id] = recipient
+        self._by_key[recipient_key(recipient)] = recipient
+        updated_at = getattr(recipient, "updated_at", None)
+        if updated_at is not None and (self.updated_at is None or updated_at > self.updated_at):
+            self.updated_at = updated_at
+        return recipient
+
+    def clear(self) -> None:
+        self.updated_at = None
+        self._by_key.clear()
+        self._by_id.clear()
+
+    def _params(self, incremental: bool):
+        params = {"owner_id": self.owner_id, "page_size": self.page_size}
+        if incremental and self.updated_at is not None:
+            params[UPDATED_SINCE_PARAM] = self.updated_at
+        return params
+
+    def load(self) -> "RecipientIndex":
+        self.clear()
+        for recipient in self._service.iter_all(**self._params(False)):
+            self.add(recipient)
+        return self
+
+    def refresh(self) -> int:
+        """
+        Fetches the recipients updated since the last load or refresh and
+        returns how many were received.
+        """
+        count = 0
+        for recipient in self._service.iter_all(**self._params(True)):
+            self.add(recipient)
+            count += 1
+        return count
+
+
+class AsyncRecipientIndex(RecipientIndex):
+    async def load(self) -> "AsyncRecipientIndex":
+        self.clear()
+        async for recipient in self._service.iter_all(**self._params(False)):
+            self.add(recipient)
+        return self
+
+    async def refresh(self) -> int:
+        count = 0
+        async for recipient in self._service.iter_all(**self._params(True)):
+            self.add(recipient)
+            count += 1
+        return count
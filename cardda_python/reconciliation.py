@@ -0,0 +1,419 @@
+import asyncio
+import heapq
+import itertools
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple, Union
+import httpx
+from cardda_python.constants import (
+    DEFAULT_BATCH_CONCURRENCY,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_MAX_POLL_INTERVAL,
+    DEFAULT_POLL_BACKOFF,
+    DEFAULT_MAX_ERRORS,
+    DEFAULT_MAX_STALLED_POLLS,
+    RECIPIENT_KEY_FIELDS,
+)
+
+PENDING = "pending"
+SETTLED = "settled"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+# polled max_stalled_polls times in a row without any change, e.g. waiting for
+# an authorization the reconciler doesn't drive
+STUCK = "stuck"
+FINAL_STATES = frozenset([SETTLED, FAILED, TIMED_OUT, STUCK])
+
+RECIPIENT = "recipient"
+TRANSACTION = "transaction"
+
+
+def _normalize(value):
+    if value is None:
+        return None
+    return str(value).strip().upper().replace(".", "")
+
+
+def recipient_key(recipient) -> Tuple:
+    """
+    The canonical, hashable key of a recipient: its rut, account number, bank
+    and account type, normalized so formatting differences like ``12.345.678-9``
+    and ``12345678-9`` map to the same account. Takes a payload dict or a
+    ``BankRecipient``.
+    """
+    if isinstance(recipient, dict):
+        return tuple(_normalize(recipient.get(field)) for field in RECIPIENT_KEY_FIELDS)
+    return tuple(_normalize(getattr(recipient, field, None)) for field in RECIPIENT_KEY_FIELDS)
+
+
+class ReconciliationEntity:
+    """
+    A recipient or transaction driven by a reconciler, ``resource`` holds its
+    last known Cardda state and ``state`` where it is in the pipeline.
+    """
+    __slots__ = (
+        "kind", "payload", "id", "dependency", "resource", "state", "error",
+        "submitted", "interval", "errors", "stalled", "idempotency_key", "key",
+    )
+
+    def __init__(self, kind: str, payload: Dict[str, Any], id: Any = None, dependency=None, key=None) -> None:
+        self.kind = kind
+        self.payload = payload
+        self.key = key
+        self.id = id
+        self.dependency = dependency
+        self.resource = None
+        self.state = PENDING
+        self.error = None
+        self.submitted = False
+        self.interval = 0.0
+        self.errors = 0
+        self.stalled = 0
+        # stable across attempts so a retried create never duplicates
+        self.idempotency_key = str(uuid.uuid4())
+
+    @property
+    def status(self) -> Optional[str]:
+        return getattr(self.resource, "status", None)
+
+    @property
+    def transition(self) -> Optional[str]:
+        return getattr(self.resource, "transition", None)
+
+    @property
+    def final(self) -> bool:
+        return self.state in FINAL_STATES
+
+    def __repr__(self) -> str:
+        return f"<ReconciliationEntity {self.kind} id={self.id} state={self.state} status={self.status}>"
+
+
+class ReconciliationReport:
+    def __init__(self, recipients: List[ReconciliationEntity], transactions: List[ReconciliationEntity]) -> None:
+        self.recipients = recipients
+        self.transactions = transactions
+
+    @property
+    def entities(self) -> List[ReconciliationEntity]:
+        return self.recipients + self.transactions
+
+    @property
+    def ok(self) -> bool:
+        return all(entity.state == SETTLED for entity in self.entities)
+
+    def by_state(self, state: str) -> List[ReconciliationEntity]:
+        return [entity for entity in self.entities if entity.state == state]
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        summary = {RECIPIENT: {}, TRANSACTION: {}}
+        for entity in self.entities:
+            summary[entity.kind][entity.state] = summary[entity.kind].get(entity.state, 0) + 1
+        return summary
+
+
+class BaseReconciler:
+    """
+    Drives batches of recipients and transactions through
+    create -> enroll/enqueue -> settled.
+
+    Every entity advances on its own: it is only polled while it has a
+    pending ``transition`` or is waiting for the bank, with an interval that
+    grows while nothing changes and resets when it does. Entities that reach a
+    final state are never requested again, and transactions start as soon as
+    their recipient is settled. Entities whose status and transition don't
+    change for ``max_stalled_polls`` polls in a row are reported as stuck, so
+    ``run`` returns even without a ``timeout``.
+    """
+    recipient_settled_statuses = frozenset(["approved"])
+    transaction_settled_statuses = frozenset(["enqueued"])
+    failed_statuses = frozenset(["rejected", "failed", "canceled"])
+
+    def __init__(
+        self,
+        banking,
+        bank_key_id: str,
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_MAX_POLL_INTERVAL,
+        backoff: float = DEFAULT_POLL_BACKOFF,
+        max_errors: int = DEFAULT_MAX_ERRORS,
+        max_stalled_polls: Optional[int] = DEFAULT_MAX_STALLED_POLLS,
+        timeout: Optional[float] = None,
+        recipient_index=None,
+        clock=time.monotonic,
+    ) -> None:
+        self.recipients_service = banking.recipients
+        self.transactions_service = banking.transactions
+        self.bank_key_id = bank_key_id
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+        self.max_stalled_polls = max_stalled_polls
+        self.timeout = timeout
+        self.recipient_index = recipient_index
+        self.clock = clock
+        self.recipients = []
+        self.transactions = []
+        self._recipients_by_key = {}
+        self._transactions_by_recipient = {}
+
+    def add_recipient(self, payload: Dict[str, Any], id: Any = None) -> ReconciliationEntity:
+        """
+        Adds a recipient to reconcile, pass the ``id`` of a recipient that
+        already exists in Cardda to resume it instead of creating it. With a
+        ``recipient_index`` that is found by matching the payload, and
+        recipients it already knows as approved are settled without requests.
+
+        Recipients are de-duplicated by ``recipient_key``, adding the same
+        account twice returns the entity added first.
+        """
+        key = recipient_key(payload)
+        entity = self._recipients_by_key.get(key)
+        if entity is None:
+            entity = ReconciliationEntity(RECIPIENT, payload, id=id, key=key)
+            match = None if self.recipient_index is None or id is not None else self.recipient_index.lookup(payload)
+            if match is not None:
+                entity.id = match.id
+                if match.status in self.recipient_settled_statuses and not getattr(match, "transition", None):
+                    entity.resource = match
+                    entity.state = SETTLED
+            self._recipients_by_key[key] = entity
+            self._transactions_by_recipient[key] = []
+            self.recipients.append(entity)
+        elif id is not None and entity.id is None:
+            entity.id = id
+        return entity
+
+    def add_transaction(
+        self,
+        payload: Dict[str, Any],
+        recipient: Union[ReconciliationEntity, Dict[str, Any], None] = None,
+        id: Any = None,
+    ) -> ReconciliationEntity:
+        """
+        Adds a transaction to reconcile. When ``recipient`` is given, an
+        entity or the payload of a recipient to add, the transaction is
+        created once it is settled, using its id as ``recipient_id``.
+        """
+        if isinstance(recipient, dict):
+            recipient = self.add_recipient(recipient)
+        entity = ReconciliationEntity(TRANSACTION, payload, id=id, dependency=recipient)
+        self.transactions.append(entity)
+        if recipient is not None:
+            self._transactions_by_recipient[recipient.key].append(entity)
+        return entity
+
+    def recipient(self, recipient) -> Optional[ReconciliationEntity]:
+        """
+        The recipient entity of a payload or ``BankRecipient``, if added.
+        """
+        return self._recipients_by_key.get(recipient_key(recipient))
+
+    def transactions_of(self, recipient) -> List[ReconciliationEntity]:
+        """
+        The transactions added for a recipient entity, payload or ``BankRecipient``.
+        """
+        key = recipient.key if isinstance(recipient, ReconciliationEntity) else recipient_key(recipient)
+        return self._transactions_by_recipient.get(key, [])
+
+    def report(self) -> ReconciliationReport:
+        return ReconciliationReport(self.recipients, self.transactions)
+
+    def _service(self, entity):
+        return self.recipients_service if entity.kind == RECIPIENT else self.transactions_service
+
+    def _settled_statuses(self, entity):
+        if entity.kind == RECIPIENT:
+            return self.recipient_settled_statuses
+        return self.transaction_settled_statuses
+
+    def _ready(self, entity) -> bool:
+        """
+        Whether the dependency of an entity allows it to start, failing it
+        when the dependency can't settle anymore.
+        """
+        dependency = entity.dependency
+        if dependency is None or dependency.state == SETTLED:
+            return True
+        if dependency.final:
+            entity.state = FAILED
+            entity.error = RuntimeError(f"{dependency.kind} {dependency.id} {dependency.state}")
+        return False
+
+    def _next_call(self, entity):
+        """
+        The service call that moves the entity forward, as (action, fn, args, kwargs).
+        """
+        service = self._service(entity)
+        if entity.resource is None and entity.id is None:
+            payload = {"bank_key_id": self.bank_key_id, **entity.payload}
+            if entity.dependency is not None:
+                payload["recipient_id"] = entity.dependency.id
+            return "create", service.create, (), {"idempotency_key": entity.idempotency_key, **payload}
+        if entity.resource is not None and not entity.submitted and not entity.transition:
+            submit = service.enroll if entity.kind == RECIPIENT else service.enqueue
+            return "submit", submit, (entity.resource,), {"bank_key_id": self.bank_key_id}
+        return "find", service.find, (entity.id,), {}
+
+    def _apply(self, entity, action: str, result) -> Optional[float]:
+        """
+        Stores the outcome of a call and returns in how many seconds the
+        entity must be called again, None once it is final.
+        """
+        previous = (entity.status, entity.transition)
+        if action == "submit":
+            entity.submitted = True
+        else:
+            entity.resource = result
+            entity.id = result.id
+        entity.errors = 0
+
+        if entity.transition:
+            pass
+        elif entity.status in self._settled_statuses(entity):
+            entity.state = SETTLED
+            return None
+        elif entity.status in self.failed_statuses:
+            entity.state = FAILED
+            return None
+        elif not entity.submitted and action != "submit":
+            return 0.0
+
+        if action == "submit" or (entity.status, entity.transition) != previous:
+            entity.stalled = 0
+            entity.interval = self.poll_interval
+        else:
+            entity.stalled += 1
+            if self.max_stalled_polls is not None and entity.stalled >= self.max_stalled_polls:
+                entity.state = STUCK
+                entity.error = RuntimeError(
+                    f"{entity.kind} {entity.id} stayed {entity.status} for {entity.stalled} polls"
+                )
+                return None
+            entity.interval = min(self.max_poll_interval, max(self.poll_interval, entity.interval * self.backoff))
+        return entity.interval
+
+    def _error(self, entity, exc: Exception) -> Optional[float]:
+        entity.error = exc
+        if isinstance(exc, httpx.HTTPStatusError) and 400 <= exc.response.status_code < 500 \
+                and exc.response.status_code != 429:
+            entity.state = FAILED
+            return None
+        entity.errors += 1
+        if entity.errors > self.max_errors:
+            entity.state = FAILED
+            return None
+        entity.interval = min(self.max_poll_interval, max(self.poll_interval, entity.interval * self.backoff))
+        return entity.interval
+
+    def _time_out(self):
+        for entity in self.recipients + self.transactions:
+            if not entity.final:
+                entity.state = TIMED_OUT
+
+
+class Reconciler(BaseReconciler):
+    """
+    Reconciler for the sync ``CarddaClient``. Calls run on a pool of
+    ``concurrency`` threads while a single scheduler keeps track of when each
+    entity is due, so waiting entities never hold a thread.
+    """
+
+    def run(self) -> ReconciliationReport:
+        deadline = None if self.timeout is None else self.clock() + self.timeout
+        counter = itertools.count()
+        queue = []
+        waiting = {}
+        for entity in self.recipients + self.transactions:
+            if entity.final:
+                continue
+            if entity.dependency is not None and not entity.dependency.final:
+                waiting.setdefault(id(entity.dependency), []).append(entity)
+            elif self._ready(entity):
+                heapq.heappush(queue, (0.0, next(counter), entity))
+
+        in_flight = {}
+        # not a with block, leaving it would wait for every running call
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while queue or in_flight:
+                now = self.clock()
+                if deadline is not None and now >= deadline:
+                    break
+                while queue and queue[0][0] <= now and len(in_flight) < self.concurrency:
+                    entity = heapq.heappop(queue)[2]
+                    action, fn, args, kwargs = self._next_call(entity)
+                    in_flight[executor.submit(fn, *args, **kwargs)] = (entity, action)
+
+                # wake up for the next due entity, or only for finished calls
+                # while the pool is full
+                wake_at = queue[0][0] if queue and len(in_flight) < self.concurrency else None
+                if deadline is not None:
+                    wake_at = deadline if wake_at is None else min(wake_at, deadline)
+                timeout = None if wake_at is None else max(0.0, wake_at - self.clock())
+                if not in_flight:
+                    time.sleep(timeout or 0)
+                    continue
+
+                done, _ = wait(list(in_flight), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entity, action = in_flight.pop(future)
+                    try:
+                        delay = self._apply(entity, action, future.result())
+                    except Exception as exc:
+                        delay = self._error(entity, exc)
+                    if delay is not None:
+                        heapq.heappush(queue, (self.clock() + delay, next(counter), entity))
+                        continue
+                    for dependent in waiting.pop(id(entity), []):
+                        if self._ready(dependent):
+                            heapq.heappush(queue, (self.clock(), next(counter), dependent))
+        finally:
+            # calls still running when the deadline hits are left behind,
+            # their entities are reported as timed out
+            executor.shutdown(wait=not in_flight)
+        for entities in waiting.values():
+            for entity in entities:
+                self._ready(entity)
+        self._time_out()
+        return self.report()
+
+
+class AsyncReconciler(BaseReconciler):
+    """
+    Reconciler for the ``AsyncCarddaClient``, every entity is a task and at
+    most ``concurrency`` requests are in flight at once.
+    """
+
+    async def run(self) -> ReconciliationReport:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = {}
+
+        async def drive(entity):
+            dependency = entity.dependency
+            if dependency is not None and id(dependency) in tasks:
+                await asyncio.shield(tasks[id(dependency)])
+            if entity.final or not self._ready(entity):
+                return
+            while True:
+                action, fn, args, kwargs = self._next_call(entity)
+                async with semaphore:
+                    try:
+                        delay = self._apply(entity, action, await fn(*args, **kwargs))
+                    except Exception as exc:
+                        delay = self._error(entity, exc)
+                if delay is None:
+                    return
+                await asyncio.sleep(delay)
+
+        for entity in self.recipients + self.transactions:
+            tasks[id(entity)] = asyncio.ensure_future(drive(entity))
+        try:
+            await asyncio.wait_for(asyncio.gather(*tasks.values()), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._time_out()
+        return self.report()
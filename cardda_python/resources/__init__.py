@@ -3,4 +3,5 @@ from .bank_key import BankKey
 from .bank_payroll import BankPayroll
 from .bank_recipient import BankRecipient
 from .bank_transaction import BankTransaction
-from .base_resource import BaseResource
\ No newline at end of file
+from .base_resource import BaseResource
+from .fields import Field, ValidationError
\ No newline at end of file
@@ -1,4 +1,5 @@
 from cardda_python.resources.base_resource import BaseResource
+from cardda_python.resources.fields import Field
 
 class BankAccount(BaseResource):
     name = 'bank_accounts'
@@ -6,4 +7,12 @@ class BankAccount(BaseResource):
         "recipients": "BankRecipient",
         "bank_transactions": "BankTransaction",
         "bank_payrolls": "BankPayroll",
-    }
\ No newline at end of file
+    }
+    fields = {
+        "id": Field(str, int),
+        "account_number": Field(str, int),
+        "account_type": Field(str, int),
+        "bank_id": Field(str, int),
+        "status": Field(str, int),
+        "transition": Field(str, int),
+    }
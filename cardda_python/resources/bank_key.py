@@ -1,5 +1,10 @@
 from cardda_python.resources.base_resource import BaseResource
+from cardda_python.resources.fields import Field
 
 
 class BankKey(BaseResource):
-    name = 'bank_keys'
\ No newline at end of file
+    name = 'bank_keys'
+    fields = {
+        "id": Field(str, int),
+        "status": Field(str, int),
+    }
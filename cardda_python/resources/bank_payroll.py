@@ -1,4 +1,5 @@
 from cardda_python.resources.base_resource import BaseResource
+from cardda_python.resources.fields import Field
 
 
 class BankPayroll(BaseResource):
@@ -6,4 +7,10 @@ class BankPayroll(BaseResource):
     nested_objects = {
         "sender": "BankAccount",
         "bank_transactions": "BankTransaction"
-    }
\ No newline at end of file
+    }
+    fields = {
+        "id": Field(str, int),
+        "sender_id": Field(str, int),
+        "status": Field(str, int),
+        "transition": Field(str, int),
+    }
@@ -1,4 +1,5 @@
 from cardda_python.resources.base_resource import BaseResource
+from cardda_python.resources.fields import Field
 
 
 class BankRecipient(BaseResource):
@@ -6,4 +7,16 @@ class BankRecipient(BaseResource):
     nested_objects = {
         "owner": "BankAccount",
         "transactions": "BankTransaction"
-    }
\ No newline at end of file
+    }
+    fields = {
+        "id": Field(str, int),
+        "owner_id": Field(str, int),
+        "rut": Field(str, int),
+        "email": Field(str, int),
+        "alias": Field(str, int),
+        "account_number": Field(str, int),
+        "account_type": Field(str, int),
+        "bank_id": Field(str, int),
+        "status": Field(str, int),
+        "transition": Field(str, int),
+    }
@@ -1,4 +1,5 @@
 from cardda_python.resources.base_resource import BaseResource
+from cardda_python.resources.fields import Field
 
 
 class BankTransaction(BaseResource):
@@ -7,4 +8,14 @@ class BankTransaction(BaseResource):
         "sender": "BankAccount",
         "recipient": "BankRecipient",
         "payroll": "BankPayroll"
-    }
\ No newline at end of file
+    }
+    fields = {
+        "id": Field(str, int),
+        "amount": Field(int, float, str),
+        "description": Field(str, int),
+        "sender_id": Field(str, int),
+        "recipient_id": Field(str, int),
+        "bank_payroll_id": Field(str, int),
+        "status": Field(str, int),
+        "transition": Field(str, int),
+    }
@@ -1,66 +1,265 @@
 from abc import ABC, abstractclassmethod
 from typing import Any, Dict
 from importlib import import_module
+from cardda_python.resources.fields import Field, Schema
+from cardda_python.resources.identity_map import current_identity_map
+
+# values of these types are plain attributes, anything else is a nested object
+SCALAR_TYPES = frozenset([int, str, bool])
+
+# loading data must not mark attributes as changed
+_set = object.__setattr__
+_MISSING = object()
 
 
 class BaseResource(ABC):
+    # resource attributes are plain instance attributes and the instance
+    # __dict__ is their only store. Attributes are always set through setattr
+    # so CPython can share the dict keys between instances of the same class.
+    # Nested objects are kept as raw json in _pending until first accessed,
+    # attributes assigned after loading are tracked in _changed and the
+    # session the resource was loaded in, if any, is kept in _identity_map.
+    __slots__ = ("_pending", "_changed", "_identity_map")
+
     allowed_nested_attributes = []
     nested_objects = {}
+    # merged with the fields of every parent class, see Schema
+    fields = {
+        "created_at": Field(str, read_only=True),
+        "updated_at": Field(str, read_only=True),
+    }
+    ignored_attributes = frozenset(["updated_at", "created_at"])
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._schema = Schema(cls)
+        ignored = cls.__dict__.get("ignored_attributes")
+        if ignored is None:
+            cls.ignored_attributes = cls._schema.read_only
+        elif not isinstance(ignored, property):
+            cls.ignored_attributes = frozenset(ignored) | cls._schema.read_only
 
     def __init__(self, json_data: Dict[str, Any]) -> None:
-        self._attributes = []
+        self._pending = None
+        self._changed = None
+        self._identity_map = None
         self.inject_attributes(json_data)
 
-    @property
-    def ignored_attributes(self):
-        return ["updated_at", "created_at"]
-    
+    @classmethod
+    def build(cls, json_data: Dict[str, Any], identity_map=None):
+        """
+        Builds a resource from its json, or updates and returns the canonical
+        instance when a session is active.
+        """
+        if identity_map is None:
+            identity_map = current_identity_map()
+        if identity_map is None:
+            return cls(json_data)
+        return identity_map.load(cls, json_data)
+
+    def __setattr__(self, key, value):
+        _set(self, key, value)
+        if key[0] != "_":
+            if self._changed is None:
+                _set(self, "_changed", {key})
+            else:
+                self._changed.add(key)
+
+    def __getattr__(self, key):
+        # only reached when the regular lookup fails, so materialized
+        # attributes never pay for this
+        pending = self._pending if key[0] != "_" else None
+        raw = pending.get(key, _MISSING) if pending else _MISSING
+        if raw is not _MISSING:
+            # stored before the raw json is dropped, so a thread reading the
+            # same attribute meanwhile finds one of them, and setdefault makes
+            # every thread return the object stored first
+            value = self.__dict__.setdefault(key, self.objectize(key, raw))
+            pending.pop(key, None)
+            if not pending:
+                self._pending = None
+            return value
+        if key[0] != "_" and key in self.__dict__:
+            # built by another thread since the regular lookup failed
+            return self.__dict__[key]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{key}'")
+
+    def __getstate__(self):
+        # the session is left out, its lock and weak references can't be
+        # pickled and a copy is never the canonical instance. _pending and
+        # _changed are copied so materializing one copy leaves the other intact
+        return self.__dict__, {
+            "_pending": dict(self._pending) if self._pending else None,
+            "_changed": set(self._changed) if self._changed else None,
+        }
+
+    def __setstate__(self, state):
+        attributes, slots = state
+        self.__dict__.update(attributes)
+        _set(self, "_pending", slots["_pending"])
+        _set(self, "_changed", slots["_changed"])
+        _set(self, "_identity_map", None)
+
     @property
     @abstractclassmethod
     def name() -> str:
         pass
 
+    @property
+    def _attributes(self):
+        attributes = list(self.__dict__)
+        if self._pending:
+            attributes.extend(k for k in self._pending if k not in self.__dict__)
+        return attributes
+
     def as_json(self, include_nested_obj=False, include_ignored_attr=False):
+        self.materialize()
         json_dict = {}
-        for k in self._attributes:
-            if k in self.ignored_attributes and not include_ignored_attr:
+        ignored_attributes = () if include_ignored_attr else self.ignored_attributes
+        nested = self._schema.nested
+        if not include_nested_obj:
+            nested = nested.intersection(self.allowed_nested_attributes)
+        for k, value in self.__dict__.items():
+            if k in ignored_attributes:
                 continue
-            value = getattr(self, k)
-            if self.is_nested_obj(k) and (k in self.allowed_nested_attributes or include_nested_obj):
-                json_dict[k] = value.as_json() if issubclass(type(value), BaseResource) else value
+            if k in nested:
+                json_dict[k] = self.encode_nested(value)
             else:
                 json_dict[k] = value
         return json_dict
-    
+
+    @property
+    def changed_attributes(self):
+        return frozenset(self._changed or ())
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._changed)
+
+    def mark_changed(self, *keys):
+        """
+        Flags attributes as changed, needed after mutating a nested dict or
+        list in place since that can't be detected.
+        """
+        for key in keys:
+            if self._changed is None:
+                _set(self, "_changed", set())
+            self._changed.add(key)
+
+    def mark_clean(self):
+        self._changed = None
+        return self
+
+    def changes(self):
+        """
+        The json of the attributes changed since the resource was loaded,
+        read only attributes are never included.
+        """
+        if not self._changed:
+            return {}
+        ignored_attributes = self.ignored_attributes
+        return {
+            k: self.encode_nested(self.__dict__[k])
+            for k in self._changed
+            if k in self.__dict__ and k not in ignored_attributes
+        }
+
+    @staticmethod
+    def encode_nested(value):
+        if isinstance(value, BaseResource):
+            return value.as_json()
+        if isinstance(value, list):
+            return [item.as_json() if isinstance(item, BaseResource) else item for item in value]
+        return value
+
     def is_nested_obj(self, key) -> bool:
+        if self._pending and key in self._pending:
+            return True
         try:
-            value = getattr(self, key)
-        except AttributeError:
-            value = None
-        if type(value) in [int, str, bool] or (
-            value == None and key in self._attributes):
-            return False
-        return True
+            value = self.__dict__[key]
+        except KeyError:
+            return True
+        return not (value is None or type(value) in SCALAR_TYPES)
 
     def inject_attributes(self, json_data):
+        self._schema.validate(json_data)
+        nested_objects = self.nested_objects
+        for key, value in json_data.items():
+            if key in nested_objects and value:
+                if self._pending is None:
+                    self._pending = {}
+                self._pending[key] = value
+            else:
+                _set(self, key, value)
+
+    def materialize(self):
+        """
+        Builds every nested object that hasn't been accessed yet.
+        """
+        if self._pending:
+            for key in list(self._pending):
+                if key in self.__dict__:
+                    # assigned by hand, the raw value is stale
+                    del self._pending[key]
+                else:
+                    getattr(self, key)
+            self._pending = None
+        return self
+
+    def merge(self, json_data):
+        """
+        Updates the attributes present in json_data and keeps the rest,
+        attributes changed locally and not saved yet win over the new data.
+        """
+        self._schema.validate(json_data)
+        changed = self._changed or ()
         for key, value in json_data.items():
-            setattr(self, key, self.objectize(key, value))
-            self._attributes.append(key)
-        
+            if key in changed:
+                continue
+            if key in self.nested_objects and value:
+                self.__dict__.pop(key, None)
+                if self._pending is None:
+                    self._pending = {}
+                self._pending[key] = value
+            else:
+                if self._pending:
+                    self._pending.pop(key, None)
+                _set(self, key, value)
+        return self
+
     def overwrite(self, json_data):
-        for attr in self._attributes:
-            delattr(self, attr)
-        self._attributes = []
+        # the instance stays in its session, it is still the canonical one
+        self.__dict__.clear()
+        self._pending = None
+        self._changed = None
         self.inject_attributes(json_data)
         return self
-    
+
     def objectize(self, key: str, value: Any):
-        if key in self.nested_objects.keys() and value:
-            module = import_module("cardda_python.resources")
-            klass = getattr(module, self.nested_objects[key])
+        if key in self.nested_objects and value:
+            klass = self.nested_class(key)
             if isinstance(value, list):
-                return [klass(item) for item in value]
+                # nested objects belong to the session of their parent even
+                # when they are materialized after it ended
+                return [klass.build(item, self._identity_map) for item in value]
             else:
-                return klass(value) 
+                return klass.build(value, self._identity_map)
         else:
-            return value
\ No newline at end of file
+            return value
+
+    @classmethod
+    def nested_class(cls, key: str):
+        # resolved once per class, names can't be imported at definition time
+        # because resources reference each other
+        classes = cls.__dict__.get("_nested_classes")
+        if classes is None:
+            module = import_module("cardda_python.resources")
+            classes = {
+                attr: getattr(module, class_name)
+                for attr, class_name in cls.nested_objects.items()
+            }
+            cls._nested_classes = classes
+        return classes[key]
+
+
+BaseResource._schema = Schema(BaseResource)
@@ -0,0 +1,55 @@
+from typing import Any, Dict
+
+
+class ValidationError(ValueError):
+    pass
+
+
+class Field:
+    """
+    Declares the json types accepted for an attribute of a resource.
+    Attributes are optional and, unless ``nullable`` is False, may be null.
+    ``read_only`` attributes are left out of ``as_json`` by default.
+    """
+    __slots__ = ("types", "nullable", "read_only")
+
+    def __init__(self, *types: type, nullable: bool = True, read_only: bool = False) -> None:
+        self.types = types
+        self.nullable = nullable
+        self.read_only = read_only
+
+    def accepts(self, value: Any) -> bool:
+        if value is None:
+            return self.nullable
+        return not self.types or isinstance(value, self.types)
+
+
+class Schema:
+    """
+    Everything ``BaseResource`` needs to know about the attributes of a class,
+    compiled once when the class is defined instead of on every instance.
+    """
+    __slots__ = ("resource_name", "checks", "nested", "read_only")
+
+    def __init__(self, cls) -> None:
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            fields.update(klass.__dict__.get("fields", {}))
+        for key in cls.nested_objects:
+            fields.setdefault(key, Field(dict, list))
+        self.resource_name = cls.__name__
+        self.checks = tuple((key, field) for key, field in fields.items() if field.types or not field.nullable)
+        self.nested = frozenset(cls.nested_objects)
+        self.read_only = frozenset(key for key, field in fields.items() if field.read_only)
+
+    def validate(self, json_data: Dict[str, Any]) -> None:
+        if not isinstance(json_data, dict):
+            raise ValidationError(
+                f"{self.resource_name} expects a json object, got {type(json_data).__name__}"
+            )
+        for key, field in self.checks:
+            if key in json_data and not field.accepts(json_data[key]):
+                expected = " or ".join(t.__name__ for t in field.types) or "a value"
+                raise ValidationError(
+                    f"{self.resource_name}.{key} expects {expected}, got {json_data[key]!r}"
+                )
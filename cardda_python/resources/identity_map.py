@@ -0,0 +1,79 @@
+import threading
+import weakref
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # python 3.6, sessions are scoped to the thread instead
+    class ContextVar(threading.local):
+        def __init__(self, name, default=None):
+            self.value = default
+
+        def get(self):
+            return self.value
+
+        def set(self, value):
+            token, self.value = self.value, value
+            return token
+
+        def reset(self, token):
+            self.value = token
+
+
+class IdentityMap:
+    """
+    Keeps one canonical instance per (resource name, id). Loading data for a
+    resource that is already known merges it into the existing instance, so
+    every reference to it sees the update.
+
+    Instances are held weakly, resources nobody references anymore are
+    dropped from the map.
+    """
+
+    def __init__(self) -> None:
+        self._resources = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._resources.values()))
+
+    def get(self, name: str, resource_id: Any) -> Optional[Any]:
+        return self._resources.get((name, resource_id))
+
+    def load(self, cls, json_data: Dict[str, Any]):
+        resource_id = json_data.get("id") if isinstance(json_data, dict) else None
+        if resource_id is None:
+            return self._new(cls, json_data)
+        key = (cls.name, resource_id)
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                resource = self._new(cls, json_data)
+                self._resources[key] = resource
+            else:
+                resource.merge(json_data)
+            return resource
+
+
+    def _new(self, cls, json_data):
+        resource = cls(json_data)
+        resource._identity_map = self
+        return resource
+
+
+_current = ContextVar("cardda_identity_map", default=None)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    return _current.get()
+
+
+def activate(identity_map: Optional[IdentityMap]):
+    return _current.set(identity_map)
+
+
+def deactivate(token) -> None:
+    _current.reset(token)
@@ -0,0 +1,89 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+import httpx
+from cardda_python.constants import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_BACKOFF_FACTOR,
+    DEFAULT_MAX_BACKOFF,
+    RETRY_STATUSES,
+    IDEMPOTENT_METHODS,
+    IDEMPOTENCY_KEY_HEADER,
+)
+
+# the request never reached the server, so it is safe to send it again
+# whatever its method is
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request is sent again and how long to wait.
+
+    Only idempotent methods, or requests carrying an ``Idempotency-Key``
+    header, are retried after reaching the server. Waits grow exponentially
+    with full jitter unless the server asks for a ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        jitter: bool = True,
+        retry_statuses=RETRY_STATUSES,
+        idempotent_methods=IDEMPOTENT_METHODS,
+        respect_retry_after: bool = True,
+    ) -> None:
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+        self.respect_retry_after = respect_retry_after
+
+    def is_idempotent(self, method: str, headers: Mapping[str, str]) -> bool:
+        return method in self.idempotent_methods or IDEMPOTENCY_KEY_HEADER in headers
+
+    def should_retry(
+        self,
+        method: str,
+        headers: Mapping[str, str],
+        attempt: int,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None,
+    ) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if error is not None:
+            if isinstance(error, UNSENT_ERRORS):
+                return True
+            return isinstance(error, httpx.TransportError) and self.is_idempotent(method, headers)
+        return response.status_code in self.retry_statuses and self.is_idempotent(method, headers)
+
+    def backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if self.respect_retry_after and response is not None:
+            retry_after = self.retry_after(response)
+            if retry_after is not None:
+                return retry_after
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    @staticmethod
+    def retry_after(response: httpx.Response) -> Optional[float]:
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+DEFAULT_RETRY = RetryPolicy()
@@ -0,0 +1,58 @@
+import json
+from typing import Any
+
+
+class JsonSerializer:
+    """
+    Encodes request bodies to bytes and decodes response bodies from bytes.
+    Subclass it to plug another json library into the client.
+    """
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+
+class OrjsonSerializer(JsonSerializer):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, content: bytes) -> Any:
+        return self._orjson.loads(content)
+
+
+class MsgspecSerializer(JsonSerializer):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, content: bytes) -> Any:
+        return self._decoder.decode(content)
+
+
+def default_serializer() -> JsonSerializer:
+    """
+    The fastest serializer available, orjson or msgspec when installed and
+    the standard library otherwise.
+    """
+    for serializer in (OrjsonSerializer, MsgspecSerializer):
+        try:
+            return serializer()
+        except ImportError:
+            continue
+    return JsonSerializer()
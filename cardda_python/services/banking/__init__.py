@@ -1,5 +1,5 @@
-from .bank_account_service import BankAccountService
-from .bank_key_service import BankKeyService
-from .bank_payroll_service import BankPayrollService
-from .bank_recipient_service import BankRecipientService
-from .bank_transaction_service import BankTransactionService
\ No newline at end of file
+from .bank_account_service import BankAccountService, AsyncBankAccountService
+from .bank_key_service import BankKeyService, AsyncBankKeyService
+from .bank_payroll_service import BankPayrollService, AsyncBankPayrollService
+from .bank_recipient_service import BankRecipientService, AsyncBankRecipientService
+from .bank_transaction_service import BankTransactionService, AsyncBankTransactionService
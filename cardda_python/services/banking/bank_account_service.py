@@ -1,43 +1,220 @@
-from cardda_python.services.base_service import BaseService
+import re
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterator, Optional
+from cardda_python.services.base_service import BaseService, AsyncBaseService
+from cardda_python.services.banking.bank_transaction_service import BankTransactionService, AsyncBankTransactionService
+from cardda_python.services.banking.bank_recipient_service import BankRecipientService, AsyncBankRecipientService
+from cardda_python.services.banking.bank_payroll_service import BankPayrollService, AsyncBankPayrollService
 from cardda_python.resources import BankAccount, BankTransaction, BankRecipient
+from cardda_python.watermarks import WatermarkStore, MemoryWatermarkStore
+from cardda_python.constants import DEFAULT_PAGE_SIZE, UPDATED_SINCE_PARAM
+
+
+ISO_TIMESTAMP = re.compile(
+    r"(\d{4})-(\d\d)-(\d\d)[T ](\d\d):(\d\d):(\d\d)(?:\.(\d+))?\s*(Z|[+-]\d\d:?\d\d)?$"
+)
+
+
+def _timestamp(value) -> Optional[datetime]:
+    """
+    Parses an ISO 8601 ``updated_at``, timestamps without an offset are taken
+    as UTC. None when the value has another format.
+    """
+    match = ISO_TIMESTAMP.match(str(value).strip())
+    if match is None:
+        return None
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    tz = timezone.utc
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        digits = offset[1:].replace(":", "")
+        tz = timezone(sign * timedelta(hours=int(digits[:2]), minutes=int(digits[2:])))
+    microsecond = int((fraction or "0")[:6].ljust(6, "0"))
+    return datetime(int(year), int(month), int(day), int(hour), int(minute), int(second), microsecond, tz)
+
+
+def _advance(watermark, resource):
+    # the watermark keeps the value as the API sent it, it is sent back as is
+    updated_at = getattr(resource, "updated_at", None)
+    if updated_at is None:
+        return watermark
+    if watermark is None:
+        return updated_at
+    new, current = _timestamp(updated_at), _timestamp(watermark)
+    if new is None or current is None:
+        # not ISO 8601, the best that can be done is comparing the text
+        return updated_at if str(updated_at) > str(watermark) else watermark
+    return updated_at if new > current else watermark
+
 
 class BankAccountService(BaseService):
     resource = BankAccount
     methods = ["all", "find"]
+    # kind of synced resource -> (service listing it, param filtering by account)
+    sync_sources = {
+        "transactions": (BankTransactionService, "sender_id"),
+        "recipients": (BankRecipientService, "owner_id"),
+        "payrolls": (BankPayrollService, "sender_id"),
+    }
+
+    def __init__(self, client, watermarks: Optional[WatermarkStore] = None) -> None:
+        super().__init__(client)
+        self.watermarks = MemoryWatermarkStore() if watermarks is None else watermarks
+
+    def _changes_source(self, obj: BankAccount, kind: str, page_size: int):
+        service_class, account_param = self.sync_sources[kind]
+        key = f"{obj.id}:{kind}"
+        watermark = self.watermarks.get(key)
+        params = {account_param: obj.id, "page_size": page_size}
+        if watermark is not None:
+            params[UPDATED_SINCE_PARAM] = watermark
+        return service_class(self._base_client), key, watermark, params
+
+    def changes(self, obj: BankAccount, kind: str, sync: bool = False, page_size: int = DEFAULT_PAGE_SIZE,
+                idempotency_key=None, **data) -> Iterator:
+        """
+        Streams the ``kind`` resources ("transactions", "recipients" or
+        "payrolls") of the account changed since the previous call.
+
+        With ``sync`` the matching ``sync_*`` request is sent first. Cardda
+        runs it in the background, so this stream doesn't wait for it: what
+        it pulls from the bank is streamed by a later call.
 
-    def preauthorize_transactions(self, obj: BankAccount, **data):
-        res = self._client._request("POST", f"/{obj.id}/preauthorize", data=data)
+        The watermark, the latest ``updated_at`` received, is only stored once
+        the stream is fully consumed, so an interrupted sync is resumed from the
+        previous one. Resources updated exactly at the watermark are received
+        again on the next call.
+        """
+        if sync:
+            getattr(self, f"sync_{kind}")(obj, idempotency_key=idempotency_key, **data)
+        service, key, watermark, params = self._changes_source(obj, kind, page_size)
+        for resource in service.iter_all(**params):
+            watermark = _advance(watermark, resource)
+            yield resource
+        if watermark is not None:
+            self.watermarks.set(key, watermark)
+
+    def transaction_changes(self, obj: BankAccount, **kwargs) -> Iterator[BankTransaction]:
+        return self.changes(obj, "transactions", **kwargs)
+
+    def recipient_changes(self, obj: BankAccount, **kwargs) -> Iterator[BankRecipient]:
+        return self.changes(obj, "recipients", **kwargs)
+
+    def payroll_changes(self, obj: BankAccount, **kwargs) -> Iterator:
+        return self.changes(obj, "payrolls", **kwargs)
+
+    def reset_watermark(self, obj: BankAccount, kind: str) -> None:
+        """
+        Makes the next ``changes`` call stream every resource again.
+        """
+        self.watermarks.delete(f"{obj.id}:{kind}")
+
+    def preauthorize_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        res = self._client._request("POST", f"/{obj.id}/preauthorize", data=data, idempotency_key=idempotency_key)
         try:
-            return [ BankTransaction(data) for data in res ]
+            return [ BankTransaction.build(data) for data in res ]
         except:
             return res
         
-    def authorize_transactions(self, obj: BankAccount, **data):
-        return self._client._request("POST", f"/{obj.id}/authorize", data=data)
+    def authorize_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        return self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
 
-    def preauthorize_recipients(self, obj: BankAccount, **data):
-        res = self._client._request("POST", f"/{obj.id}/preauthorize_recipients", data=data)
+    def preauthorize_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        res = self._client._request("POST", f"/{obj.id}/preauthorize_recipients", data=data, idempotency_key=idempotency_key)
         try:
-            return [ BankRecipient(data) for data in res ]
+            return [ BankRecipient.build(data) for data in res ]
         except:
             return res
     
-    def authorize_recipients(self, obj: BankAccount, **data):
-        res = self._client._request("POST", f"/{obj.id}/authorize_recipients", data=data)
+    def authorize_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        res = self._client._request("POST", f"/{obj.id}/authorize_recipients", data=data, idempotency_key=idempotency_key)
         try:
-            return [ BankRecipient(data) for data in res ]
+            return [ BankRecipient.build(data) for data in res ]
         except:
             return res
     
-    def dequeue_transactions(self, obj: BankAccount, **data):
-        res = self._client._request("POST", f"/{obj.id}/dequeue", data=data)
+    def dequeue_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        res = self._client._request("POST", f"/{obj.id}/dequeue", data=data, idempotency_key=idempotency_key)
         return obj
     
-    def sync_transactions(self, obj: BankAccount, **data):
-        return self._client._request("PATCH", f"/{obj.id}/sync_transactions", data=data)
+    def sync_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        return self._client._request("PATCH", f"/{obj.id}/sync_transactions", data=data, idempotency_key=idempotency_key)
 
-    def sync_recipients(self, obj: BankAccount, **data):
-        return self._client._request("PATCH", f"/{obj.id}/sync_recipients", data=data)
+    def sync_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        return self._client._request("PATCH", f"/{obj.id}/sync_recipients", data=data, idempotency_key=idempotency_key)
     
-    def sync_payrolls(self, obj: BankAccount, **data):
-        return self._client._request("PATCH", f"/{obj.id}/sync_payrolls", data=data)
\ No newline at end of file
+    def sync_payrolls(self, obj: BankAccount, idempotency_key=None, **data):
+        return self._client._request("PATCH", f"/{obj.id}/sync_payrolls", data=data, idempotency_key=idempotency_key)
+
+
+class AsyncBankAccountService(AsyncBaseService):
+    resource = BankAccount
+    methods = BankAccountService.methods
+    sync_sources = {
+        "transactions": (AsyncBankTransactionService, "sender_id"),
+        "recipients": (AsyncBankRecipientService, "owner_id"),
+        "payrolls": (AsyncBankPayrollService, "sender_id"),
+    }
+
+    def __init__(self, client, watermarks: Optional[WatermarkStore] = None) -> None:
+        super().__init__(client)
+        self.watermarks = MemoryWatermarkStore() if watermarks is None else watermarks
+    _changes_source = BankAccountService._changes_source
+    reset_watermark = BankAccountService.reset_watermark
+
+    async def changes(self, obj: BankAccount, kind: str, sync: bool = False, page_size: int = DEFAULT_PAGE_SIZE,
+                      idempotency_key=None, **data) -> AsyncIterator:
+        if sync:
+            await getattr(self, f"sync_{kind}")(obj, idempotency_key=idempotency_key, **data)
+        service, key, watermark, params = self._changes_source(obj, kind, page_size)
+        async for resource in service.iter_all(**params):
+            watermark = _advance(watermark, resource)
+            yield resource
+        if watermark is not None:
+            self.watermarks.set(key, watermark)
+
+    def transaction_changes(self, obj: BankAccount, **kwargs) -> AsyncIterator[BankTransaction]:
+        return self.changes(obj, "transactions", **kwargs)
+
+    def recipient_changes(self, obj: BankAccount, **kwargs) -> AsyncIterator[BankRecipient]:
+        return self.changes(obj, "recipients", **kwargs)
+
+    def payroll_changes(self, obj: BankAccount, **kwargs) -> AsyncIterator:
+        return self.changes(obj, "payrolls", **kwargs)
+
+    async def preauthorize_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        res = await self._client._request("POST", f"/{obj.id}/preauthorize", data=data, idempotency_key=idempotency_key)
+        try:
+            return [ BankTransaction.build(data) for data in res ]
+        except:
+            return res
+
+    async def authorize_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        return await self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
+
+    async def preauthorize_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        res = await self._client._request("POST", f"/{obj.id}/preauthorize_recipients", data=data, idempotency_key=idempotency_key)
+        try:
+            return [ BankRecipient.build(data) for data in res ]
+        except:
+            return res
+
+    async def authorize_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        res = await self._client._request("POST", f"/{obj.id}/authorize_recipients", data=data, idempotency_key=idempotency_key)
+        try:
+            return [ BankRecipient.build(data) for data in res ]
+        except:
+            return res
+
+    async def dequeue_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        await self._client._request("POST", f"/{obj.id}/dequeue", data=data, idempotency_key=idempotency_key)
+        return obj
+
+    async def sync_transactions(self, obj: BankAccount, idempotency_key=None, **data):
+        return await self._client._request("PATCH", f"/{obj.id}/sync_transactions", data=data, idempotency_key=idempotency_key)
+
+    async def sync_recipients(self, obj: BankAccount, idempotency_key=None, **data):
+        return await self._client._request("PATCH", f"/{obj.id}/sync_recipients", data=data, idempotency_key=idempotency_key)
+
+    async def sync_payrolls(self, obj: BankAccount, idempotency_key=None, **data):
+        return await self._client._request("PATCH", f"/{obj.id}/sync_payrolls", data=data, idempotency_key=idempotency_key)
\ No newline at end of file
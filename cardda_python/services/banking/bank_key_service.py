@@ -1,6 +1,11 @@
-from cardda_python.services.base_service import BaseService
+from cardda_python.services.base_service import BaseService, AsyncBaseService
 from cardda_python.resources import BankKey
 
 class BankKeyService(BaseService):
     resource = BankKey
-    methods = ["all", "find", "save", "create"]
\ No newline at end of file
+    methods = ["all", "find", "save", "create"]
+
+
+class AsyncBankKeyService(AsyncBaseService):
+    resource = BankKey
+    methods = BankKeyService.methods
\ No newline at end of file
@@ -1,36 +1,78 @@
-from cardda_python.services.base_service import BaseService
+from cardda_python.services.base_service import BaseService, AsyncBaseService
 from cardda_python.resources import BankPayroll
+from cardda_python.payroll_pipeline import PayrollPipeline, AsyncPayrollPipeline
 
 class BankPayrollService(BaseService):
     resource = BankPayroll
     methods = ["all", "find", "save", "create", "delete"]
 
-    def enroll(self, obj: BankPayroll, **data):
-        response = self._client._request("POST", f"/{obj.id}/enroll", data=data)
+    def enroll(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/enroll", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj
 
-    def remove(self, obj: BankPayroll, **data):
-        response = self._client._request("PATCH", f"/{obj.id}/remove", data=data)
+    def remove(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("PATCH", f"/{obj.id}/remove", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj
     
-    def authorize(self, obj: BankPayroll, **data):
-        response = self._client._request("POST", f"/{obj.id}/authorize", data=data)
+    def authorize(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj
         
-    def preauthorize(self, obj: BankPayroll, **data):
-        response = self._client._request("POST", f"/{obj.id}/preauthorize", data=data)
+    def preauthorize(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/preauthorize", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj
     
-    def validate_recipients(self, obj: BankPayroll, **data):
-        response = self._client._request("POST", f"/{obj.id}/validate_recipients", data=data)
+    def validate_recipients(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/validate_recipients", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj  
     
-    def sync(self, obj: BankPayroll, **data):
-        response = self._client._request("POST", f"/{obj.id}/sync", data=data)
+    def sync(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/sync", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
-        return obj
\ No newline at end of file
+        return obj
+
+    def pipeline(self, **options) -> PayrollPipeline:
+        return PayrollPipeline(self, **options)
+
+
+class AsyncBankPayrollService(AsyncBaseService):
+    resource = BankPayroll
+    methods = BankPayrollService.methods
+
+    async def enroll(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/enroll", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def remove(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("PATCH", f"/{obj.id}/remove", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def authorize(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def preauthorize(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/preauthorize", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def validate_recipients(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/validate_recipients", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def sync(self, obj: BankPayroll, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/sync", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    def pipeline(self, **options) -> AsyncPayrollPipeline:
+        return AsyncPayrollPipeline(self, **options)
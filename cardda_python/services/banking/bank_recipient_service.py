@@ -1,16 +1,46 @@
-from cardda_python.services.base_service import BaseService
+from cardda_python.services.base_service import BaseService, AsyncBaseService
 from cardda_python.resources import BankRecipient
+from cardda_python.batch import run_batch, arun_batch
+from cardda_python.recipient_index import RecipientIndex, AsyncRecipientIndex
+from cardda_python.constants import DEFAULT_BATCH_CONCURRENCY, DEFAULT_PAGE_SIZE
 
 class BankRecipientService(BaseService):
     resource = BankRecipient
     methods = ["all", "find", "save", "create"]
 
-    def authorize(self, obj: BankRecipient, **data):
-        response = self._client._request("POST", f"/{obj.id}/authorize", data=data)
+    def authorize(self, obj: BankRecipient, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
         return obj
     
-    def enroll(self, obj: BankRecipient, **data):
-        response = self._client._request("POST", f"/{obj.id}/enroll", data=data)
+    def enroll(self, obj: BankRecipient, idempotency_key=None, **data):
+        response = self._client._request("POST", f"/{obj.id}/enroll", data=data, idempotency_key=idempotency_key)
         obj.overwrite(response)
-        return obj
\ No newline at end of file
+        return obj
+
+    def enroll_many(self, objs, concurrency=DEFAULT_BATCH_CONCURRENCY, **data):
+        return run_batch(lambda obj: self.enroll(obj, **data), objs, concurrency)
+
+    def index(self, owner_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> RecipientIndex:
+        return RecipientIndex(self, owner_id, page_size=page_size).load()
+
+
+class AsyncBankRecipientService(AsyncBaseService):
+    resource = BankRecipient
+    methods = BankRecipientService.methods
+
+    async def authorize(self, obj: BankRecipient, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/authorize", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def enroll(self, obj: BankRecipient, idempotency_key=None, **data):
+        response = await self._client._request("POST", f"/{obj.id}/enroll", data=data, idempotency_key=idempotency_key)
+        obj.overwrite(response)
+        return obj
+
+    async def enroll_many(self, objs, concurrency=DEFAULT_BATCH_CONCURRENCY, **data):
+        return await arun_batch(lambda obj: self.enroll(obj, **data), objs, concurrency)
+
+    async def index(self, owner_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> AsyncRecipientIndex:
+        return await AsyncRecipientIndex(self, owner_id, page_size=page_size).load()
@@ -1,14 +1,37 @@
-from cardda_python.services.base_service import BaseService
+from cardda_python.services.base_service import BaseService, AsyncBaseService
 from cardda_python.resources import BankTransaction
+from cardda_python.resources.base_resource import _set
+from cardda_python.batch import run_batch, arun_batch
+from cardda_python.constants import DEFAULT_BATCH_CONCURRENCY
 
 class BankTransactionService(BaseService):
     resource = BankTransaction
     methods = ["all", "find", "save", "create"]
 
-    def enqueue(self, obj: BankTransaction, **data):
-        obj.raw_data = self._client._request("POST", f"/{obj.id}/enqueue", data=data)
-        return self
+    def enqueue(self, obj: BankTransaction, idempotency_key=None, **data):
+        # the action response is kept as is, it is not a change to save
+        _set(obj, "raw_data", self._client._request("POST", f"/{obj.id}/enqueue", data=data, idempotency_key=idempotency_key))
+        return obj
 
-    def dequeue(self, obj: BankTransaction, **data):
-        obj.raw_data = self._client._request("PATCH", f"/{obj.id}/dequeue", data=data)
+    def enqueue_many(self, objs, concurrency=DEFAULT_BATCH_CONCURRENCY, **data):
+        return run_batch(lambda obj: self.enqueue(obj, **data), objs, concurrency)
+
+    def dequeue(self, obj: BankTransaction, idempotency_key=None, **data):
+        _set(obj, "raw_data", self._client._request("PATCH", f"/{obj.id}/dequeue", data=data, idempotency_key=idempotency_key))
+        return obj
+
+
+class AsyncBankTransactionService(AsyncBaseService):
+    resource = BankTransaction
+    methods = BankTransactionService.methods
+
+    async def enqueue(self, obj: BankTransaction, idempotency_key=None, **data):
+        _set(obj, "raw_data", await self._client._request("POST", f"/{obj.id}/enqueue", data=data, idempotency_key=idempotency_key))
+        return obj
+
+    async def enqueue_many(self, objs, concurrency=DEFAULT_BATCH_CONCURRENCY, **data):
+        return await arun_batch(lambda obj: self.enqueue(obj, **data), objs, concurrency)
+
+    async def dequeue(self, obj: BankTransaction, idempotency_key=None, **data):
+        _set(obj, "raw_data", await self._client._request("PATCH", f"/{obj.id}/dequeue", data=data, idempotency_key=idempotency_key))
         return obj
\ No newline at end of file
@@ -1,17 +1,35 @@
-from typing import Any, Dict, List
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence
 from abc import ABC, abstractclassmethod
-from cardda_python.http_client import HttpClient
+from cardda_python.http_client import BaseHttpClient
 from cardda_python.resources import BaseResource
+from cardda_python.batch import BatchResult, run_batch, arun_batch
+from cardda_python.columnar import Columns
+from cardda_python.constants import PAGE_PARAM, PAGE_SIZE_PARAM, DEFAULT_PAGE_SIZE, DEFAULT_MAX_PAGES, DEFAULT_BATCH_CONCURRENCY
 
 
 class BaseService(ABC):
-    def __init__(self, client: HttpClient) -> None:
+    page_param = PAGE_PARAM
+    page_size_param = PAGE_SIZE_PARAM
+    max_pages = DEFAULT_MAX_PAGES
+    # helpers that are available whenever the basic method they build on is
+    derived_methods = {
+        "iter_all": "all",
+        "create_many": "create",
+        "columns": "all",
+    }
+
+    def __init__(self, client: BaseHttpClient) -> None:
+        # kept to build sibling services that share the same prefix
+        self._base_client = client
         self._client = client.extend(
             base_url= f"{client.base_url}/{self.resource.name}"
         )
     
     def __getattr__(self, attr):
-        if attr not in self.__class__.methods:
+        if self.derived_methods.get(attr, attr) not in self.__class__.methods:
             raise AttributeError(
                 f"{self.__class__.__name__} does not implement '{attr}'"
             )
@@ -27,22 +45,176 @@ class BaseService(ABC):
     def methods() -> List[str]:
         pass
 
+    def _objectize(self, response):
+        """
+        Builds the resources of a response, a list or a single json object.
+        """
+        instrumentation = self._client.instrumentation
+        if instrumentation is None:
+            if isinstance(response, list):
+                return [self.resource.build(data) for data in response]
+            return self.resource.build(response)
+        started = time.perf_counter()
+        if isinstance(response, list):
+            value = [self.resource.build(data) for data in response]
+        else:
+            value = self.resource.build(response)
+        count = len(value) if isinstance(value, list) else 1
+        instrumentation.objectize(self.resource.name, count, time.perf_counter() - started)
+        return value
+
     def _all(self, **params) -> List[BaseResource]:
         response = self._client.all(params)
-        return [self.resource(data) for data in response]
+        return self._objectize(response)
+
+    def _page_params(self, params, page, page_size):
+        return {**params, self.page_param: page, self.page_size_param: page_size}
+
+    def _check_page(self, response, page, page_size, previous_ids):
+        """
+        Returns the items of a page that weren't on the previous one, their
+        ids and whether the next page must be requested.
+
+        Servers ignoring the paging params are detected by a page larger
+        than ``page_size``, or one repeating every id of the previous page.
+        Listings that keep returning new full pages fail after ``max_pages``.
+        """
+        ids = [data.get("id") if isinstance(data, dict) else None for data in response]
+        repeated = [id is not None and id in previous_ids for id in ids]
+        if any(repeated):
+            if all(repeated):
+                return [], set(), False
+            # items shifted by inserts between two requests
+            response = [data for data, seen in zip(response, repeated) if not seen]
+        more = len(ids) == page_size
+        if more and page >= self.max_pages:
+            raise RuntimeError(
+                f"{self.resource.name} still had full pages after {page} pages, "
+                f"the server may be ignoring the '{self.page_param}' param"
+            )
+        return response, {id for id in ids if id is not None}, more
 
-    def _create(self, **data) -> BaseResource:
-        response =  self._client.create(data)
-        return self.resource(response)
+    def _iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, **params) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Lazily walks the raw json pages of the listing. The next page is
+        requested in the background while the current one is being consumed,
+        so at most two pages are held in memory at any time.
+        """
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            page = 1
+            previous_ids = set()
+            pending = executor.submit(self._client.all, self._page_params(params, page, page_size))
+            while pending is not None:
+                response, previous_ids, more = self._check_page(pending.result(), page, page_size, previous_ids)
+                pending = None
+                if more:
+                    page += 1
+                    pending = executor.submit(self._client.all, self._page_params(params, page, page_size))
+                if response:
+                    yield response
+        finally:
+            executor.shutdown(wait=False)
+
+    def _iter_all(self, page_size: int = DEFAULT_PAGE_SIZE, **params) -> Iterator[BaseResource]:
+        for response in self._iter_pages(page_size, **params):
+            for data in response:
+                yield self.resource.build(data)
+
+    def _columns(self, fields: Optional[Sequence[str]] = None, page_size: int = DEFAULT_PAGE_SIZE, **params) -> Columns:
+        """
+        Every page of the listing as columns, without building resources.
+        ``fields`` are attribute names or dotted paths into nested objects
+        such as ``recipient.rut``, by default every scalar attribute.
+        """
+        columns = Columns(fields, exclude=self.resource.nested_objects)
+        for response in self._iter_pages(page_size, **params):
+            columns.extend(response)
+        return columns
+
+    def _create(self, idempotency_key: Optional[str] = None, **data) -> BaseResource:
+        response = self._client.create(data, idempotency_key=idempotency_key)
+        return self._objectize(response)
+
+    def _create_many(self, items: Iterable[Dict[str, Any]], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[BatchResult]:
+        return run_batch(lambda data: self._create(**data), items, concurrency)
 
     def _find(self, id: str) -> BaseResource:
         response = self._client.find(id)
-        return self.resource(response)
+        return self._objectize(response)
     
-    def _save(self, obj: BaseResource):
-        response = self._client.update(obj.id, obj.as_json())
+    def _save(self, obj: BaseResource, idempotency_key: Optional[str] = None):
+        changes = obj.changes()
+        if not changes:
+            return obj
+        response = self._client.update(obj.id, changes, idempotency_key=idempotency_key)
         return obj.overwrite(response)
     
     def _delete(self, obj: BaseResource):
         response = self._client.delete(obj.id)
-        return self.resource(response)
\ No newline at end of file
+        if response is None:
+            # 204 No Content, there is nothing newer than the deleted object
+            return obj
+        return self._objectize(response)
+
+class AsyncBaseService(BaseService):
+    """
+    asyncio flavour of ``BaseService``, meant to be built on top of an
+    ``AsyncHttpClient``. Every basic operation is a coroutine.
+    """
+
+    async def _all(self, **params) -> List[BaseResource]:
+        response = await self._client.all(params)
+        return self._objectize(response)
+
+    async def _iter_pages(self, page_size: int = DEFAULT_PAGE_SIZE, **params) -> AsyncIterator[List[Dict[str, Any]]]:
+        page = 1
+        previous_ids = set()
+        pending = asyncio.ensure_future(self._client.all(self._page_params(params, page, page_size)))
+        try:
+            while pending is not None:
+                response, previous_ids, more = self._check_page(await pending, page, page_size, previous_ids)
+                pending = None
+                if more:
+                    page += 1
+                    pending = asyncio.ensure_future(self._client.all(self._page_params(params, page, page_size)))
+                if response:
+                    yield response
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def _iter_all(self, page_size: int = DEFAULT_PAGE_SIZE, **params) -> AsyncIterator[BaseResource]:
+        async for response in self._iter_pages(page_size, **params):
+            for data in response:
+                yield self.resource.build(data)
+
+    async def _columns(self, fields: Optional[Sequence[str]] = None, page_size: int = DEFAULT_PAGE_SIZE, **params) -> Columns:
+        columns = Columns(fields, exclude=self.resource.nested_objects)
+        async for response in self._iter_pages(page_size, **params):
+            columns.extend(response)
+        return columns
+
+    async def _create(self, idempotency_key: Optional[str] = None, **data) -> BaseResource:
+        response = await self._client.create(data, idempotency_key=idempotency_key)
+        return self._objectize(response)
+
+    async def _create_many(self, items: Iterable[Dict[str, Any]], concurrency: int = DEFAULT_BATCH_CONCURRENCY) -> List[BatchResult]:
+        return await arun_batch(lambda data: self._create(**data), items, concurrency)
+
+    async def _find(self, id: str) -> BaseResource:
+        response = await self._client.find(id)
+        return self._objectize(response)
+
+    async def _save(self, obj: BaseResource, idempotency_key: Optional[str] = None):
+        changes = obj.changes()
+        if not changes:
+            return obj
+        response = await self._client.update(obj.id, changes, idempotency_key=idempotency_key)
+        return obj.overwrite(response)
+
+    async def _delete(self, obj: BaseResource):
+        response = await self._client.delete(obj.id)
+        if response is None:
+            return obj
+        return self._objectize(response)
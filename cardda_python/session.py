@@ -0,0 +1,67 @@
+from typing import Any, List, Optional
+from cardda_python.resources import BaseResource
+from cardda_python.resources.identity_map import IdentityMap, activate, deactivate
+
+
+class Session:
+    """
+    Identity map / unit of work scope for resources.
+
+    While a session is active (``with session:`` or ``async with session:``)
+    every resource built from an api response, nested ones included, is the
+    single canonical instance for its (resource name, id). New data for a
+    known resource is merged into it, so a refresh shows up everywhere it is
+    referenced. Sessions are bound to the current context, concurrent asyncio
+    tasks and threads can use different ones.
+    """
+
+    def __init__(self) -> None:
+        self.identity_map = IdentityMap()
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(activate(self.identity_map))
+        return self
+
+    def __exit__(self, *exc_info):
+        deactivate(self._tokens.pop())
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info):
+        self.__exit__(*exc_info)
+
+    def __len__(self) -> int:
+        return len(self.identity_map)
+
+    def __iter__(self):
+        return iter(self.identity_map)
+
+    def get(self, resource_class, resource_id: Any) -> Optional[BaseResource]:
+        return self.identity_map.get(resource_class.name, resource_id)
+
+    @property
+    def dirty(self) -> List[BaseResource]:
+        return [resource for resource in self.identity_map if resource.is_dirty]
+
+    def flush(self, banking) -> List[BaseResource]:
+        """
+        Saves every resource with unsaved changes through the matching
+        service of ``banking``, resources whose service can't save are left
+        untouched. Returns the saved resources.
+        """
+        saved = []
+        for resource in self.dirty:
+            service = banking.service_for(resource)
+            if "save" in service.methods:
+                saved.append(service.save(resource))
+        return saved
+
+    async def aflush(self, banking) -> List[BaseResource]:
+        saved = []
+        for resource in self.dirty:
+            service = banking.service_for(resource)
+            if "save" in service.methods:
+                saved.append(await service.save(resource))
+        return saved
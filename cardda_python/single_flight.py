@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    Runs one call per key at a time and hands its outcome to every thread
+    that asked for the same key while it was in flight. The outcome is the
+    same object for every caller, so calls should return immutable values
+    such as response bodies.
+
+    Shared by every service of a client, like the cache, so identical GETs
+    sent from different services or threads result in a single request.
+    Nothing is kept once the call returns: a caller arriving afterwards
+    starts a new one.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns ``(value, shared)``, ``shared`` is true when the value came
+        from a call started by another thread. Errors are raised in every
+        caller.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result(), True
+        try:
+            value = call()
+        except BaseException as exc:
+            self._forget(key)
+            future.set_exception(exc)
+            raise
+        self._forget(key)
+        future.set_result(value)
+        return value, False
+
+    def _forget(self, key):
+        # before publishing the outcome, so later callers never get a value
+        # older than their own call
+        with self._lock:
+            del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """
+    ``SingleFlight`` for tasks of a single event loop.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                # shielded so a cancelled waiter doesn't cancel the call
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+            # the task sending the request was cancelled, try again
+            self.coalesced -= 1
+        future = self._calls[key] = asyncio.get_event_loop().create_future()
+        try:
+            value = await call()
+        except asyncio.CancelledError:
+            del self._calls[key]
+            future.cancel()
+            raise
+        except BaseException as exc:
+            del self._calls[key]
+            future.set_exception(exc)
+            # retrieved here, asyncio would log it when nobody was waiting
+            future.exception()
+            raise
+        del self._calls[key]
+        future.set_result(value)
+        return value, False
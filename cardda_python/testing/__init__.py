@@ -0,0 +1 @@
+from .fake_api import FakeCardda
@@ -0,0 +1,284 @@
+import asyncio
+import datetime
+import itertools
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Union
+import httpx
+from cardda_python.constants import (
+    IDEMPOTENCY_KEY_HEADER,
+    PAGE_PARAM,
+    PAGE_SIZE_PARAM,
+    UPDATED_SINCE_PARAM,
+)
+
+COLLECTIONS = ("bank_accounts", "bank_keys", "bank_recipients", "bank_transactions", "bank_payrolls")
+
+# collection -> action -> (transition while pending, status once resolved).
+# Actions without a transition apply their status right away, None keeps it.
+TRANSITIONS = {
+    "bank_recipients": {
+        "enroll": ("enroll", "approved"),
+        "authorize": ("authorize", "approved"),
+    },
+    "bank_transactions": {
+        "enqueue": ("enqueue", "enqueued"),
+        "dequeue": (None, "draft"),
+    },
+    "bank_payrolls": {
+        "enroll": ("enroll", "enrolled"),
+        "validate_recipients": ("validate_recipients", "validated"),
+        "preauthorize": ("preauthorize", "preauthorized"),
+        "authorize": ("authorize", "authorized"),
+        "remove": (None, "removed"),
+        "sync": (None, None),
+    },
+    "bank_accounts": {
+        "preauthorize": (None, None),
+        "authorize": (None, None),
+        "preauthorize_recipients": (None, None),
+        "authorize_recipients": (None, None),
+        "dequeue": (None, None),
+        "sync_transactions": (None, None),
+        "sync_recipients": (None, None),
+        "sync_payrolls": (None, None),
+    },
+}
+
+# attributes without which a create is rejected with a 422
+REQUIRED = {
+    "bank_recipients": ("rut", "account_number"),
+    "bank_transactions": ("amount",),
+}
+
+# attribute holding the id of a related resource -> (key it is embedded as, collection)
+EMBEDDED = {
+    "owner_id": ("owner", "bank_accounts"),
+    "sender_id": ("sender", "bank_accounts"),
+    "recipient_id": ("recipient", "bank_recipients"),
+}
+
+
+class FakeCardda:
+    """
+    In-process fake of the Cardda banking API, served through httpx
+    transports so the real clients run against it unchanged.
+
+    Resources live in memory. Listings are paginated and filtered by any
+    attribute plus ``updated_since``. Actions such as enroll or enqueue set a
+    ``transition`` that resolves ``transition_delay`` seconds later, and
+    ``Idempotency-Key`` replays are answered with the first response.
+    ``latency`` (seconds, or a callable returning them) delays every response
+    and ``error_rate`` answers that fraction of requests with a 503.
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, Callable[[], float]] = 0.0,
+        error_rate: float = 0.0,
+        transition_delay: float = 0.0,
+        seed: Optional[int] = None,
+        clock=time.monotonic,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.transition_delay = transition_delay
+        self.clock = clock
+        self.store: Dict[str, Dict[str, Dict[str, Any]]] = {name: {} for name in COLLECTIONS}
+        self.request_count = 0
+        self.error_count = 0
+        self._random = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._ticks = itertools.count()
+        self._epoch = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        self._replays: Dict[str, httpx.Response] = {}
+        self._lock = threading.RLock()
+
+    # setup
+
+    def add(self, collection: str, **attributes) -> Dict[str, Any]:
+        """
+        Stores a resource as if it had been created, returns its json.
+        """
+        with self._lock:
+            item = self._new(collection, attributes)
+            return self._public(collection, item)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    def async_transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.ahandle)
+
+    def client(self, **options):
+        from cardda_python import CarddaClient
+        return CarddaClient("fake-api-key", transport=self.transport(), **options)
+
+    def async_client(self, **options):
+        from cardda_python import AsyncCarddaClient
+        return AsyncCarddaClient("fake-api-key", transport=self.async_transport(), **options)
+
+    # transports
+
+    def _delay(self) -> float:
+        return self.latency() if callable(self.latency) else self.latency
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            time.sleep(delay)
+        return self._respond(request)
+
+    async def ahandle(self, request: httpx.Request) -> httpx.Response:
+        delay = self._delay()
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(request)
+
+    # api
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.request_count += 1
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.error_count += 1
+                return httpx.Response(503, json={"error": "service unavailable"})
+            key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+            if key is not None and key in self._replays:
+                replay = self._replays[key]
+                return httpx.Response(replay.status_code, content=replay.content, headers=replay.headers)
+            response = self._route(request)
+            if key is not None and response.status_code < 500:
+                self._replays[key] = response
+            return response
+
+    def _route(self, request: httpx.Request) -> httpx.Response:
+        segments = request.url.path.strip("/").split("/")
+        collection = next((s for s in segments if s in self.store), None)
+        if collection is None:
+            return httpx.Response(404, json={"error": "unknown resource"})
+        rest = segments[segments.index(collection) + 1:]
+        data = json.loads(request.content) if request.content else {}
+        if not rest:
+            if request.method == "GET":
+                return self._list(collection, request.url.params)
+            if request.method == "POST":
+                return self._create(collection, data)
+            return httpx.Response(405)
+        item = self.store[collection].get(rest[0])
+        if item is None:
+            return httpx.Response(404, json={"error": "not found"})
+        self._resolve(item)
+        if len(rest) == 1:
+            if request.method == "GET":
+                return httpx.Response(200, json=self._public(collection, item))
+            if request.method == "PATCH":
+                item.update(data)
+                self._touch(item)
+                return httpx.Response(200, json=self._public(collection, item))
+            if request.method == "DELETE":
+                del self.store[collection][item["id"]]
+                return httpx.Response(200, json=self._public(collection, item))
+            return httpx.Response(405)
+        return self._action(collection, item, rest[1], data)
+
+    def _list(self, collection, params) -> httpx.Response:
+        page = int(params.get(PAGE_PARAM, 1))
+        per_page = int(params.get(PAGE_SIZE_PARAM, 0)) or None
+        since = params.get(UPDATED_SINCE_PARAM)
+        filters = {
+            key: value for key, value in params.items()
+            if key not in (PAGE_PARAM, PAGE_SIZE_PARAM, UPDATED_SINCE_PARAM)
+        }
+        matches = []
+        for item in self.store[collection].values():
+            self._resolve(item)
+            if since is not None and item["updated_at"] < since:
+                continue
+            if any(str(item.get(key)) != value for key, value in filters.items()):
+                continue
+            matches.append(item)
+        if per_page is not None:
+            matches = matches[(page - 1) * per_page:page * per_page]
+        return httpx.Response(200, json=[self._public(collection, item) for item in matches])
+
+    def _create(self, collection, data) -> httpx.Response:
+        missing = [key for key in REQUIRED.get(collection, ()) if data.get(key) in (None, "")]
+        if missing:
+            return httpx.Response(422, json={"error": f"missing {', '.join(missing)}"})
+        item = self._new(collection, data)
+        return httpx.Response(201, json=self._public(collection, item))
+
+    def _action(self, collection, item, action, data) -> httpx.Response:
+        transition = TRANSITIONS.get(collection, {}).get(action)
+        if transition is None:
+            return httpx.Response(404, json={"error": f"unknown action {action}"})
+        if item.get("transition"):
+            return httpx.Response(409, json={"error": f"{item['transition']} in progress"})
+        pending, status = transition
+        if pending is None:
+            if status is not None:
+                item["status"] = status
+        else:
+            item["transition"] = pending
+            item["_target"] = status
+            item["_resolves_at"] = self.clock() + self.transition_delay
+        self._touch(item)
+        if collection == "bank_accounts":
+            return httpx.Response(200, json=[])
+        return httpx.Response(200, json=self._public(collection, item))
+
+    # storage
+
+    def _now(self) -> str:
+        # strictly increasing, so updated_since never misses a change
+        moment = self._epoch + datetime.timedelta(microseconds=next(self._ticks))
+        return moment.isoformat().replace("+00:00", "Z")
+
+    def _touch(self, item) -> None:
+        item["updated_at"] = self._now()
+
+    def _new(self, collection, data) -> Dict[str, Any]:
+        now = self._now()
+        item = {
+            "status": "draft",
+            "transition": None,
+            **data,
+            "id": str(data.get("id") or f"{collection[5]}{next(self._ids)}"),
+            "created_at": now,
+            "updated_at": now,
+        }
+        if collection == "bank_payrolls":
+            item["bank_transactions"] = [
+                self._new("bank_transactions", {**line, "bank_payroll_id": item["id"]})["id"]
+                for line in data.get("bank_transactions", [])
+            ]
+        self.store[collection][item["id"]] = item
+        return item
+
+    def _resolve(self, item) -> None:
+        resolves_at = item.get("_resolves_at")
+        if resolves_at is not None and self.clock() >= resolves_at:
+            if item["_target"] is not None:
+                item["status"] = item["_target"]
+            item["transition"] = None
+            item["_resolves_at"] = None
+            self._touch(item)
+
+    def _public(self, collection, item, embed=True) -> Dict[str, Any]:
+        public = {key: value for key, value in item.items() if key[0] != "_"}
+        if not embed:
+            return public
+        for key, (attribute, related) in EMBEDDED.items():
+            related_item = self.store[related].get(item.get(key)) if item.get(key) is not None else None
+            if related_item is not None:
+                public[attribute] = self._public(related, related_item, embed=False)
+        if collection == "bank_payrolls":
+            transactions = self.store["bank_transactions"]
+            public["bank_transactions"] = [
+                self._public("bank_transactions", transactions[id], embed=False)
+                for id in item["bank_transactions"] if id in transactions
+            ]
+        return public
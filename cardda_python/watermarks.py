@@ -0,0 +1,114 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class WatermarkStore(ABC):
+    """
+    Remembers up to where each incremental sync got, as an opaque string per
+    key (the latest ``updated_at`` seen, or a cursor).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+
+class MemoryWatermarkStore(WatermarkStore):
+    def __init__(self) -> None:
+        self._values: Dict[str, str] = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        self._values[key] = value
+
+    def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+
+class FileWatermarkStore(WatermarkStore):
+    """
+    Keeps the watermarks in a json file, rewritten atomically on every change
+    so a crash never leaves it half written.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as file:
+                self._values = json.load(file)
+        except FileNotFoundError:
+            self._values = {}
+
+    def get(self, key: str) -> Optional[str]:
+        return self._values.get(key)
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._values[key] = value
+            self._write()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._values.pop(key, None) is not None:
+                self._write()
+
+    def _write(self) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".watermarks")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(self._values, file)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+class SqliteWatermarkStore(WatermarkStore):
+    """
+    Keeps the watermarks in a ``watermarks`` table of a sqlite database,
+    which may be shared with the rest of the application data.
+    """
+
+    def __init__(self, path: str, table: str = "watermarks") -> None:
+        self.table = table
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(f"SELECT value FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        self._connection.close()
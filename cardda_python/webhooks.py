@@ -0,0 +1,281 @@
+import asyncio
+import fnmatch
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from cardda_python.resources import (
+    BankAccount,
+    BankKey,
+    BankPayroll,
+    BankRecipient,
+    BankTransaction,
+    BaseResource,
+)
+from cardda_python.serializers import JsonSerializer, default_serializer
+from cardda_python.constants import WEBHOOK_SIGNATURE_HEADER, WEBHOOK_TOLERANCE, WEBHOOK_DEDUP_WINDOW
+
+# resource of an event, from the prefix of its type ("bank_transaction.updated")
+RESOURCE_CLASSES = {
+    klass.name[:-1]: klass
+    for klass in (BankAccount, BankKey, BankPayroll, BankRecipient, BankTransaction)
+}
+
+
+class WebhookError(ValueError):
+    pass
+
+
+class SignatureError(WebhookError):
+    pass
+
+
+class Event:
+    """
+    A Cardda event, ``resource`` is its payload built as the matching
+    resource class so it updates the canonical instance of an active session.
+    """
+    __slots__ = ("id", "type", "resource", "data")
+
+    def __init__(self, id: str, type: str, resource: Optional[BaseResource], data: Dict[str, Any]) -> None:
+        self.id = id
+        self.type = type
+        self.resource = resource
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f"<Event {self.type} id={self.id}>"
+
+
+class SignatureScheme:
+    """
+    How deliveries are signed. The signing scheme of Cardda webhooks isn't
+    published, so this default is an assumption modeled on common practice:
+    ``t=<unix timestamp>,v1=<hex hmac-sha256 of "<timestamp>.<body>">``.
+    Subclass it, overriding ``sign`` and ``verify``, when the header you
+    receive has another format.
+    """
+
+    def sign(self, secret: str, body: bytes, timestamp: int) -> str:
+        digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+        return f"t={timestamp},v1={digest}"
+
+    def verify(self, secret: str, body: bytes, signature: str) -> Optional[int]:
+        """
+        Returns the timestamp of a valid signature, None when the scheme has
+        no timestamp, and raises ``SignatureError`` otherwise.
+        """
+        try:
+            parts = dict(part.split("=", 1) for part in signature.split(","))
+            timestamp = int(parts["t"])
+            expected = self.sign(secret, body, timestamp)
+            valid = hmac.compare_digest(expected, f"t={timestamp},v1={parts['v1']}")
+        except (KeyError, ValueError):
+            raise SignatureError("malformed signature")
+        if not valid:
+            raise SignatureError("invalid signature")
+        return timestamp
+
+
+def sign(secret: str, body: bytes, timestamp: int) -> str:
+    """
+    The signature header value for a body with the default, assumed,
+    ``SignatureScheme``. Useful to test receivers.
+    """
+    return SignatureScheme().sign(secret, body, timestamp)
+
+
+class WebhookReceiver:
+    """
+    Verifies, parses and dispatches Cardda webhook deliveries.
+
+    Subscribers are called with every ``Event`` whose type matches their
+    pattern (``"bank_transaction.*"``), and ``queue`` returns asyncio queues
+    fed from any thread. Deliveries are retried by Cardda, so events already
+    seen are acknowledged without being dispatched again.
+
+    The signature is read from ``signature_header`` and checked with
+    ``scheme``, both defaults are assumptions, see ``SignatureScheme``.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        tolerance: Optional[float] = WEBHOOK_TOLERANCE,
+        signature_header: str = WEBHOOK_SIGNATURE_HEADER,
+        serializer: Optional[JsonSerializer] = None,
+        clock=time.time,
+        scheme: Optional[SignatureScheme] = None,
+    ) -> None:
+        self.secret = secret
+        self.scheme = scheme or SignatureScheme()
+        self.tolerance = tolerance
+        self.signature_header = signature_header
+        self.serializer = serializer or default_serializer()
+        self.clock = clock
+        self._subscribers = []
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._latest = None
+
+    def verify(self, body: bytes, signature: Optional[str]) -> None:
+        if not signature:
+            raise SignatureError("missing signature")
+        timestamp = self.scheme.verify(self.secret, body, signature)
+        if timestamp is not None and self.tolerance is not None and abs(self.clock() - timestamp) > self.tolerance:
+            raise SignatureError("signature timestamp outside the tolerance")
+
+    def parse(self, body: bytes) -> Event:
+        try:
+            payload = self.serializer.loads(body)
+            event_type = payload["type"]
+            data = payload.get("data") or {}
+        except (KeyError, TypeError, ValueError) as exc:
+            raise WebhookError(f"malformed event: {exc}")
+        if not isinstance(event_type, str) or not event_type:
+            raise WebhookError(f"malformed event: type must be a non empty string, got {event_type!r}")
+        if not isinstance(payload.get("id"), (str, int, type(None))):
+            raise WebhookError(f"malformed event: invalid id {payload.get('id')!r}")
+        klass = RESOURCE_CLASSES.get(event_type.split(".", 1)[0])
+        try:
+            resource = klass.build(data) if klass is not None and data else None
+        except ValueError as exc:
+            raise WebhookError(f"invalid {event_type} payload: {exc}")
+        return Event(payload.get("id"), event_type, resource, data)
+
+    def subscribe(self, callback: Callable[[Event], Any], pattern: str = "*") -> Callable[[], None]:
+        """
+        Calls ``callback`` with every event whose type matches ``pattern``,
+        returns a function that removes the subscription.
+        """
+        subscription = (pattern, callback)
+        self._subscribers.append(subscription)
+        return lambda: self._subscribers.remove(subscription)
+
+    def queue(self, pattern: str = "*", maxsize: int = 0, loop=None) -> "asyncio.Queue[Event]":
+        """
+        An asyncio queue of the events matching ``pattern``. Must be created
+        from the loop that consumes it, events are put on it thread safely.
+        """
+        loop = loop or asyncio.get_event_loop()
+        queue = asyncio.Queue(maxsize=maxsize)
+        self.subscribe(lambda event: loop.call_soon_threadsafe(queue.put_nowait, event), pattern)
+        return queue
+
+    def wait_for(self, predicate: Callable[[Event], bool], timeout: Optional[float] = None) -> Optional[Event]:
+        """
+        Blocks until an event matching ``predicate`` is dispatched and returns
+        it, or None after ``timeout`` seconds. Meant for worker threads that
+        would otherwise poll with ``find``.
+        """
+        matched = []
+
+        def match(event):
+            if not matched and predicate(event):
+                matched.append(event)
+
+        unsubscribe = self.subscribe(match)
+        try:
+            with self._condition:
+                self._condition.wait_for(lambda: matched, timeout)
+        finally:
+            unsubscribe()
+        return matched[0] if matched else None
+
+    def dispatch(self, event: Event) -> bool:
+        """
+        Calls the subscribers of an event, returns False when it was already
+        dispatched. When a subscriber raises the event is not recorded, so a
+        redelivery runs every subscriber again.
+        """
+        with self._lock:
+            if event.id is not None:
+                if event.id in self._seen:
+                    return False
+                self._seen[event.id] = None
+                if len(self._seen) > WEBHOOK_DEDUP_WINDOW:
+                    self._seen.popitem(last=False)
+        try:
+            for pattern, callback in list(self._subscribers):
+                if fnmatch.fnmatchcase(event.type, pattern):
+                    callback(event)
+        except BaseException:
+            if event.id is not None:
+                with self._lock:
+                    self._seen.pop(event.id, None)
+            raise
+        with self._condition:
+            self._condition.notify_all()
+        return True
+
+    def handle(self, body: bytes, headers) -> Event:
+        """
+        Verifies, parses and dispatches a delivery, raising ``SignatureError``
+        or ``WebhookError`` when it must be rejected.
+        """
+        self.verify(body, _header(headers, self.signature_header))
+        event = self.parse(body)
+        self.dispatch(event)
+        return event
+
+    def _respond(self, body: bytes, headers):
+        try:
+            self.handle(body, headers)
+        except SignatureError as exc:
+            return 401, str(exc)
+        except WebhookError as exc:
+            return 400, str(exc)
+        except Exception as exc:
+            # a 5xx makes Cardda deliver the event again
+            return 500, f"subscriber failed: {type(exc).__name__}"
+        return 204, ""
+
+    def wsgi(self, environ, start_response):
+        """
+        WSGI application accepting deliveries on any path.
+        """
+        if environ["REQUEST_METHOD"] != "POST":
+            status, message = 405, "method not allowed"
+        else:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+            body = environ["wsgi.input"].read(length)
+            headers = {
+                key[5:].replace("_", "-"): value
+                for key, value in environ.items() if key.startswith("HTTP_")
+            }
+            status, message = self._respond(body, headers)
+        reason = {204: "No Content", 400: "Bad Request", 401: "Unauthorized", 405: "Method Not Allowed", 500: "Internal Server Error"}[status]
+        start_response(f"{status} {reason}", [("Content-Type", "text/plain")])
+        return [message.encode()]
+
+    async def asgi(self, scope, receive, send):
+        """
+        ASGI application accepting deliveries on any path, subscribers run on
+        the event loop.
+        """
+        if scope["type"] != "http":
+            return
+        if scope["method"] != "POST":
+            status, message = 405, "method not allowed"
+        else:
+            chunks = []
+            while True:
+                received = await receive()
+                chunks.append(received.get("body", b""))
+                if not received.get("more_body"):
+                    break
+            headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+            status, message = self._respond(b"".join(chunks), headers)
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": message.encode()})
+
+
+def _header(headers, name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
@@ -2,7 +2,7 @@ from models import WireTransfer
 from .base_worker import BaseWorker
 import os
 from httpx import HTTPStatusError
-import json
+from cardda_python.reconciliation import recipient_key
 import time
 
 class TransitionPendingException(Exception):
@@ -25,6 +25,10 @@ class TransactionsWorker(BaseWorker):
         self._recipients = []
         self.transactions_metadata = {}
         self.recipients_metadata = {}
+        # recipient_key -> position in self.recipients / its transactions
+        self.recipients_index = {}
+        self.recipient_transactions = {}
+        self.cardda_recipients = None
         self.load_transactions()
     @property
     def transactions(self):
@@ -45,16 +49,24 @@ class TransactionsWorker(BaseWorker):
                 "cardda_status": None,
                 "recipient": None
             }
-        # store unique recipients
-        unique_recipients = { json.dumps(self.parse_recipient(db_tx)) for db_tx in self.transactions}
-        self.recipients = list(map(lambda r: json.loads(r), unique_recipients))
+        # store unique recipients, grouping the transactions of each one
+        unique_recipients = {}
+        self.recipient_transactions = {}
+        for db_tx in self.transactions:
+            recipient = self.parse_recipient(db_tx)
+            key = recipient_key(recipient)
+            unique_recipients.setdefault(key, recipient)
+            self.recipient_transactions.setdefault(key, []).append(db_tx)
+        self.recipients = list(unique_recipients.values())
 
     @recipients.setter
     def recipients(self, new_recipients):
         self._recipients = new_recipients
         self.recipients_metadata = {}
+        self.recipients_index = {}
         # initialize metadata
         for idx, rec in enumerate(self._recipients):
+            self.recipients_index[recipient_key(rec)] = idx
             self.recipients_metadata[idx] = {
                 "cardda_id": None,
                 "cardda_status": None
@@ -84,6 +96,12 @@ class TransactionsWorker(BaseWorker):
         high level description of the tasks to be completed
         """
 
+        # one sweep over the owner recipients, then only what changed since
+        if self.cardda_recipients is None:
+            self.cardda_recipients = self.recipients_service.index(self.bank_account_id)
+        else:
+            self.cardda_recipients.refresh()
+
         # enroll recipients
         should_wait_for_transitions = False
         for recipient in self.recipients:
@@ -116,19 +134,14 @@ class TransactionsWorker(BaseWorker):
 
     def validate_recipient(self, recipient):
         # to make it faster
-        if self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] == self.RECIPIENT_ENROLLED_STATUS:  return True 
+        if self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] == self.RECIPIENT_ENROLLED_STATUS:  return True 
 
-        # query cardda to check the recipient
-        recipient_query = {
-            "owner_id": self.bank_account_id,
-            **recipient
-        }
-        response = self.recipients_service.all(**recipient_query)
-        if len(response) > 0:
+        # check the recipient against the local index of the owner recipients
+        recipient_match = self.cardda_recipients.lookup(recipient)
+        if recipient_match is not None:
             # store metadata
-            recipient_match = response[0]
-            self.recipients_metadata[self.recipients.index(recipient)]["cardda_id"] = recipient_match.id
-            self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] = recipient_match.status
+            self.recipients_metadata[self.recipient_index(recipient)]["cardda_id"] = recipient_match.id
+            self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] = recipient_match.status
             # check status and transitions
             if recipient_match.transition:
                 raise TransitionPendingException()
@@ -138,17 +151,17 @@ class TransactionsWorker(BaseWorker):
     
     def enroll_recipient(self, recipient):
         # if invalid do not wast time retrying
-        if self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] == self.RECIPIENT_INVALID_STATUS: return
+        if self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] == self.RECIPIENT_INVALID_STATUS: return
 
-        if self.recipients_metadata[self.recipients.index(recipient)]["cardda_id"]:
+        if self.recipients_metadata[self.recipient_index(recipient)]["cardda_id"]:
             print("enrolling")
             # enroll if draft
-            cardda_recipient = self.recipients_service.find(self.recipients_metadata[self.recipients.index(recipient)]["cardda_id"])
+            cardda_recipient = self.recipients_service.find(self.recipients_metadata[self.recipient_index(recipient)]["cardda_id"])
             enroll_query = {
                     "bank_key_id":self.bank_key_id,
                 }
             self.recipients_service.enroll(cardda_recipient, **enroll_query)
-            self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] = cardda_recipient.status
+            self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] = cardda_recipient.status
             raise TransitionPendingException()
             # authorize if bank requires it
         else:
@@ -160,12 +173,12 @@ class TransactionsWorker(BaseWorker):
             }
             try:
                 cardda_recipient = self.recipients_service.create(**recipient_payload)
-                self.recipients_metadata[self.recipients.index(recipient)]["cardda_id"] = cardda_recipient.id
-                self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] = cardda_recipient.status
+                self.recipients_metadata[self.recipient_index(recipient)]["cardda_id"] = cardda_recipient.id
+                self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] = cardda_recipient.status
                 raise TransitionPendingException()
             except HTTPStatusError as exc:
                  if 400 <= exc.response.status_code < 500:
-                     self.recipients_metadata[self.recipients.index(recipient)]["cardda_status"] = self.RECIPIENT_INVALID_STATUS
+                     self.recipients_metadata[self.recipient_index(recipient)]["cardda_status"] = self.RECIPIENT_INVALID_STATUS
                  else:
                      print(exc)
 
@@ -240,7 +253,7 @@ class TransactionsWorker(BaseWorker):
             "description": tx.commentary,
             "amount": tx.amount,
             "sender_id": self.bank_account_id,
-            "recipient_id": self.recipients_metadata[self.recipients.index(recipient)]["cardda_id"]
+            "recipient_id": self.recipients_metadata[self.recipient_index(recipient)]["cardda_id"]
         }
 
     def parse_recipient(self, tx):
@@ -269,5 +282,8 @@ class TransactionsWorker(BaseWorker):
         """
         return account_type_str
 
+    def recipient_index(self, recipient):
+        return self.recipients_index[recipient_key(recipient)]
+
     def transactions_of_recipient(self, recipient):
-        return [db_tx for db_tx in self.transactions if json.dumps(self.parse_recipient(db_tx)) == json.dumps(recipient)]
\ No newline at end of file
+        return self.recipient_transactions.get(recipient_key(recipient), [])
@@ -1,3 +1,6 @@
+import copy
+import threading
+import time
 import unittest
 from cardda_python.resources import BaseResource, BankAccount
 
@@ -46,3 +49,67 @@ class TestBaseResource(unittest.TestCase):
         self.assertDictEqual(resource.as_json(), new_data)
 
 
+    def test_attributes(self):
+        resource = SomeResource({**SOME_RESOURCE_AS_JSON, "name": "some_name", "created_at": "today"})
+
+        self.assertEqual(resource.name, "some_name")
+        self.assertEqual(SomeResource.name, "something")
+        self.assertEqual(resource._attributes, [*SOME_RESOURCE_AS_JSON.keys(), "name", "created_at"])
+        self.assertNotIn("created_at", resource.as_json())
+        self.assertEqual(resource.as_json(include_ignored_attr=True)["created_at"], "today")
+
+    def test_lazy_nested_objects(self):
+        resource = SomeResource({**SOME_RESOURCE_AS_JSON, "other_object": {"custom_id": "custom_id_value"}})
+
+        self.assertNotIn("other_object", resource.__dict__)
+        self.assertIn("other_object", resource._attributes)
+        self.assertTrue(resource.is_nested_obj("other_object"))
+
+        nested = resource.other_object
+        self.assertIsInstance(nested, BankAccount)
+        self.assertIs(resource.other_object, nested)
+        self.assertIsNone(resource._pending)
+
+    def test_lazy_nested_objects_across_threads(self):
+        class SlowResource(SomeResource):
+            def objectize(self, key, value):
+                time.sleep(0.01)
+                return super().objectize(key, value)
+
+        resource = SlowResource({"id": "1", "other_object": {"id": "2"}})
+        results, errors = [], []
+
+        def read():
+            try:
+                results.append(resource.other_object)
+            except AttributeError as exc:
+                errors.append(exc)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len({id(result) for result in results}), 1)
+        self.assertIsNone(resource._pending)
+
+    def test_dirty_tracking(self):
+        data = copy.deepcopy(SOME_RESOURCE_AS_JSON)
+        resource = SomeResource({**data, "other_object": {"custom_id": "custom_id_value"}, "created_at": "today"})
+        self.assertFalse(resource.is_dirty)
+
+        resource.other_object
+        resource.some_field = "updated_value"
+        resource.created_at = "tomorrow"
+        self.assertEqual(resource.changed_attributes, frozenset(["some_field", "created_at"]))
+        self.assertEqual(resource.changes(), {"some_field": "updated_value"})
+
+        resource.nested_object["nested_field"] = "updated_nested_value"
+        resource.mark_changed("nested_object")
+        self.assertEqual(resource.changes()["nested_object"], {"nested_field": "updated_nested_value"})
+
+        resource.overwrite(SOME_RESOURCE_AS_JSON)
+        self.assertFalse(resource.is_dirty)
+        self.assertEqual(resource.changes(), {})
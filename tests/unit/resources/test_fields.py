@@ -0,0 +1,50 @@
+import unittest
+from cardda_python.resources import BankAccount, BankRecipient, BankTransaction, BaseResource, Field, ValidationError
+
+
+class SomeResource(BaseResource):
+    name = "something"
+    nested_objects = {"items": "BankTransaction"}
+    fields = {
+        "id": Field(str, nullable=False),
+        "secret": Field(str, read_only=True),
+    }
+
+
+class TestFields(unittest.TestCase):
+    def test_validation(self):
+        self.assertRaises(ValidationError, lambda: SomeResource({"id": None}))
+        self.assertRaises(ValidationError, lambda: SomeResource({"id": "1", "secret": 1}))
+        self.assertRaises(ValidationError, lambda: SomeResource({"id": "1", "items": "not a list"}))
+        self.assertRaises(ValidationError, lambda: SomeResource([{"id": "1"}]))
+        self.assertRaises(ValidationError, lambda: BankTransaction({"id": "1", "amount": ["2000"]}))
+
+    def test_numeric_identifiers_are_accepted(self):
+        recipient = BankRecipient({"id": 1, "bank_id": 1, "account_number": 12345, "rut": 11111111})
+        account = BankAccount({"id": 1, "account_number": 12345, "bank_id": 1, "status": 1})
+
+        self.assertEqual((recipient.bank_id, account.account_number), (1, 12345))
+        self.assertRaises(ValidationError, lambda: BankRecipient({"id": "1", "bank_id": {"id": 1}}))
+
+    def test_undeclared_attributes_are_kept(self):
+        resource = SomeResource({"id": "1", "anything": {"goes": True}})
+
+        self.assertEqual(resource.anything, {"goes": True})
+
+    def test_schema_is_inherited(self):
+        self.assertEqual(SomeResource._schema.read_only, frozenset(["created_at", "updated_at", "secret"]))
+        self.assertEqual(SomeResource.ignored_attributes, SomeResource._schema.read_only)
+        self.assertEqual(SomeResource._schema.nested, frozenset(["items"]))
+
+    def test_as_json_encodes_nested_lists(self):
+        account = BankAccount({
+            "id": "1",
+            "created_at": "today",
+            "bank_transactions": [{"id": "2", "amount": 100, "updated_at": "today"}],
+        })
+
+        self.assertEqual(
+            account.as_json(include_nested_obj=True),
+            {"id": "1", "bank_transactions": [{"id": "2", "amount": 100}]},
+        )
+        self.assertIsInstance(account.as_json()["bank_transactions"][0], BankTransaction)
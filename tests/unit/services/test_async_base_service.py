@@ -0,0 +1,173 @@
+import asyncio
+import json
+import unittest
+import httpx
+from cardda_python import AsyncCarddaClient
+from cardda_python.http_client import AsyncHttpClient
+from cardda_python.resources import BankRecipient
+from cardda_python.services.base_service import AsyncBaseService
+from cardda_python.resources.base_resource import BaseResource
+
+class SomeResource(BaseResource):
+    name = "something"
+    allowed_nested_attributes = ["nested_object"]
+
+class SomeService(AsyncBaseService):
+    resource = SomeResource
+    methods = ["all", "find", "create", "save", "delete"]
+
+SOME_RESOURCE_AS_JSON = {
+    "id": "1",
+    "some_field": "some_value",
+    "other_field": "other_value",
+    "nested_object": {
+        "nested_field": "nested_value"
+    }
+}
+
+BASE_URL = "https://api.cardda.com/v1"
+
+
+class TestAsyncBaseService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            if request.method == "GET" and request.url.path.endswith("/something/"):
+                return httpx.Response(200, json=[SOME_RESOURCE_AS_JSON])
+            if request.method in ("POST", "PATCH"):
+                return httpx.Response(200, content=request.content)
+            return httpx.Response(200, json=SOME_RESOURCE_AS_JSON)
+
+        self.client = AsyncHttpClient(BASE_URL, "your-api-key", transport=httpx.MockTransport(handler))
+        self.service = SomeService(self.client)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def test_all(self):
+        response = await self.service.all()
+
+        self.assertEqual([entry.as_json() for entry in response], [SOME_RESOURCE_AS_JSON])
+        self.assertIsInstance(response[0], SomeResource)
+
+    async def test_iter_all(self):
+        pages = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            pages.append(page)
+            size = int(request.url.params["per_page"])
+            return httpx.Response(200, json=[{"id": f"{page}-{i}"} for i in range(size if page < 3 else 1)])
+
+        async with AsyncHttpClient(BASE_URL, "your-api-key", transport=httpx.MockTransport(handler)) as client:
+            ids = [entry.id async for entry in SomeService(client).iter_all(page_size=5)]
+
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(pages, [1, 2, 3])
+
+    async def test_iter_all_unpaginated_listing(self):
+        pages = []
+
+        def handler(request):
+            pages.append(int(request.url.params["page"]))
+            return httpx.Response(200, json=[{"id": str(i)} for i in range(7)])
+
+        async with AsyncHttpClient(BASE_URL, "your-api-key", transport=httpx.MockTransport(handler)) as client:
+            ids = [entry.id async for entry in SomeService(client).iter_all(page_size=5)]
+
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(pages, [1])
+
+    async def test_iter_all_repeated_page(self):
+        pages = []
+
+        def handler(request):
+            pages.append(int(request.url.params["page"]))
+            return httpx.Response(200, json=[{"id": str(i)} for i in range(5)])
+
+        async with AsyncHttpClient(BASE_URL, "your-api-key", transport=httpx.MockTransport(handler)) as client:
+            ids = [entry.id async for entry in SomeService(client).iter_all(page_size=5)]
+
+        # the server ignored the page param and kept sending the first page
+        self.assertEqual(ids, ["0", "1", "2", "3", "4"])
+        self.assertEqual(pages, [1, 2])
+
+    async def test_iter_all_max_pages(self):
+        pages = []
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            pages.append(page)
+            return httpx.Response(200, json=[{"id": f"{page}-{i}"} for i in range(5)])
+
+        async with AsyncHttpClient(BASE_URL, "your-api-key", transport=httpx.MockTransport(handler)) as client:
+            service = SomeService(client)
+            service.max_pages = 3
+            ids = []
+            with self.assertRaisesRegex(RuntimeError, "something still had full pages after 3 pages"):
+                async for entry in service.iter_all(page_size=5):
+                    ids.append(entry.id)
+
+        self.assertEqual(len(ids), 10)
+        self.assertEqual(pages, [1, 2, 3])
+
+    async def test_find(self):
+        response = await self.service.find("1")
+
+        self.assertEqual(str(self.requests[0].url), f"{BASE_URL}/something/1")
+        self.assertEqual(response.as_json(), SOME_RESOURCE_AS_JSON)
+
+    async def test_create(self):
+        response = await self.service.create(**SOME_RESOURCE_AS_JSON)
+
+        self.assertEqual(json.loads(self.requests[0].content), SOME_RESOURCE_AS_JSON)
+        self.assertEqual(response.as_json(), SOME_RESOURCE_AS_JSON)
+
+    async def test_save(self):
+        resource = SomeResource(SOME_RESOURCE_AS_JSON)
+        resource.some_field = "updated_value"
+        response = await self.service.save(resource)
+
+        self.assertEqual(self.requests[0].method, "PATCH")
+        self.assertIs(response, resource)
+        self.assertEqual(response.some_field, "updated_value")
+
+    async def test_delete(self):
+        response = await self.service.delete(SomeResource(SOME_RESOURCE_AS_JSON))
+
+        self.assertEqual(self.requests[0].method, "DELETE")
+        self.assertIsInstance(response, SomeResource)
+
+    async def test_delete_no_content(self):
+        transport = httpx.MockTransport(lambda request: httpx.Response(204))
+        async with AsyncHttpClient(BASE_URL, "your-api-key", transport=transport) as client:
+            resource = SomeResource(SOME_RESOURCE_AS_JSON)
+            response = await SomeService(client).delete(resource)
+
+        self.assertIs(response, resource)
+
+    async def test_concurrent_requests(self):
+        responses = await asyncio.gather(*[self.service.find(str(i)) for i in range(20)])
+
+        self.assertEqual(len(responses), 20)
+        self.assertEqual(len(self.requests), 20)
+
+
+class TestAsyncCarddaClient(unittest.IsolatedAsyncioTestCase):
+    async def test_custom_action(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={"id": "1", "status": "approved"})
+
+        async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler)) as cardda:
+            recipient = BankRecipient({"id": "1", "status": "draft"})
+            response = await cardda.banking.recipients.enroll(recipient, bank_key_id="key")
+
+        self.assertIs(response, recipient)
+        self.assertEqual(recipient.status, "approved")
+        self.assertEqual(str(requests[0].url), f"{BASE_URL}/banking/bank_recipients/1/enroll")
+        self.assertTrue(cardda._client.closed)
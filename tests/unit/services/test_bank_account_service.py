@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.resources import BankAccount, BankTransaction
+from cardda_python.services.banking.bank_account_service import _advance
+from cardda_python.watermarks import MemoryWatermarkStore
+
+TRANSACTIONS = [
+    {"id": "t1", "amount": 100, "updated_at": "2024-01-01T00:00:00Z"},
+    {"id": "t2", "amount": 200, "updated_at": "2024-01-03T00:00:00Z"},
+    {"id": "t3", "amount": 300, "updated_at": "2024-01-02T00:00:00Z"},
+]
+
+
+def handler(requests):
+    def handle(request):
+        requests.append((request.method, request.url.path, dict(request.url.params)))
+        if request.method == "PATCH":
+            return httpx.Response(200, json={"status": "syncing"})
+        since = request.url.params.get("updated_since", "")
+        return httpx.Response(200, json=[t for t in TRANSACTIONS if t["updated_at"] >= since])
+    return handle
+
+
+class TestBankAccountChanges(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.watermarks = MemoryWatermarkStore()
+        self.cardda = CarddaClient(
+            "your-api-key", transport=httpx.MockTransport(handler(self.requests)), watermarks=self.watermarks
+        )
+        self.account = BankAccount({"id": "a1"})
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_transaction_changes(self):
+        changes = list(self.cardda.banking.accounts.transaction_changes(self.account, sync=True))
+
+        self.assertEqual([type(t) for t in changes], [BankTransaction] * 3)
+        self.assertEqual(self.requests[0][:2], ("PATCH", "/v1/banking/bank_accounts/a1/sync_transactions"))
+        self.assertEqual(self.requests[1][1], "/v1/banking/bank_transactions/")
+        self.assertEqual(self.requests[1][2]["sender_id"], "a1")
+        self.assertNotIn("updated_since", self.requests[1][2])
+        self.assertEqual(self.watermarks.get("a1:transactions"), "2024-01-03T00:00:00Z")
+
+        changes = list(self.cardda.banking.accounts.transaction_changes(self.account, sync=False))
+
+        self.assertEqual([t.id for t in changes], ["t2"])
+        self.assertEqual(self.requests[-1][2]["updated_since"], "2024-01-03T00:00:00Z")
+
+    def test_does_not_sync_by_default(self):
+        list(self.cardda.banking.accounts.transaction_changes(self.account))
+
+        self.assertEqual([method for method, _, _ in self.requests], ["GET"])
+
+    def test_watermark_compares_dates(self):
+        def resource(updated_at):
+            return BankTransaction({"id": "t", "updated_at": updated_at})
+
+        # 23:00 UTC of the 2nd, earlier than the current watermark
+        self.assertEqual(_advance("2024-01-02T23:30:00Z", resource("2024-01-03T01:00:00+02:00")), "2024-01-02T23:30:00Z")
+        self.assertEqual(_advance("2024-01-03T00:00:00Z", resource("2024-01-03T00:00:00.5Z")), "2024-01-03T00:00:00.5Z")
+        self.assertEqual(_advance("2024-01-03T00:00:00.250Z", resource("2024-01-03T00:00:00.25Z")), "2024-01-03T00:00:00.250Z")
+        self.assertEqual(_advance(None, resource("2024-01-01")), "2024-01-01")
+
+    def test_interrupted_stream_keeps_watermark(self):
+        stream = self.cardda.banking.accounts.transaction_changes(self.account, sync=False)
+        next(stream)
+        stream.close()
+
+        self.assertIsNone(self.watermarks.get("a1:transactions"))
+
+    def test_reset_watermark(self):
+        list(self.cardda.banking.accounts.transaction_changes(self.account, sync=False))
+
+        self.cardda.banking.accounts.reset_watermark(self.account, "transactions")
+
+        self.assertIsNone(self.watermarks.get("a1:transactions"))
+
+
+class TestAsyncBankAccountChanges(unittest.TestCase):
+    def test_recipient_changes(self):
+        requests = []
+
+        async def run():
+            async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler(requests))) as cardda:
+                accounts = cardda.banking.accounts
+                changes = [r async for r in accounts.recipient_changes(BankAccount({"id": "a1"}), sync=True)]
+                return changes, accounts.watermarks.get("a1:recipients")
+
+        changes, watermark = asyncio.run(run())
+
+        self.assertEqual(len(changes), 3)
+        self.assertEqual(requests[0][1], "/v1/banking/bank_accounts/a1/sync_recipients")
+        self.assertEqual(requests[1][2]["owner_id"], "a1")
+        self.assertEqual(watermark, "2024-01-03T00:00:00Z")
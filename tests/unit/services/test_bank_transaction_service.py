@@ -0,0 +1,31 @@
+import asyncio
+import unittest
+from cardda_python.resources import BankTransaction
+from cardda_python.testing import FakeCardda
+
+
+class TestBankTransactionService(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeCardda()
+        self.transaction = self.api.add("bank_transactions", amount=100)
+
+    def test_enqueue_and_dequeue_do_not_dirty_the_transaction(self):
+        with self.api.client() as cardda:
+            transaction = cardda.banking.transactions.find(self.transaction["id"])
+            cardda.banking.transactions.enqueue(transaction, bank_key_id="key")
+
+            self.assertEqual(transaction.raw_data["id"], self.transaction["id"])
+            self.assertFalse(transaction.is_dirty)
+            cardda.banking.transactions.dequeue(transaction)
+            self.assertFalse(transaction.is_dirty)
+
+    def test_async_enqueue_does_not_dirty_the_transaction(self):
+        async def run():
+            async with self.api.async_client() as cardda:
+                transaction = BankTransaction(dict(self.transaction))
+                return await cardda.banking.transactions.enqueue(transaction, bank_key_id="key")
+
+        transaction = asyncio.run(run())
+
+        self.assertEqual(transaction.raw_data["id"], self.transaction["id"])
+        self.assertFalse(transaction.is_dirty)
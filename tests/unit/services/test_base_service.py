@@ -55,7 +55,112 @@ class TestBaseService(HttprettyTestCase):
         for entry in response:
             self.assertEqual(isinstance(entry, SomeResource), True)
 
-    
+
+    def test_iter_all(self):
+        pages = {
+            "1": [{**SOME_RESOURCE_AS_JSON, "id": "1"}, {**SOME_RESOURCE_AS_JSON, "id": "2"}],
+            "2": [{**SOME_RESOURCE_AS_JSON, "id": "3"}],
+        }
+
+        requested_pages = []
+
+        def request_callback(request, uri, headers):
+            requested_pages.append(request.querystring["page"][0])
+            assert request.querystring["per_page"] == ["2"]
+            assert request.querystring["owner_id"] == ["owner"]
+            return (200, headers, json.dumps(pages[request.querystring["page"][0]]))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            f"{self.client.base_url}/{SomeResource.name}/",
+            body=request_callback
+        )
+
+        response = self.service.iter_all(page_size=2, owner_id="owner")
+        # Assertions
+        self.assertEqual([entry.id for entry in response], ["1", "2", "3"])
+        self.assertEqual(requested_pages, ["1", "2"])
+
+    def test_iter_all_unpaginated_listing(self):
+        requested_pages = []
+
+        def request_callback(request, uri, headers):
+            requested_pages.append(request.querystring["page"][0])
+            entries = [{**SOME_RESOURCE_AS_JSON, "id": str(i)} for i in range(3)]
+            return (200, headers, json.dumps(entries))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            f"{self.client.base_url}/{SomeResource.name}/",
+            body=request_callback
+        )
+
+        response = self.service.iter_all(page_size=2)
+        # the whole listing in one page, paging was ignored
+        self.assertEqual([entry.id for entry in response], ["0", "1", "2"])
+        self.assertEqual(requested_pages, ["1"])
+
+    def test_iter_all_repeated_page(self):
+        requested_pages = []
+
+        def request_callback(request, uri, headers):
+            requested_pages.append(request.querystring["page"][0])
+            entries = [{**SOME_RESOURCE_AS_JSON, "id": str(i)} for i in range(2)]
+            return (200, headers, json.dumps(entries))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            f"{self.client.base_url}/{SomeResource.name}/",
+            body=request_callback
+        )
+
+        response = self.service.iter_all(page_size=2)
+        # the server ignored the page param and kept sending the first page
+        self.assertEqual([entry.id for entry in response], ["0", "1"])
+        self.assertEqual(requested_pages, ["1", "2"])
+
+    def test_iter_all_shifted_page(self):
+        pages = {
+            "1": [{**SOME_RESOURCE_AS_JSON, "id": "1"}, {**SOME_RESOURCE_AS_JSON, "id": "2"}],
+            # an entry was inserted between both requests
+            "2": [{**SOME_RESOURCE_AS_JSON, "id": "2"}, {**SOME_RESOURCE_AS_JSON, "id": "3"}],
+            "3": [],
+        }
+
+        def request_callback(request, uri, headers):
+            return (200, headers, json.dumps(pages[request.querystring["page"][0]]))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            f"{self.client.base_url}/{SomeResource.name}/",
+            body=request_callback
+        )
+
+        response = self.service.iter_all(page_size=2)
+        self.assertEqual([entry.id for entry in response], ["1", "2", "3"])
+
+    def test_iter_all_max_pages(self):
+        requested_pages = []
+
+        def request_callback(request, uri, headers):
+            page = request.querystring["page"][0]
+            requested_pages.append(page)
+            entries = [{**SOME_RESOURCE_AS_JSON, "id": f"{page}-{i}"} for i in range(2)]
+            return (200, headers, json.dumps(entries))
+
+        httpretty.register_uri(
+            httpretty.GET,
+            f"{self.client.base_url}/{SomeResource.name}/",
+            body=request_callback
+        )
+
+        self.service.max_pages = 3
+        ids = []
+        with self.assertRaisesRegex(RuntimeError, "something still had full pages after 3 pages"):
+            for entry in self.service.iter_all(page_size=2):
+                ids.append(entry.id)
+        self.assertEqual(ids, ["1-0", "1-1", "2-0", "2-1"])
+        self.assertEqual(requested_pages, ["1", "2", "3"])
 
     def test_find(self):
         expected_response = SOME_RESOURCE_AS_JSON
@@ -77,11 +182,11 @@ class TestBaseService(HttprettyTestCase):
         resource = SomeResource(SOME_RESOURCE_AS_JSON)
         resource.some_field = "updated_value"
         expected_response = resource.as_json()
-        expected_request = resource.as_json()
+        expected_request = {"some_field": "updated_value"}
 
         def request_callback(request, uri, headers):
-            # Request body has to be the same as the response
-            assert request.body.decode("utf-8") == json.dumps(expected_request), 'unexpected body: {}'.format(request.body)
+            # Request body only holds the changed attributes
+            assert json.loads(request.body) == expected_request, 'unexpected body: {}'.format(request.body)
             # Check if the request body matches the desired condition
             return (200, headers, json.dumps(expected_response))
     
@@ -96,6 +201,14 @@ class TestBaseService(HttprettyTestCase):
         # Assertions
         self.assertEqual(response.as_json(), expected_response)
         self.assertEqual(isinstance(response, SomeResource), True)
+        self.assertFalse(response.is_dirty)
+
+    def test_save_without_changes(self):
+        resource = SomeResource(SOME_RESOURCE_AS_JSON)
+        # no uri is registered, any request would fail
+        response = self.service.save(resource)
+        # Assertions
+        self.assertIs(response, resource)
     
     def test_create(self):
         resource = SomeResource(SOME_RESOURCE_AS_JSON)
@@ -104,7 +217,7 @@ class TestBaseService(HttprettyTestCase):
 
         def request_callback(request, uri, headers):
             # Request body has to be the same as the response
-            assert request.body.decode("utf-8") == json.dumps(expected_request), 'unexpected body: {}'.format(request.body)
+            assert json.loads(request.body) == expected_request, 'unexpected body: {}'.format(request.body)
             # Check if the request body matches the desired condition
             return (200, headers, json.dumps(expected_response))
         
@@ -135,4 +248,15 @@ class TestBaseService(HttprettyTestCase):
 
         # Assertions
         self.assertEqual(response.as_json(), expected_response)
-        self.assertEqual(isinstance(response, SomeResource), True)
\ No newline at end of file
+        self.assertEqual(isinstance(response, SomeResource), True)
+    def test_delete_no_content(self):
+        httpretty.register_uri(
+            httpretty.DELETE,
+            f"{self.client.base_url}/{SomeResource.name}/{SOME_RESOURCE_AS_JSON['id']}",
+            responses=[httpretty.Response(body="", status=204)]
+        )
+        resource = SomeResource(SOME_RESOURCE_AS_JSON)
+
+        response = self.service.delete(resource)
+
+        self.assertIs(response, resource)
@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.batch import run_batch, arun_batch
+from cardda_python.resources import BankRecipient
+
+
+def create_handler(request):
+    payload = json.loads(request.content)
+    if payload.get("rut") == "invalid":
+        return httpx.Response(422, json={"error": "invalid rut"})
+    return httpx.Response(200, json={"id": payload["rut"], "status": "draft"})
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_keeps_order_and_collects_errors(self):
+        def fn(item):
+            if item == 3:
+                raise ValueError("boom")
+            time.sleep(0.001 * (10 - item))
+            return item * 2
+
+        results = run_batch(fn, range(10), concurrency=4)
+
+        self.assertEqual([result.item for result in results], list(range(10)))
+        self.assertEqual([result.value for result in results if result.ok], [0, 2, 4, 8, 10, 12, 14, 16, 18])
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertRaises(ValueError, results[3].unwrap)
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        running = [0, 0]
+
+        def fn(item):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.005)
+            with lock:
+                running[0] -= 1
+
+        run_batch(fn, range(20), concurrency=3)
+        self.assertLessEqual(running[1], 3)
+
+    def test_create_many(self):
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(create_handler)) as cardda:
+            results = cardda.banking.recipients.create_many(
+                [{"rut": "1"}, {"rut": "invalid"}, {"rut": "2"}], concurrency=2
+            )
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual(results[0].value.id, "1")
+        self.assertEqual(results[1].error.response.status_code, 422)
+
+    def test_create_many_requires_create(self):
+        with CarddaClient("your-api-key") as cardda:
+            self.assertRaises(AttributeError, lambda: cardda.banking.accounts.create_many)
+
+
+class TestAsyncRunBatch(unittest.IsolatedAsyncioTestCase):
+    async def test_enroll_many(self):
+        def handler(request):
+            if request.url.path.endswith("/2/enroll"):
+                return httpx.Response(500)
+            return httpx.Response(200, json={"id": request.url.path.split("/")[-2], "status": "approved"})
+
+        recipients = [BankRecipient({"id": str(i)}) for i in range(4)]
+        async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler)) as cardda:
+            results = await cardda.banking.recipients.enroll_many(recipients, concurrency=2, bank_key_id="key")
+
+        self.assertEqual([result.ok for result in results], [True, True, False, True])
+        self.assertEqual(recipients[0].status, "approved")
+
+    async def test_arun_batch_empty(self):
+        self.assertEqual(await arun_batch(None, []), [])
@@ -0,0 +1,44 @@
+import unittest
+from benchmarks import api  # noqa: F401, registers the api benchmarks
+from benchmarks.harness import BENCHMARKS, compare, run
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run(self):
+        results = run(repeat=1, scale=5, latency=0.0)
+
+        self.assertEqual(set(results["results"]), set(BENCHMARKS))
+        for result in results["results"].values():
+            self.assertGreater(result["ops"], 0)
+        self.assertIn("python", results["environment"])
+
+    def test_compare(self):
+        baseline = {"results": {"fast": {"ops_per_sec": 100.0}, "slow": {"ops_per_sec": 100.0}}}
+        current = {"results": {"fast": {"ops_per_sec": 85.0}, "slow": {"ops_per_sec": 70.0}, "new": {"ops_per_sec": 1.0}}}
+
+        regressions = compare(current, baseline, tolerance=0.2)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("slow:"))
+
+
+class TestResourceBenchmarks(unittest.TestCase):
+    def test_run(self):
+        from benchmarks import resources
+
+        results = resources.run(scale=10, repeat=1)
+
+        self.assertEqual(set(results["results"]), set(resources.MICRO_BENCHMARKS))
+        self.assertEqual(set(resources.load(resources.BASELINE)["results"]), set(resources.MICRO_BENCHMARKS))
+        for result in results["results"].values():
+            self.assertGreaterEqual(result["bytes_per_op"], 0)
+
+    def test_check_flags_extra_allocations(self):
+        from benchmarks import resources
+        baseline = {"environment": {"python": "0.0.0"}, "results": {"overwrite": {"bytes_per_op": 100.0, "blocks_per_op": 1.0}}}
+        results = {"environment": {"python": "3.11.0"}, "results": {"overwrite": {"bytes_per_op": 200.0, "blocks_per_op": 1.02}}}
+
+        regressions = resources.check(results, baseline, time_tolerance=0.5, memory_tolerance=0.1)
+
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("bytes_per_op", regressions[0])
@@ -0,0 +1,119 @@
+import unittest
+import httpx
+from cardda_python import CarddaClient
+from cardda_python.cache import ResponseCache
+from cardda_python.resources import BankRecipient
+
+BASE_URL = "https://api.cardda.com/v1"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResponseCache(ttl=10, ttls={"bank_recipients": 60}, max_entries=2, clock=self.clock)
+
+    def test_ttl(self):
+        self.cache.store(f"{BASE_URL}/banking/bank_transactions/1", {"id": "1"})
+        self.cache.store(f"{BASE_URL}/banking/bank_recipients/1", {"id": "1"})
+        self.clock.now = 30
+
+        self.assertEqual(self.cache.lookup(f"{BASE_URL}/banking/bank_transactions/1"), (None, False))
+        entry, fresh = self.cache.lookup(f"{BASE_URL}/banking/bank_recipients/1")
+        self.assertTrue(fresh)
+        self.assertEqual(entry.value, {"id": "1"})
+        self.assertEqual(self.cache.stats, {"hits": 1, "misses": 1, "revalidations": 0, "size": 1})
+
+    def test_lru_eviction(self):
+        self.cache.store("a", 1)
+        self.cache.store("b", 2)
+        self.cache.lookup("a")
+        self.cache.store("c", 3)
+
+        self.assertTrue(self.cache.lookup("a")[1])
+        self.assertEqual(self.cache.lookup("b"), (None, False))
+
+    def test_stale_entries_with_etag_are_kept(self):
+        self.cache.store("a", 1, etag='"v1"')
+        self.clock.now = 30
+
+        entry, fresh = self.cache.lookup("a")
+        self.assertFalse(fresh)
+        self.assertEqual(entry.etag, '"v1"')
+
+    def test_key_sorts_params(self):
+        self.assertEqual(ResponseCache.key("url", {"b": 1, "a": 2}), ResponseCache.key("url", {"a": 2, "b": 1}))
+
+
+class TestHttpClientCache(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.etag = '"v1"'
+
+        def handler(request):
+            self.requests.append(request)
+            if request.method != "GET":
+                return httpx.Response(200, json={"id": "1", "status": "approved"})
+            if request.headers.get("If-None-Match") == self.etag:
+                return httpx.Response(304)
+            return httpx.Response(200, json={"id": "1", "status": "draft", "meta": {"tags": ["a"]}}, headers={"ETag": self.etag})
+
+        self.clock = FakeClock()
+        self.cardda = CarddaClient(
+            "your-api-key",
+            transport=httpx.MockTransport(handler),
+            cache=ResponseCache(ttl=10, clock=self.clock),
+        )
+        self.recipients = self.cardda.banking.recipients
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_hit(self):
+        first = self.recipients.find("1")
+        second = self.recipients.find("1")
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.status, "draft")
+        self.assertEqual(self.cardda.cache.stats["hits"], 1)
+
+    def test_hits_do_not_share_values(self):
+        first = self.recipients.find("1")
+        first.meta["tags"].append("mutated")
+        second = self.recipients.find("1")
+        self.clock.now = 30
+        revalidated = self.recipients.find("1")
+
+        self.assertEqual(second.meta, {"tags": ["a"]})
+        self.assertEqual(revalidated.meta, {"tags": ["a"]})
+        self.assertIsNot(second.meta, revalidated.meta)
+
+    def test_revalidation(self):
+        self.recipients.find("1")
+        self.clock.now = 30
+        recipient = self.recipients.find("1")
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
+        self.assertEqual(recipient.status, "draft")
+        self.assertEqual(self.cardda.cache.stats["revalidations"], 1)
+
+    def test_invalidated_by_state_changes(self):
+        self.recipients.find("1")
+        self.recipients.enroll(BankRecipient({"id": "1"}))
+        self.recipients.find("1")
+
+        self.assertEqual([request.method for request in self.requests], ["GET", "POST", "GET"])
+
+    def test_not_shared_between_api_keys(self):
+        other = self.cardda._client.extend(api_key="other-api-key")
+
+        self.assertIsNot(other.cache, self.cardda.cache)
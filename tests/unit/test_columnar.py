@@ -0,0 +1,66 @@
+import asyncio
+import importlib.util
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.columnar import Columns
+
+ROWS = [
+    {"id": "t1", "amount": 100, "status": "enqueued", "recipient": {"id": "r1", "rut": "1-9"}},
+    {"id": "t2", "amount": 200, "recipient": None, "description": "rent"},
+    {"id": "t3", "amount": 300, "status": "draft", "recipient": {"id": "r3", "rut": "3-9"}},
+]
+
+
+def handler(request):
+    page, per_page = int(request.url.params["page"]), int(request.url.params["per_page"])
+    return httpx.Response(200, json=ROWS[(page - 1) * per_page:page * per_page])
+
+
+class TestColumns(unittest.TestCase):
+    def test_fields(self):
+        columns = Columns(["id", "recipient.rut", "recipient.missing"]).extend(iter(ROWS))
+
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(columns["id"], ["t1", "t2", "t3"])
+        self.assertEqual(columns["recipient.rut"], ["1-9", None, "3-9"])
+        self.assertEqual(columns["recipient.missing"], [None, None, None])
+
+    def test_inferred_fields(self):
+        columns = Columns(exclude=["recipient"]).extend(ROWS[:1]).extend(ROWS[1:])
+
+        self.assertEqual(columns.to_pydict(), {
+            "id": ["t1", "t2", "t3"],
+            "amount": [100, 200, 300],
+            "status": ["enqueued", None, "draft"],
+            "description": [None, "rent", None],
+        })
+        self.assertEqual(next(columns.rows()), {"id": "t1", "amount": 100, "status": "enqueued", "description": None})
+
+    def test_service(self):
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(handler)) as cardda:
+            columns = cardda.banking.transactions.columns(["id", "amount", "recipient.rut"], page_size=2)
+
+        self.assertEqual(columns["amount"], [100, 200, 300])
+        self.assertEqual(columns["recipient.rut"], ["1-9", None, "3-9"])
+
+    def test_async_service(self):
+        async def run():
+            async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler)) as cardda:
+                return await cardda.banking.transactions.columns(page_size=2)
+
+        self.assertEqual(asyncio.run(run())["id"], ["t1", "t2", "t3"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pandas"), "pandas is not installed")
+    def test_to_pandas(self):
+        frame = Columns(["id", "recipient.rut"]).extend(ROWS).to_pandas()
+
+        self.assertEqual(list(frame.columns), ["id", "recipient.rut"])
+        self.assertEqual(frame["id"].tolist(), ["t1", "t2", "t3"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_to_arrow(self):
+        table = Columns(["id", "amount"]).extend(ROWS).to_arrow()
+
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("amount").to_pylist(), [100, 200, 300])
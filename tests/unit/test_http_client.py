@@ -0,0 +1,58 @@
+import unittest
+import httpx
+from cardda_python import CarddaClient
+from cardda_python.http_client import HttpClient
+
+BASE_URL = "https://api.cardda.com/v1"
+
+
+def json_transport(requests):
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "1"})
+    return httpx.MockTransport(handler)
+
+
+class TestHttpClient(unittest.TestCase):
+    def test_extend_shares_pool(self):
+        client = HttpClient(BASE_URL, "your-api-key")
+        extended = client.extend(base_url=f"{client.base_url}/banking")
+
+        self.assertIs(extended._client, client._client)
+        self.assertEqual(extended.base_url, f"{BASE_URL}/banking")
+        self.assertEqual(extended.api_key, client.api_key)
+
+    def test_url(self):
+        client = HttpClient(f"{BASE_URL}/something", "your-api-key")
+
+        self.assertEqual(client.url(), f"{BASE_URL}/something/")
+        self.assertEqual(client.url("/1"), f"{BASE_URL}/something/1")
+        self.assertEqual(client.url("/1/enroll"), f"{BASE_URL}/something/1/enroll")
+
+    def test_close_only_by_owner(self):
+        client = HttpClient(BASE_URL, "your-api-key")
+        extended = client.extend(base_url=f"{client.base_url}/banking")
+
+        extended.close()
+        self.assertFalse(client.closed)
+        with client:
+            pass
+        self.assertTrue(client.closed)
+        self.assertTrue(extended.closed)
+
+    def test_services_share_pool(self):
+        requests = []
+        with CarddaClient("your-api-key", transport=json_transport(requests)) as cardda:
+            accounts = cardda.banking.accounts
+            recipients = cardda.banking.recipients
+            self.assertIs(accounts._client._client, cardda._client._client)
+            self.assertIs(recipients._client._client, cardda._client._client)
+
+            accounts.find("1")
+            recipients.find("2")
+
+        self.assertEqual(
+            [str(request.url) for request in requests],
+            [f"{BASE_URL}/banking/bank_accounts/1", f"{BASE_URL}/banking/bank_recipients/2"],
+        )
+        self.assertTrue(cardda._client.closed)
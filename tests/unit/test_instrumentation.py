@@ -0,0 +1,151 @@
+import asyncio
+import importlib.util
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.cache import ResponseCache
+from cardda_python.instrumentation import Instrumentation, MetricsCollector, Histogram, route_of
+from cardda_python.rate_limit import TokenBucket
+from cardda_python.retry import RetryPolicy
+
+
+class Recorder(Instrumentation):
+    def __init__(self):
+        self.calls = []
+
+    def request_start(self, event):
+        self.calls.append(("start", event.route))
+
+    def request_end(self, event):
+        self.calls.append(("end", event.route, event.status_code, event.attempts, event.cache))
+
+    def retry(self, event, delay):
+        self.calls.append(("retry", event.route))
+
+    def cache_hit(self, event):
+        self.calls.append(("cache_hit", event.route))
+
+
+def handler(request):
+    if request.url.path.endswith("/missing"):
+        return httpx.Response(404, json={"error": "not found"})
+    return httpx.Response(200, json={"id": "r1", "status": "approved"})
+
+
+class FlakyHandler:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, request):
+        self.calls += 1
+        if self.calls == 1:
+            return httpx.Response(503)
+        return handler(request)
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_route_of(self):
+        self.assertEqual(route_of("https://api.cardda.com/v1/banking/bank_recipients", "/r1/enroll"),
+                         "/v1/banking/bank_recipients/{id}/enroll")
+        self.assertEqual(route_of("https://api.cardda.com/v1/banking/bank_recipients/"), "/v1/banking/bank_recipients")
+
+    def test_histogram(self):
+        histogram = Histogram([0.1, 1.0])
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.counts, [1, 2, 1])
+        self.assertEqual(histogram.quantile(0.5), 1.0)
+        self.assertEqual(histogram.quantile(1.0), float("inf"))
+
+    def test_hooks(self):
+        recorder = Recorder()
+        metrics = MetricsCollector()
+        cardda = CarddaClient(
+            "your-api-key",
+            transport=httpx.MockTransport(FlakyHandler()),
+            retry=RetryPolicy(backoff_factor=0),
+            cache=ResponseCache(),
+            rate_limiter=TokenBucket(rate=1000, burst=1),
+            instrumentation=[recorder, metrics],
+        )
+        recipients = cardda.banking.recipients
+        route = "/v1/banking/bank_recipients/{id}"
+
+        recipients.find("r1")
+        recipients.find("r1")
+        with self.assertRaises(httpx.HTTPStatusError):
+            recipients.find("missing")
+        cardda.close()
+
+        self.assertEqual(recorder.calls, [
+            ("start", route), ("retry", route), ("end", route, 200, 2, None),
+            ("start", route), ("cache_hit", route), ("end", route, None, 0, "hit"),
+            ("start", route), ("end", route, 404, 1, None),
+        ])
+        snapshot = metrics.snapshot()
+        stats = snapshot["routes"][f"GET {route}"]
+        self.assertEqual((stats["requests"], stats["errors"], stats["retries"], stats["cache_hits"]), (3, 1, 1, 1))
+        self.assertEqual(stats["in_flight"], 0)
+        self.assertEqual(stats["latency"]["count"], 3)
+        # cache hits decode their own copy of the body too
+        self.assertEqual(stats["phases"]["decode"]["count"], 2)
+        self.assertGreater(snapshot["rate_limit_wait_seconds"], 0)
+        self.assertIn("bank_recipients", snapshot["objectize_seconds"])
+
+    def test_async_hooks(self):
+        metrics = MetricsCollector()
+
+        async def run():
+            async with AsyncCarddaClient(
+                "your-api-key", transport=httpx.MockTransport(handler), instrumentation=metrics
+            ) as cardda:
+                await cardda.banking.recipients.all(owner_id="a1")
+
+        asyncio.run(run())
+
+        stats = metrics.snapshot()["routes"]["GET /v1/banking/bank_recipients"]
+        self.assertEqual((stats["requests"], stats["errors"]), (1, 0))
+
+    def test_network_phases(self):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps({"id": "r1"}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        metrics = MetricsCollector()
+
+        with CarddaClient("your-api-key", custom_url=f"http://127.0.0.1:{server.server_port}", instrumentation=metrics) as cardda:
+            cardda.banking.recipients.find("r1")
+
+        phases = metrics.snapshot()["routes"]["GET /v1/banking/bank_recipients/{id}"]["phases"]
+        self.assertEqual(set(phases), {"connect", "server", "download", "decode"})
+
+
+@unittest.skipUnless(importlib.util.find_spec("prometheus_client"), "prometheus-client is not installed")
+class TestPrometheusInstrumentation(unittest.TestCase):
+    def test_request(self):
+        import prometheus_client
+        from cardda_python.instrumentation import PrometheusInstrumentation
+        registry = prometheus_client.CollectorRegistry()
+
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(handler),
+                          instrumentation=PrometheusInstrumentation(registry)) as cardda:
+            cardda.banking.recipients.find("r1")
+
+        labels = {"method": "GET", "route": "/v1/banking/bank_recipients/{id}"}
+        self.assertEqual(registry.get_sample_value("cardda_request_duration_seconds_count", labels), 1)
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from cardda_python.mirror import LocalMirror, AsyncLocalMirror
+from cardda_python.resources import BankAccount, BankRecipient, BankTransaction
+from cardda_python.testing import FakeCardda
+
+
+class TestLocalMirror(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "mirror.db")
+        self.api = FakeCardda()
+        account = self.api.add("bank_accounts", account_number="1")
+        self.account = BankAccount(account)
+        for index in range(3):
+            recipient = self.api.add("bank_recipients", rut=f"{index}-9", account_number=str(index), owner_id=account["id"])
+            self.api.add("bank_transactions", amount=index, sender_id=account["id"], recipient_id=recipient["id"])
+        self.api.add("bank_payrolls", sender_id=account["id"])
+        self.api.add("bank_transactions", amount=99, sender_id="other")
+        self.cardda = self.api.client()
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_sync_and_query(self):
+        with LocalMirror(self.path, self.cardda.banking) as mirror:
+            counts = mirror.sync(self.account)
+
+            self.assertEqual(counts, {"recipients": 3, "transactions": 3, "payrolls": 1})
+            transactions = mirror.transactions(status="draft")
+            self.assertEqual(len(transactions), 3)
+            self.assertIsInstance(transactions[0], BankTransaction)
+            self.assertEqual(transactions[0].amount, 0)
+            self.assertEqual(mirror.count(BankTransaction, sender_id=self.account.id), 3)
+            recipient = mirror.get(BankRecipient, transactions[1].recipient_id)
+            self.assertEqual(recipient.rut, "1-9")
+            self.assertEqual(len(mirror.recipients(rut=["0-9", "2-9"])), 2)
+            self.assertEqual([a.id for a in mirror.accounts()], [self.account.id])
+            with self.assertRaises(ValueError):
+                mirror.transactions(amount=1)
+
+            enqueued = self.cardda.banking.transactions.find(transactions[2].id)
+            self.cardda.banking.transactions.enqueue(enqueued, bank_key_id="key")
+            requests = self.api.request_count
+            counts = mirror.sync(self.account, kinds=["transactions"], sync=False)
+
+            self.assertEqual(counts, {"transactions": 1})
+            self.assertEqual(self.api.request_count, requests + 1)
+            self.assertEqual([t.id for t in mirror.transactions(status="enqueued")], [enqueued.id])
+            self.assertEqual(mirror.transactions(order_by="-updated_at", limit=1)[0].id, enqueued.id)
+
+        with LocalMirror(self.path, self.cardda.banking) as mirror:
+            # watermarks survive restarts, updated_since is inclusive so only
+            # the last change of each kind is streamed again
+            self.assertEqual(mirror.sync(self.account, sync=False), {"recipients": 1, "transactions": 1, "payrolls": 1})
+            self.assertEqual(mirror.count(BankTransaction), 3)
+
+    def test_upsert_without_id(self):
+        with LocalMirror(self.path) as mirror:
+            recipients = [BankRecipient({"id": "r1", "rut": "1-9"}), BankRecipient({"rut": "2-9"})]
+            with self.assertRaisesRegex(ValueError, "bank_recipients without an id"):
+                mirror.upsert(recipients)
+            # the batch is checked before anything is written
+            self.assertEqual(mirror.count(BankRecipient), 0)
+
+    def test_async_sync(self):
+        async def run():
+            async with self.api.async_client() as cardda:
+                mirror = AsyncLocalMirror(self.path, cardda.banking)
+                try:
+                    await mirror.sync_accounts()
+                    return await mirror.sync(self.account), mirror.count(BankRecipient)
+                finally:
+                    mirror.close()
+
+        counts, recipients = asyncio.run(run())
+
+        self.assertEqual(counts["transactions"], 3)
+        self.assertEqual(recipients, 3)
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import threading
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.payroll_pipeline import chunked
+from cardda_python.resources import BankPayroll
+
+
+class FakePayrolls:
+    """
+    Payrolls whose first line has a negative amount fail on enroll.
+    """
+
+    def __init__(self):
+        self.payrolls = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        parts = request.url.path.strip("/").split("/")[3:]
+        data = json.loads(request.content)
+        with self.lock:
+            if not parts:
+                id = f"p{len(self.payrolls) + 1}"
+                self.payrolls[id] = {"id": id, "status": "draft", **data}
+                return httpx.Response(201, json=self.payrolls[id])
+            payroll = self.payrolls[parts[0]]
+        if parts[1] == "enroll" and payroll["bank_transactions"][0]["amount"] < 0:
+            return httpx.Response(422, json={"error": "invalid amount"})
+        payroll["status"] = {"enroll": "enrolled", "validate_recipients": "validated"}[parts[1]]
+        payroll["bank_key_id"] = data["bank_key_id"]
+        return httpx.Response(200, json=payroll)
+
+
+def lines(count, invalid=()):
+    for index in range(count):
+        yield {"amount": -1 if index in invalid else 100, "recipient_id": f"r{index}"}
+
+
+class TestPayrollPipeline(unittest.TestCase):
+    def setUp(self):
+        self.api = FakePayrolls()
+        self.cardda = CarddaClient("your-api-key", transport=httpx.MockTransport(self.api))
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_chunked(self):
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(chunked([], 2)), [])
+
+    def test_run(self):
+        snapshots = []
+        pipeline = self.cardda.banking.payrolls.pipeline(
+            chunk_size=3, concurrency=2, on_progress=lambda progress: snapshots.append(progress.completed_lines)
+        )
+
+        results = pipeline.run(lines(10, invalid={6}), payroll_data={"sender_id": "a1"}, bank_key_id="key")
+
+        self.assertEqual([len(result.item) for result in results], [3, 3, 3, 1])
+        self.assertEqual([result.ok for result in results], [True, True, False, True])
+        self.assertIsInstance(results[2].value, BankPayroll)
+        self.assertEqual(results[2].error.response.status_code, 422)
+        payroll = results[0].value
+        self.assertEqual(payroll.status, "validated")
+        self.assertEqual(self.api.payrolls[payroll.id]["sender_id"], "a1")
+        self.assertEqual(self.api.payrolls[payroll.id]["bank_key_id"], "key")
+        self.assertIn("bank_transactions", payroll._pending)
+
+        progress = pipeline.progress
+        self.assertEqual((progress.chunks, progress.lines, progress.completed_lines, progress.failed), (4, 10, 7, 1))
+        self.assertEqual(progress.steps, {"create": 4, "enroll": 3, "validate_recipients": 3})
+        self.assertEqual(max(snapshots), 7)
+
+
+class TestAsyncPayrollPipeline(unittest.TestCase):
+    def test_run(self):
+        api = FakePayrolls()
+
+        async def run():
+            async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(api)) as cardda:
+                pipeline = cardda.banking.payrolls.pipeline(chunk_size=4, concurrency=2, steps=["enroll"])
+                return pipeline, await pipeline.run(lines(10, invalid={0}), bank_key_id="key")
+
+        pipeline, results = asyncio.run(run())
+
+        self.assertEqual([result.ok for result in results], [False, True, True])
+        self.assertEqual(results[1].value.status, "enrolled")
+        self.assertEqual(pipeline.progress.completed_lines, 6)
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.reconciliation import Reconciler, SETTLED
+
+RECIPIENTS = [
+    {"id": "r1", "rut": "11.111.111-1", "account_number": "1", "bank_id": "b", "account_type": "checking",
+     "status": "approved", "updated_at": "2024-01-01T00:00:00Z"},
+    {"id": "r2", "rut": "22222222-2", "account_number": "2", "bank_id": "b", "account_type": "checking",
+     "status": "draft", "updated_at": "2024-01-02T00:00:00Z"},
+    {"id": "r3", "rut": "33333333-3", "account_number": "3", "bank_id": "b", "account_type": "vista",
+     "status": "draft", "updated_at": "2024-01-03T00:00:00Z"},
+]
+
+
+def handler(requests, recipients):
+    def handle(request):
+        params = request.url.params
+        requests.append(dict(params))
+        matches = [r for r in recipients if r["updated_at"] >= params.get("updated_since", "")]
+        page, per_page = int(params["page"]), int(params["per_page"])
+        return httpx.Response(200, json=matches[(page - 1) * per_page:page * per_page])
+    return handle
+
+
+class TestRecipientIndex(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.recipients = [dict(r) for r in RECIPIENTS]
+        self.cardda = CarddaClient("your-api-key", transport=httpx.MockTransport(handler(self.requests, self.recipients)))
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_load(self):
+        index = self.cardda.banking.recipients.index("owner", page_size=2)
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual([r["page"] for r in self.requests], ["1", "2"])
+        self.assertEqual(self.requests[0]["owner_id"], "owner")
+        self.assertNotIn("updated_since", self.requests[0])
+        payload = {"rut": "11111111-1", "account_number": "1", "bank_id": "b", "account_type": "checking"}
+        self.assertIn(payload, index)
+        self.assertEqual(index.lookup(payload).id, "r1")
+        self.assertEqual(index.status(payload), "approved")
+        self.assertIsNone(index.status({**payload, "account_number": "9"}))
+
+    def test_refresh(self):
+        index = self.cardda.banking.recipients.index("owner", page_size=2)
+        self.recipients[1].update(status="approved", updated_at="2024-01-04T00:00:00Z")
+        del self.requests[:]
+
+        received = index.refresh()
+
+        self.assertEqual(received, 2)
+        self.assertEqual(self.requests[0]["updated_since"], "2024-01-03T00:00:00Z")
+        self.assertEqual(index.status(RECIPIENTS[1]), "approved")
+        self.assertEqual(index.updated_at, "2024-01-04T00:00:00Z")
+        self.assertEqual(len(index), 3)
+
+    def test_reconciler_skips_indexed_recipients(self):
+        index = self.cardda.banking.recipients.index("owner")
+        reconciler = Reconciler(self.cardda.banking, "key", recipient_index=index)
+        approved = reconciler.add_recipient(dict(RECIPIENTS[0], status=None))
+        draft = reconciler.add_recipient({"rut": "22222222-2", "account_number": "2", "bank_id": "b", "account_type": "checking"})
+
+        self.assertEqual(approved.state, SETTLED)
+        self.assertEqual(draft.id, "r2")
+        self.assertIsNone(draft.resource)
+
+
+class TestAsyncRecipientIndex(unittest.TestCase):
+    def test_load_and_refresh(self):
+        requests = []
+
+        async def run():
+            async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler(requests, RECIPIENTS))) as cardda:
+                index = await cardda.banking.recipients.index("owner", page_size=2)
+                return index, await index.refresh()
+
+        index, received = asyncio.run(run())
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(received, 1)
+        self.assertEqual(index.lookup(RECIPIENTS[2]).id, "r3")
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.reconciliation import Reconciler, AsyncReconciler, SETTLED, FAILED, TIMED_OUT, STUCK
+from cardda_python.resources import BankRecipient
+
+
+class FakeBank:
+    """
+    Recipients are approved two polls after being enrolled and transactions
+    are enqueued on the first poll after enqueue, recipients without a rut
+    are rejected with a 422.
+    """
+
+    def __init__(self):
+        self.recipients = {}
+        self.transactions = {}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append((request.method, request.url.path))
+        parts = request.url.path.strip("/").split("/")[2:]
+        store = self.recipients if parts[0] == "bank_recipients" else self.transactions
+        if request.method == "POST" and len(parts) == 1:
+            data = json.loads(request.content)
+            if parts[0] == "bank_recipients" and "rut" not in data:
+                return httpx.Response(422, json={"error": "rut is required"})
+            id = f"{parts[0][5]}{len(store) + 1}"
+            store[id] = {"id": id, "status": "draft", "transition": None, "polls": 0, **data}
+            return httpx.Response(201, json=self.public(store[id]))
+        item = store[parts[1]]
+        if request.method == "POST" and parts[2] == "enroll":
+            item["transition"] = "approve"
+        elif request.method == "POST" and parts[2] == "enqueue":
+            item["status"] = "enqueuing"
+        else:
+            item["polls"] += 1
+            if item["transition"] and item["polls"] >= 2:
+                item.update(status="approved", transition=None)
+            elif item["status"] == "enqueuing":
+                item["status"] = "enqueued"
+        return httpx.Response(200, json=self.public(item))
+
+    @staticmethod
+    def public(item):
+        return {k: v for k, v in item.items() if k != "polls"}
+
+
+def populate(reconciler):
+    valid = reconciler.add_recipient({"rut": "1-9", "account_number": "123"})
+    invalid = reconciler.add_recipient({"account_number": "456"})
+    paid = reconciler.add_transaction({"amount": 2000}, recipient=valid)
+    skipped = reconciler.add_transaction({"amount": 1000}, recipient=invalid)
+    return valid, invalid, paid, skipped
+
+
+class TestReconciler(unittest.TestCase):
+    def setUp(self):
+        self.bank = FakeBank()
+        self.cardda = CarddaClient("your-api-key", transport=httpx.MockTransport(self.bank))
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_run(self):
+        reconciler = Reconciler(self.cardda.banking, "key", poll_interval=0)
+        valid, invalid, paid, skipped = populate(reconciler)
+
+        report = reconciler.run()
+
+        self.assertFalse(report.ok)
+        self.assertEqual((valid.state, valid.status), (SETTLED, "approved"))
+        self.assertEqual(invalid.state, FAILED)
+        self.assertEqual(invalid.error.response.status_code, 422)
+        self.assertEqual((paid.state, paid.status), (SETTLED, "enqueued"))
+        self.assertEqual(self.bank.transactions[paid.id]["recipient_id"], valid.id)
+        self.assertEqual(skipped.state, FAILED)
+        self.assertEqual(len(self.bank.transactions), 1)
+        self.assertEqual(report.summary(), {
+            "recipient": {SETTLED: 1, FAILED: 1},
+            "transaction": {SETTLED: 1, FAILED: 1},
+        })
+
+    def test_recipients_are_deduplicated(self):
+        reconciler = Reconciler(self.cardda.banking, "key", poll_interval=0)
+        rows = [
+            {"rut": "12.345.678-9", "account_number": "123", "bank_id": "b1", "account_type": "checking", "name": "A"},
+            {"rut": "12345678-9", "account_number": "123", "bank_id": "b1", "account_type": "CHECKING", "name": "A B"},
+            {"rut": "12345678-9", "account_number": "999", "bank_id": "b1", "account_type": "checking"},
+        ]
+        transactions = [reconciler.add_transaction({"amount": 100}, recipient=row) for row in rows]
+
+        self.assertEqual(len(reconciler.recipients), 2)
+        self.assertIs(transactions[0].dependency, transactions[1].dependency)
+        self.assertEqual(reconciler.transactions_of(rows[1]), transactions[:2])
+        self.assertIs(reconciler.recipient(BankRecipient(rows[2])), transactions[2].dependency)
+
+        reconciler.run()
+
+        self.assertEqual(len(self.bank.recipients), 2)
+        self.assertEqual(len({t.dependency.id for t in transactions}), 2)
+
+    def test_settled_entities_are_not_polled(self):
+        reconciler = Reconciler(self.cardda.banking, "key", poll_interval=0)
+        populate(reconciler)
+        reconciler.run()
+        count = len(self.bank.requests)
+
+        reconciler.run()
+
+        self.assertEqual(len(self.bank.requests), count)
+
+    def test_resume_existing(self):
+        self.bank.recipients["r9"] = {"id": "r9", "status": "approved", "transition": None, "polls": 0}
+        reconciler = Reconciler(self.cardda.banking, "key", poll_interval=0)
+        recipient = reconciler.add_recipient({}, id="r9")
+
+        reconciler.run()
+
+        self.assertEqual(recipient.state, SETTLED)
+        self.assertEqual(self.bank.requests, [("GET", "/v1/banking/bank_recipients/r9")])
+
+    def test_timeout(self):
+        reconciler = Reconciler(self.cardda.banking, "key", poll_interval=10, timeout=0.05)
+        recipient = reconciler.add_recipient({"rut": "1-9"})
+
+        reconciler.run()
+
+        self.assertEqual(recipient.state, TIMED_OUT)
+        self.assertEqual(recipient.transition, "approve")
+
+    def test_stalled_entities_are_stuck(self):
+        requests = []
+
+        def waiting_for_authorization(request):
+            requests.append(request)
+            return httpx.Response(200, json={"id": "r1", "status": "preauthorized", "transition": None})
+
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(waiting_for_authorization)) as cardda:
+            reconciler = Reconciler(cardda.banking, "key", poll_interval=0, max_stalled_polls=3)
+            recipient = reconciler.add_recipient({"rut": "1-9"})
+            transaction = reconciler.add_transaction({"amount": 2000}, recipient=recipient)
+
+            report = reconciler.run()
+
+        self.assertEqual((recipient.state, transaction.state), (STUCK, FAILED))
+        self.assertIn("preauthorized", str(recipient.error))
+        # create, enroll and three polls without any change
+        self.assertEqual(len(requests), 5)
+        self.assertEqual(report.summary()["recipient"], {STUCK: 1})
+
+    def test_timeout_does_not_wait_for_running_calls(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def stuck(request):
+            release.wait(5)
+            return httpx.Response(503)
+
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(stuck), retry=None) as cardda:
+            reconciler = Reconciler(cardda.banking, "key", timeout=0.05)
+            recipient = reconciler.add_recipient({"rut": "1-9"})
+            started = time.monotonic()
+
+            reconciler.run()
+
+            self.assertLess(time.monotonic() - started, 1)
+            self.assertEqual(recipient.state, TIMED_OUT)
+            release.set()
+
+
+class TestAsyncReconciler(unittest.TestCase):
+    def test_run(self):
+        bank = FakeBank()
+
+        async def run():
+            async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(bank)) as cardda:
+                reconciler = AsyncReconciler(cardda.banking, "key", poll_interval=0)
+                entities = populate(reconciler)
+                await reconciler.run()
+                return entities
+
+        valid, invalid, paid, skipped = asyncio.run(run())
+
+        self.assertEqual([e.state for e in (valid, invalid, paid, skipped)], [SETTLED, FAILED, SETTLED, FAILED])
+        self.assertEqual(bank.transactions[paid.id]["recipient_id"], valid.id)
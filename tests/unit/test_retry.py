@@ -0,0 +1,136 @@
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.rate_limit import TokenBucket
+from cardda_python.resources import BankRecipient
+from cardda_python.retry import RetryPolicy
+
+NO_WAIT = RetryPolicy(max_retries=2, backoff_factor=0)
+
+
+def flaky_handler(requests, failures):
+    def handler(request):
+        requests.append(request)
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return httpx.Response(200, json={"id": "1", "status": "approved"})
+    return handler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_should_retry(self):
+        policy = RetryPolicy(max_retries=1)
+        unavailable = httpx.Response(503)
+
+        self.assertTrue(policy.should_retry("GET", {}, 0, response=unavailable))
+        self.assertFalse(policy.should_retry("GET", {}, 1, response=unavailable))
+        self.assertFalse(policy.should_retry("GET", {}, 0, response=httpx.Response(404)))
+        self.assertFalse(policy.should_retry("POST", {}, 0, response=unavailable))
+        self.assertTrue(policy.should_retry("POST", {"Idempotency-Key": "key"}, 0, response=unavailable))
+        self.assertTrue(policy.should_retry("POST", {}, 0, error=httpx.ConnectError("refused")))
+        self.assertFalse(policy.should_retry("POST", {}, 0, error=httpx.ReadError("reset")))
+        self.assertTrue(policy.should_retry("GET", {}, 0, error=httpx.ReadError("reset")))
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+
+        self.assertEqual([policy.backoff(attempt) for attempt in range(4)], [1, 2, 4, 5])
+        self.assertEqual(policy.backoff(0, httpx.Response(429, headers={"Retry-After": "7"})), 7)
+        self.assertLessEqual(RetryPolicy(backoff_factor=1).backoff(3), 8)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_reserve(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        self.assertEqual([bucket.reserve() for _ in range(4)], [0, 0, 0.5, 1.0])
+        clock.now = 10
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_pause(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=10, clock=clock)
+        bucket.pause(3)
+
+        self.assertEqual(bucket.reserve(), 3)
+
+
+class TestHttpClientRetry(unittest.TestCase):
+    def test_retries_idempotent_requests(self):
+        requests = []
+        failures = [httpx.Response(502), httpx.ReadError("reset")]
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT) as cardda:
+            recipient = cardda.banking.recipients.find("1")
+
+        self.assertEqual(recipient.status, "approved")
+        self.assertEqual(len(requests), 3)
+
+    def test_gives_up(self):
+        requests = []
+        failures = [httpx.Response(503)] * 3
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT) as cardda:
+            with self.assertRaises(httpx.HTTPStatusError):
+                cardda.banking.recipients.find("1")
+
+        self.assertEqual(len(requests), 3)
+
+    def test_does_not_retry_unsafe_requests(self):
+        requests = []
+        failures = [httpx.Response(502)]
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT, idempotency_keys=False) as cardda:
+            with self.assertRaises(httpx.HTTPStatusError):
+                cardda.banking.recipients.enroll(BankRecipient({"id": "1"}))
+
+        self.assertEqual(len(requests), 1)
+
+    def test_retries_keep_the_idempotency_key(self):
+        requests = []
+        failures = [httpx.Response(502), httpx.ReadError("reset")]
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT) as cardda:
+            cardda.banking.recipients.enroll(BankRecipient({"id": "1"}))
+            cardda.banking.recipients.create(idempotency_key="my-key", rut="1")
+
+        keys = [request.headers["Idempotency-Key"] for request in requests]
+        self.assertEqual(len(set(keys[:3])), 1)
+        self.assertEqual(keys[3], "my-key")
+        self.assertNotIn("idempotency_key", requests[3].content.decode())
+
+    def test_no_idempotency_key_on_reads(self):
+        requests = []
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, []))) as cardda:
+            cardda.banking.recipients.find("1")
+
+        self.assertNotIn("Idempotency-Key", requests[0].headers)
+
+    def test_rate_limit_pauses_every_service(self):
+        requests = []
+        failures = [httpx.Response(429, headers={"Retry-After": "0"})]
+        bucket = TokenBucket(rate=1000)
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT, rate_limiter=bucket) as cardda:
+            cardda.banking.recipients.find("1")
+            self.assertIs(cardda.banking.transactions._client.rate_limiter, bucket)
+
+        self.assertEqual(len(requests), 2)
+
+
+class TestAsyncHttpClientRetry(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_idempotent_requests(self):
+        requests = []
+        failures = [httpx.Response(504), httpx.ConnectError("refused")]
+        async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(flaky_handler(requests, failures)), retry=NO_WAIT, rate_limiter=TokenBucket(rate=1000)) as cardda:
+            recipient = await cardda.banking.recipients.find("1")
+
+        self.assertEqual(recipient.id, "1")
+        self.assertEqual(len(requests), 3)
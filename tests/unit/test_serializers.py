@@ -0,0 +1,53 @@
+import importlib.util
+import unittest
+import httpx
+from cardda_python import CarddaClient
+from cardda_python.serializers import JsonSerializer, OrjsonSerializer, default_serializer
+
+PAYLOAD = {"id": "1", "amount": 2000, "tags": ["a", "b"], "transition": None, "name": "ñandú"}
+
+
+class RecordingSerializer(JsonSerializer):
+    def __init__(self):
+        self.calls = []
+
+    def dumps(self, obj):
+        self.calls.append("dumps")
+        return super().dumps(obj)
+
+    def loads(self, content):
+        self.calls.append("loads")
+        return super().loads(content)
+
+
+class TestSerializers(unittest.TestCase):
+    def test_round_trip(self):
+        serializer = JsonSerializer()
+
+        self.assertEqual(serializer.loads(serializer.dumps(PAYLOAD)), PAYLOAD)
+        self.assertIsInstance(serializer.dumps(PAYLOAD), bytes)
+
+    def test_default_serializer(self):
+        expected = OrjsonSerializer if importlib.util.find_spec("orjson") else JsonSerializer
+        self.assertIsInstance(default_serializer(), expected)
+
+    def test_client_uses_serializer(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=PAYLOAD)
+
+        serializer = RecordingSerializer()
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(handler), serializer=serializer) as cardda:
+            recipient = cardda.banking.recipients.find("1")
+            cardda.banking.recipients.enroll(recipient, bank_key_id="key")
+
+        self.assertEqual(serializer.calls, ["loads", "dumps", "loads"])
+        self.assertEqual(requests[0].content, b"")
+        self.assertEqual(serializer.loads(requests[1].content), {"bank_key_id": "key"})
+        self.assertEqual(recipient.name, "ñandú")
+
+    def test_empty_response(self):
+        with CarddaClient("your-api-key", transport=httpx.MockTransport(lambda request: httpx.Response(204))) as cardda:
+            self.assertIsNone(cardda.banking.recipients._client._request("DELETE", "/1"))
@@ -0,0 +1,112 @@
+import copy
+import json
+import pickle
+import unittest
+import httpx
+from cardda_python import CarddaClient, AsyncCarddaClient
+from cardda_python.resources import BankAccount, BankRecipient, BankTransaction
+from cardda_python.session import Session
+
+RECIPIENT = {"id": "r1", "name": "dancko", "status": "draft", "owner": {"id": "a1", "bank_id": "bank"}}
+TRANSACTION = {"id": "t1", "amount": 2000, "recipient": RECIPIENT, "sender": {"id": "a1"}}
+
+
+def handler(requests):
+    def handle(request):
+        requests.append(request)
+        if request.method == "PATCH":
+            return httpx.Response(200, json={**RECIPIENT, **json.loads(request.content)})
+        if "bank_transactions" in request.url.path:
+            return httpx.Response(200, json=TRANSACTION)
+        return httpx.Response(200, json={**RECIPIENT, "status": "approved"})
+    return handle
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.cardda = CarddaClient("your-api-key", transport=httpx.MockTransport(handler(self.requests)))
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_canonical_instances(self):
+        with self.cardda.session() as session:
+            transaction = self.cardda.banking.transactions.find("t1")
+            recipient = transaction.recipient
+            self.assertEqual(recipient.status, "draft")
+
+            refreshed = self.cardda.banking.recipients.find("r1")
+
+            self.assertIs(refreshed, recipient)
+            self.assertEqual(transaction.recipient.status, "approved")
+            self.assertIs(recipient.owner, transaction.sender)
+            self.assertIs(session.get(BankRecipient, "r1"), recipient)
+
+    def test_actions_keep_instances_in_the_session(self):
+        with self.cardda.session():
+            recipient = BankRecipient.build(RECIPIENT)
+            account = BankAccount.build({"id": "a1"})
+            self.cardda.banking.recipients.enroll(recipient)
+
+        self.assertEqual(recipient.status, "approved")
+        self.assertIs(recipient.owner, account)
+
+    def test_without_session(self):
+        first = BankRecipient.build(RECIPIENT)
+        second = BankRecipient.build(RECIPIENT)
+
+        self.assertIsNot(first, second)
+
+    def test_merge_keeps_local_changes(self):
+        with Session():
+            recipient = BankRecipient.build(RECIPIENT)
+            recipient.name = "local name"
+            BankRecipient.build({"id": "r1", "name": "server name", "status": "approved"})
+
+        self.assertEqual(recipient.name, "local name")
+        self.assertEqual(recipient.status, "approved")
+        self.assertIsInstance(recipient.owner, BankAccount)
+
+    def test_copy_and_pickle(self):
+        with Session() as session:
+            recipient = BankRecipient.build(RECIPIENT)
+            recipient.name = "local name"
+
+            clones = [pickle.loads(pickle.dumps(recipient)), copy.copy(recipient), copy.deepcopy(recipient)]
+
+            for clone in clones:
+                self.assertIsNot(clone, recipient)
+                # copies don't belong to the session
+                self.assertIsNone(clone._identity_map)
+                self.assertIsInstance(clone.owner, BankAccount)
+                self.assertEqual(clone.as_json(), recipient.as_json())
+                self.assertEqual(clone.changed_attributes, {"name"})
+
+            self.assertIs(session.identity_map.get("bank_recipients", "r1"), recipient)
+        self.assertIsInstance(recipient.owner, BankAccount)
+
+    def test_flush(self):
+        with self.cardda.session() as session:
+            recipient = BankRecipient.build(RECIPIENT)
+            account = BankAccount.build({"id": "a1"})
+            transaction = BankTransaction.build({"id": "t2"})
+            recipient.name = "new name"
+            account.alias = "accounts can't be saved"
+
+            saved = session.flush(self.cardda.banking)
+
+        self.assertEqual(saved, [recipient])
+        self.assertEqual(json.loads(self.requests[0].content), {"name": "new name"})
+        self.assertFalse(transaction.is_dirty)
+
+
+class TestAsyncSession(unittest.IsolatedAsyncioTestCase):
+    async def test_canonical_instances(self):
+        requests = []
+        async with AsyncCarddaClient("your-api-key", transport=httpx.MockTransport(handler(requests))) as cardda:
+            async with cardda.session():
+                transaction = await cardda.banking.transactions.find("t1")
+                recipient = await cardda.banking.recipients.find("r1")
+
+        self.assertIs(transaction.recipient, recipient)
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+import unittest
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from cardda_python.http_client import HttpClient, AsyncHttpClient
+from cardda_python.instrumentation import MetricsCollector
+
+BASE_URL = "https://api.cardda.com/v1"
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def setUp(self):
+        self.requests = []
+        self.release = threading.Event()
+        self.status = 200
+
+        def handler(request):
+            self.requests.append(request)
+            self.release.wait(5)
+            return httpx.Response(self.status, json={"id": request.url.path.rsplit("/", 1)[-1]})
+
+        self.transport = httpx.MockTransport(handler)
+
+    def fan_out(self, calls, waiters):
+        with ThreadPoolExecutor(len(calls)) as pool:
+            futures = [pool.submit(call) for call in calls]
+            wait_until(waiters)
+            self.release.set()
+            return [future.result() for future in futures]
+
+    def test_concurrent_gets_share_one_request(self):
+        metrics = MetricsCollector()
+        client = HttpClient(BASE_URL, "your-api-key", transport=self.transport, retry=None, instrumentation=metrics)
+        accounts = client.extend(base_url=f"{BASE_URL}/banking/bank_accounts")
+        same = client.extend(base_url=f"{BASE_URL}/banking/bank_accounts")
+
+        results = self.fan_out(
+            [lambda: accounts.find("a1")] * 4 + [lambda: same.find("a1")] * 4,
+            lambda: client.single_flight.coalesced == 7,
+        )
+
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(results, [{"id": "a1"}] * 8)
+        self.assertEqual(len({id(result) for result in results}), 8)
+        route = metrics.snapshot()["routes"]["GET /v1/banking/bank_accounts/{id}"]
+        self.assertEqual((route["requests"], route["coalesced"]), (8, 7))
+        # nothing is kept once the request returns
+        accounts.find("a1")
+        self.assertEqual(len(self.requests), 2)
+
+    def test_different_requests_are_not_coalesced(self):
+        client = HttpClient(BASE_URL, "your-api-key", transport=self.transport, retry=None)
+        other_key = client.extend(api_key="another-key")
+        self.release.set()
+
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(lambda call: call(), [
+                lambda: client.find("a1"),
+                lambda: client.find("a2"),
+                lambda: client.all({"page": 2}),
+                lambda: other_key.find("a1"),
+            ]))
+            client.create({"amount": 1})
+
+        self.assertEqual(len(self.requests), 5)
+        self.assertEqual(client.single_flight.coalesced, 0)
+
+    def test_errors_are_raised_in_every_caller(self):
+        self.status = 404
+        client = HttpClient(BASE_URL, "your-api-key", transport=self.transport, retry=None)
+
+        def find():
+            try:
+                client.find("a1")
+            except httpx.HTTPStatusError as exc:
+                return exc.response.status_code
+
+        results = self.fan_out([find] * 3, lambda: client.single_flight.coalesced == 2)
+
+        self.assertEqual(results, [404] * 3)
+        self.assertEqual(len(self.requests), 1)
+
+    def test_disabled(self):
+        client = HttpClient(BASE_URL, "your-api-key", transport=self.transport, coalesce=False)
+
+        self.fan_out([lambda: client.find("a1")] * 3, lambda: len(self.requests) == 3)
+
+        self.assertIsNone(client.single_flight)
+
+
+class TestAsyncSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        self.release = asyncio.Event()
+
+        async def handler(request):
+            self.requests.append(request)
+            await self.release.wait()
+            return httpx.Response(200, json={"id": "a1"})
+
+        self.client = AsyncHttpClient(
+            f"{BASE_URL}/banking/bank_accounts", "your-api-key", transport=httpx.MockTransport(handler)
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def wait_for_waiters(self, count):
+        while self.client.single_flight.coalesced < count:
+            await asyncio.sleep(0)
+
+    async def test_concurrent_gets_share_one_request(self):
+        tasks = [asyncio.create_task(self.client.find("a1")) for _ in range(5)]
+        await self.wait_for_waiters(4)
+        self.release.set()
+
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(results, [{"id": "a1"}] * 5)
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(len(self.requests), 1)
+
+    async def test_cancelled_waiter_keeps_the_request(self):
+        leader = asyncio.create_task(self.client.find("a1"))
+        waiter = asyncio.create_task(self.client.find("a1"))
+        await self.wait_for_waiters(1)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await leader, {"id": "a1"})
+        self.assertTrue(waiter.cancelled())
+
+    async def test_cancelled_leader_hands_over(self):
+        leader = asyncio.create_task(self.client.find("a1"))
+        waiter = asyncio.create_task(self.client.find("a1"))
+        await self.wait_for_waiters(1)
+        leader.cancel()
+        while len(self.requests) < 2:
+            await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await waiter, {"id": "a1"})
+        self.assertTrue(leader.cancelled())
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from cardda_python.watermarks import MemoryWatermarkStore, FileWatermarkStore, SqliteWatermarkStore
+
+
+class WatermarkStoreTests:
+    def test_get_set_delete(self):
+        store = self.make_store()
+        self.assertIsNone(store.get("a1:transactions"))
+
+        store.set("a1:transactions", "2024-01-01T00:00:00Z")
+        store.set("a1:transactions", "2024-01-02T00:00:00Z")
+
+        self.assertEqual(store.get("a1:transactions"), "2024-01-02T00:00:00Z")
+        store.delete("a1:transactions")
+        store.delete("missing")
+        self.assertIsNone(store.get("a1:transactions"))
+
+
+class TestMemoryWatermarkStore(WatermarkStoreTests, unittest.TestCase):
+    def make_store(self):
+        return MemoryWatermarkStore()
+
+
+class PersistentWatermarkStoreTests(WatermarkStoreTests):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "watermarks")
+
+    def test_survives_restarts(self):
+        self.make_store().set("a1:recipients", "2024-01-01T00:00:00Z")
+
+        self.assertEqual(self.make_store().get("a1:recipients"), "2024-01-01T00:00:00Z")
+
+
+class TestFileWatermarkStore(PersistentWatermarkStoreTests, unittest.TestCase):
+    def make_store(self):
+        return FileWatermarkStore(self.path)
+
+
+class TestSqliteWatermarkStore(PersistentWatermarkStoreTests, unittest.TestCase):
+    def make_store(self):
+        store = SqliteWatermarkStore(self.path)
+        self.addCleanup(store.close)
+        return store
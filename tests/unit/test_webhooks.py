@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import hmac
+import io
+import json
+import threading
+import unittest
+from cardda_python.resources import BankTransaction, BankRecipient
+from cardda_python.session import Session
+from cardda_python.webhooks import WebhookReceiver, SignatureError, SignatureScheme, WebhookError, sign
+
+NOW = 1700000000
+EVENT = {
+    "id": "evt_1",
+    "type": "bank_transaction.updated",
+    "data": {"id": "t1", "amount": 2000, "status": "enqueued", "transition": None},
+}
+
+
+def delivery(event=EVENT, secret="secret", timestamp=NOW):
+    body = json.dumps(event).encode()
+    return body, {"Cardda-Signature": sign(secret, body, timestamp)}
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    def setUp(self):
+        self.receiver = WebhookReceiver("secret", clock=lambda: NOW + 10)
+
+    def test_handle(self):
+        received = []
+        self.receiver.subscribe(received.append, "bank_transaction.*")
+        self.receiver.subscribe(lambda event: self.fail("not subscribed"), "bank_recipient.*")
+
+        event = self.receiver.handle(*delivery())
+
+        self.assertEqual(received, [event])
+        self.assertEqual(event.type, "bank_transaction.updated")
+        self.assertIsInstance(event.resource, BankTransaction)
+        self.assertEqual(event.resource.status, "enqueued")
+
+    def test_duplicates_are_dispatched_once(self):
+        received = []
+        self.receiver.subscribe(received.append)
+
+        self.receiver.handle(*delivery())
+        self.receiver.handle(*delivery())
+
+        self.assertEqual(len(received), 1)
+
+    def test_failed_deliveries_are_dispatched_again(self):
+        received = []
+
+        def flaky(event):
+            received.append(event)
+            if len(received) == 1:
+                raise RuntimeError("database down")
+
+        self.receiver.subscribe(flaky)
+        body, headers = delivery()
+
+        self.assertEqual(self.receiver._respond(body, headers), (500, "subscriber failed: RuntimeError"))
+        self.assertEqual(self.receiver._respond(body, headers), (204, ""))
+        self.assertEqual(self.receiver._respond(body, headers), (204, ""))
+        self.assertEqual(len(received), 2)
+
+    def test_rejects_bad_signatures(self):
+        body, headers = delivery()
+        with self.assertRaises(SignatureError):
+            self.receiver.handle(body, delivery(secret="other")[1])
+        with self.assertRaises(SignatureError):
+            self.receiver.handle(body + b" ", headers)
+        with self.assertRaises(SignatureError):
+            self.receiver.handle(*delivery(timestamp=NOW - 3600))
+        with self.assertRaises(SignatureError):
+            self.receiver.handle(body, {})
+        with self.assertRaises(SignatureError):
+            self.receiver.handle(body, {"Cardda-Signature": "garbage"})
+
+    def test_rejects_malformed_events(self):
+        with self.assertRaises(WebhookError):
+            self.receiver.handle(*delivery({"id": "evt_2"}))
+        for event in ({"id": "evt_3", "type": 1}, {"id": "evt_4", "type": None}, {"id": {}, "type": "a.b"}):
+            self.assertEqual(self.receiver._respond(*delivery(event))[0], 400)
+
+    def test_custom_signature_scheme(self):
+        class PlainHmac(SignatureScheme):
+            def sign(self, secret, body, timestamp):
+                return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+            def verify(self, secret, body, signature):
+                if not hmac.compare_digest(self.sign(secret, body, None), signature):
+                    raise SignatureError("invalid signature")
+                return None
+
+        receiver = WebhookReceiver("secret", signature_header="X-Signature", scheme=PlainHmac())
+        body = json.dumps(EVENT).encode()
+
+        event = receiver.handle(body, {"x-signature": PlainHmac().sign("secret", body, None)})
+
+        self.assertEqual(event.id, "evt_1")
+        with self.assertRaises(SignatureError):
+            receiver.handle(body, {"X-Signature": "00"})
+
+    def test_updates_session_instances(self):
+        with Session():
+            recipient = BankRecipient.build({"id": "r1", "status": "draft", "transition": "approve"})
+            self.receiver.handle(*delivery({
+                "id": "evt_3",
+                "type": "bank_recipient.updated",
+                "data": {"id": "r1", "status": "approved", "transition": None},
+            }))
+
+        self.assertEqual(recipient.status, "approved")
+        self.assertIsNone(recipient.transition)
+
+    def test_wait_for(self):
+        thread = threading.Timer(0.01, self.receiver.handle, delivery())
+        thread.start()
+
+        event = self.receiver.wait_for(lambda event: event.resource.id == "t1", timeout=5)
+
+        self.assertEqual(event.id, "evt_1")
+        self.assertIsNone(self.receiver.wait_for(lambda event: True, timeout=0.01))
+
+    def test_queue(self):
+        async def consume():
+            queue = self.receiver.queue("bank_transaction.*")
+            threading.Thread(target=self.receiver.handle, args=delivery()).start()
+            return await asyncio.wait_for(queue.get(), 5)
+
+        self.assertEqual(asyncio.run(consume()).id, "evt_1")
+
+    def test_wsgi(self):
+        body, headers = delivery()
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+            "HTTP_CARDDA_SIGNATURE": headers["Cardda-Signature"],
+        }
+        statuses = []
+
+        self.receiver.wsgi(environ, lambda status, headers: statuses.append(status))
+        environ["wsgi.input"] = io.BytesIO(body)
+        environ["HTTP_CARDDA_SIGNATURE"] = "t=1,v1=00"
+        self.receiver.wsgi(environ, lambda status, headers: statuses.append(status))
+
+        self.assertEqual(statuses, ["204 No Content", "401 Unauthorized"])
+
+    def test_asgi(self):
+        body, headers = delivery()
+        scope = {"type": "http", "method": "POST", "headers": [(b"cardda-signature", headers["Cardda-Signature"].encode())]}
+        messages = iter([{"body": body[:10], "more_body": True}, {"body": body[10:]}])
+        sent = []
+
+        async def receive():
+            return next(messages)
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(self.receiver.asgi(scope, receive, send))
+
+        self.assertEqual(sent[0]["status"], 204)
@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+import httpx
+from cardda_python.reconciliation import Reconciler, SETTLED, FAILED
+from cardda_python.retry import RetryPolicy
+from cardda_python.testing import FakeCardda
+
+
+class TestFakeCardda(unittest.TestCase):
+    def setUp(self):
+        self.clock = [0.0]
+        self.api = FakeCardda(transition_delay=5, clock=lambda: self.clock[0])
+        self.cardda = self.api.client()
+        self.account = self.api.add("bank_accounts", account_number="1")
+
+    def tearDown(self):
+        self.cardda.close()
+
+    def test_transitions(self):
+        recipients = self.cardda.banking.recipients
+        recipient = recipients.create(rut="1-9", account_number="2", owner_id=self.account["id"])
+        self.assertEqual((recipient.status, recipient.transition), ("draft", None))
+        self.assertEqual(recipient.owner.id, self.account["id"])
+
+        recipients.enroll(recipient)
+        self.assertEqual(recipient.transition, "enroll")
+        with self.assertRaises(httpx.HTTPStatusError) as context:
+            recipients.enroll(recipient)
+        self.assertEqual(context.exception.response.status_code, 409)
+
+        self.clock[0] = 5
+        recipient = recipients.find(recipient.id)
+        self.assertEqual((recipient.status, recipient.transition), ("approved", None))
+
+    def test_validation(self):
+        with self.assertRaises(httpx.HTTPStatusError) as context:
+            self.cardda.banking.recipients.create(account_number="2")
+        self.assertEqual(context.exception.response.status_code, 422)
+
+    def test_listing(self):
+        for index in range(5):
+            self.api.add("bank_recipients", rut=f"{index}-1", account_number=str(index), owner_id=self.account["id"])
+        self.api.add("bank_recipients", rut="9-1", account_number="9", owner_id="other")
+
+        recipients = list(self.cardda.banking.recipients.iter_all(page_size=2, owner_id=self.account["id"]))
+        self.assertEqual(len(recipients), 5)
+
+        since = recipients[3].updated_at
+        changed = self.cardda.banking.recipients.all(owner_id=self.account["id"], updated_since=since)
+        self.assertEqual([r.id for r in changed], [r.id for r in recipients[3:]])
+
+    def test_idempotency_replay(self):
+        first = self.cardda.banking.recipients.create(idempotency_key="k1", rut="1-9", account_number="2")
+        second = self.cardda.banking.recipients.create(idempotency_key="k1", rut="1-9", account_number="2")
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(len(self.api.store["bank_recipients"]), 1)
+
+    def test_payroll_lines(self):
+        payrolls = self.cardda.banking.payrolls
+        payroll = payrolls.create(sender_id=self.account["id"], bank_transactions=[{"amount": 1}, {"amount": 2}])
+
+        self.assertEqual([t.amount for t in payroll.bank_transactions], [1, 2])
+        self.assertEqual(payroll.sender.id, self.account["id"])
+        self.assertEqual(len(self.api.store["bank_transactions"]), 2)
+
+    def test_errors_and_latency(self):
+        api = FakeCardda(error_rate=0.5, latency=lambda: 0.001, seed=1)
+        with api.client(retry=RetryPolicy(max_retries=10, backoff_factor=0)) as cardda:
+            for index in range(10):
+                cardda.banking.recipients.create(rut=f"{index}-1", account_number=str(index))
+
+        self.assertEqual(len(api.store["bank_recipients"]), 10)
+        self.assertGreater(api.error_count, 0)
+        self.assertEqual(api.request_count, 10 + api.error_count)
+
+    def test_reconciliation(self):
+        api = FakeCardda()
+        with api.client() as cardda:
+            reconciler = Reconciler(cardda.banking, "key", poll_interval=0)
+            recipient = reconciler.add_recipient({"rut": "1-9", "account_number": "2"})
+            transaction = reconciler.add_transaction({"amount": 10}, recipient=recipient)
+            invalid = reconciler.add_recipient({"account_number": "3"})
+            reconciler.run()
+
+        self.assertEqual([recipient.state, transaction.state, invalid.state], [SETTLED, SETTLED, FAILED])
+
+    def test_async_transport(self):
+        api = FakeCardda(latency=0.001)
+
+        async def run():
+            async with api.async_client() as cardda:
+                results = await cardda.banking.recipients.create_many(
+                    [{"rut": f"{index}-1", "account_number": str(index)} for index in range(5)]
+                )
+                return [result.unwrap().id for result in results]
+
+        self.assertEqual(len(set(asyncio.run(run()))), 5)